@@ -0,0 +1,440 @@
+import re
+import textwrap
+
+IDENTIFIER_RE = re.compile(r"[A-Za-z_]\w*")
+FUNCTION_RE = re.compile(r"^([A-Za-z_]\w*)\((.*)\)\s*\{$")
+CLASS_RE = re.compile(r"^class\s+([A-Za-z_]\w*)")
+GLOBAL_RE = re.compile(r"^global\s+([A-Za-z_]\w*)\s*:=\s*(.+)$")
+LITERAL_RE = re.compile(r'^(-?\d+(\.\d+)?|0x[0-9A-Fa-f]+|true|false|unset|\[\]|"[^"]*")$')
+CONDITION_RE = re.compile(r'^(!?)\s*([A-Za-z_]\w*)(?:\s*(==|=|!=)\s*("[^"]*"|-?\d+))?$')
+DECLARATION_RE = re.compile(r"^(\s*)(global|static)\s+([A-Za-z_][\w, ]*)$")
+# Quoted strings (with `-escapes) and ; comments, which substitutions leave alone
+OPAQUE_PATTERN = r'"(?:[^"`]|`.)*"|\'(?:[^\'`]|`.)*\'|(?:(?<=\s)|^);.*'
+
+
+class Literal:
+    """An AHK literal spelled exactly as given, e.g. a hex colour, for use as a fact."""
+    def __init__(self, text):
+        self.text = text
+
+
+class Raw:
+    """Opaque AHK lines inside a function body, stored without their base indentation."""
+    def __init__(self, text):
+        text = textwrap.dedent(text)
+        # Drop the newlines that come from triple-quoted strings, keep deliberate blank lines
+        text = text[1:] if text.startswith("\n") else text
+        self.text = text[:-1] if text.endswith("\n") else text
+
+class If:
+    def __init__(self, cond, then, orelse=()):
+        self.cond = cond
+        self.then = list(then)
+        self.orelse = list(orelse)
+
+class Block:
+    """A braced statement such as `Loop n` whose body holds further nodes."""
+    def __init__(self, head, body):
+        self.head = head
+        self.body = list(body)
+
+class Switch:
+    """
+    `switch subject` over literal cases. Inside a case the subject is known, and `bind`
+    adds further facts per case, so one template body can be specialised per case.
+    `exhaustive` marks switches whose subject always matches a case; when every case
+    folds to the same code the dispatch is dropped.
+    """
+    def __init__(self, subject, cases, default=(), bind=None, exhaustive=False):
+        self.subject = subject
+        self.cases = [(value, list(body)) for value, body in cases]
+        self.default = list(default)
+        self.bind = dict(bind or {})
+        self.exhaustive = exhaustive
+
+class Function:
+    def __init__(self, name, params, body, comment=""):
+        self.name = name
+        self.params = params
+        self.body = list(body)
+        self.comment = comment
+
+class Class:
+    def __init__(self, name, text, comment=""):
+        self.name = name
+        self.text = text
+        self.comment = comment
+
+class Global:
+    def __init__(self, name, value):
+        self.name = name
+        self.value = value
+
+class Statement:
+    """Any other top-level line: directives, hotkeys, init code, comments."""
+    def __init__(self, text):
+        self.text = text
+
+class Program:
+    def __init__(self, items=()):
+        self.items = list(items)
+
+    @staticmethod
+    def build(parts):
+        """Builds a program from generator output: source strings are parsed, nodes kept as is."""
+        items = []
+        pending = []
+        for part in parts:
+            if isinstance(part, str):
+                pending.append(part)
+                continue
+            items.extend(parse("\n".join(pending)))
+            pending = []
+            items.append(part)
+        items.extend(parse("\n".join(pending)))
+        return Program(items)
+
+    def find(self, name):
+        for item in self.items:
+            if isinstance(item, (Function, Class)) and item.name == name:
+                return item
+        return None
+
+
+# --- Parsing ---
+
+def parse(text):
+    """
+    Splits AHK source into top-level items. Functions and classes must start at
+    column 0 and end with a lone `}` at column 0; comment lines directly above
+    them are kept as their comment.
+    """
+    items = []
+    comment = []
+    lines = text.split("\n")
+    i = 0
+    while i < len(lines):
+        line = lines[i].rstrip()
+        function_match = FUNCTION_RE.match(line)
+        class_match = CLASS_RE.match(line)
+        if function_match or class_match:
+            end = i + 1
+            while lines[end].rstrip() != "}":
+                end += 1
+            if function_match:
+                body = [Raw("\n".join(lines[i + 1:end]))]
+                items.append(Function(function_match.group(1), function_match.group(2), body, "\n".join(comment)))
+            else:
+                items.append(Class(class_match.group(1), "\n".join(lines[i:end + 1]), "\n".join(comment)))
+            comment = []
+            i = end + 1
+            continue
+
+        if line.startswith(";"):
+            comment.append(line)
+            i += 1
+            continue
+        items.extend(Statement(c) for c in comment)
+        comment = []
+
+        global_match = GLOBAL_RE.match(line)
+        if global_match:
+            items.append(Global(global_match.group(1), global_match.group(2)))
+        else:
+            items.append(Statement(line))
+        i += 1
+    items.extend(Statement(c) for c in comment)
+    return items
+
+
+# --- Printing ---
+
+def quote(value):
+    if isinstance(value, Literal):
+        return value.text
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return f'"{value}"' if isinstance(value, str) else str(value)
+
+def render_body(nodes, level=0):
+    pad = "    " * level
+    out = []
+    for node in nodes:
+        if isinstance(node, Raw):
+            out.extend(pad + line if line.strip() else "" for line in node.text.split("\n"))
+        elif isinstance(node, If):
+            out.append(f"{pad}if ({node.cond}) {{")
+            out.extend(render_body(node.then, level + 1))
+            if node.orelse:
+                out.append(f"{pad}}} else {{")
+                out.extend(render_body(node.orelse, level + 1))
+            out.append(pad + "}")
+        elif isinstance(node, Block):
+            out.append(f"{pad}{node.head} {{")
+            out.extend(render_body(node.body, level + 1))
+            out.append(pad + "}")
+        elif isinstance(node, Switch):
+            out.append(f"{pad}switch {node.subject} {{")
+            for value, body in node.cases:
+                out.append(f"{pad}    case {quote(value)}:")
+                out.extend(render_body(body, level + 2))
+            if node.default:
+                out.append(f"{pad}    default:")
+                out.extend(render_body(node.default, level + 2))
+            out.append(pad + "}")
+    return out
+
+def render_item(item):
+    if isinstance(item, Function):
+        head = [item.comment] if item.comment else []
+        return "\n".join(head + [f"{item.name}({item.params}) {{"] + render_body(item.body, 1) + ["}"])
+    if isinstance(item, Class):
+        return "\n".join(([item.comment] if item.comment else []) + [item.text])
+    if isinstance(item, Global):
+        return f"global {item.name} := {item.value}"
+    return item.text
+
+def render(program):
+    out = []
+    for item in program.items:
+        text = render_item(item)
+        if isinstance(item, (Function, Class)):
+            out.extend(["", text, ""])
+        else:
+            out.append(text)
+    # Removed items leave gaps behind, keep at most one blank line
+    lines = []
+    for line in "\n".join(out).split("\n"):
+        if line.strip() or (lines and lines[-1].strip()):
+            lines.append(line.rstrip())
+    while lines and not lines[-1]:
+        lines.pop()
+    return "\n".join(lines) + "\n"
+
+
+# --- Passes ---
+# Each pass takes (program, facts) and returns a new program. `facts` maps AHK variable
+# names to values that are fixed at generation time.
+
+def evaluate(cond, facts):
+    """Value of a simple condition under `facts`, or None when it is only known at runtime."""
+    cond = cond.strip()
+    while cond.startswith("(") and cond.endswith(")"):
+        cond = cond[1:-1].strip()
+    match = CONDITION_RE.match(cond)
+    if not match or match.group(2) not in facts:
+        return None
+    negate, name, op, literal = match.groups()
+    value = facts[name]
+    if isinstance(value, Literal):
+        return None
+    if op is None:
+        return not value if negate else bool(value)
+    if negate:
+        return None
+    expected = literal[1:-1] if literal.startswith('"') else int(literal)
+    if op == "=" and isinstance(value, str) and isinstance(expected, str):
+        equal = value.lower() == expected.lower()
+    else:
+        equal = value == expected
+    return equal if op != "!=" else not equal
+
+def _fold(nodes, facts):
+    out = []
+    for node in nodes:
+        if isinstance(node, If):
+            value = evaluate(node.cond, facts)
+            if value is None:
+                out.append(If(node.cond, _fold(node.then, facts), _fold(node.orelse, facts)))
+            else:
+                out.extend(_fold(node.then if value else node.orelse, facts))
+        elif isinstance(node, Block):
+            out.append(Block(node.head, _fold(node.body, facts)))
+        elif isinstance(node, Switch):
+            def case_facts(value):
+                return {**facts, node.subject: value, **node.bind.get(value, {})}
+            if node.subject in facts:
+                value = facts[node.subject]
+                body = next((b for v, b in node.cases if v == value), node.default)
+                out.extend(_fold(body, case_facts(value)))
+                continue
+            cases = [(v, _fold(b, case_facts(v))) for v, b in node.cases]
+            default = _fold(node.default, facts)
+            variants = {"\n".join(render_body(b)) for _, b in cases}
+            if node.exhaustive and cases and len(variants) == 1:
+                out.extend(cases[0][1])
+            else:
+                out.append(Switch(node.subject, cases, default))
+        else:
+            out.append(node)
+    return out
+
+def fold_constants(program, facts):
+    """Resolves conditions and switches whose outcome is fixed at generation time."""
+    items = []
+    for item in program.items:
+        if isinstance(item, Function):
+            item = Function(item.name, item.params, _fold(item.body, facts), item.comment)
+        items.append(item)
+    return Program(items)
+
+def _map_nodes(nodes, sub, cond_sub=None):
+    """Applies `sub` to all text in `nodes`; `cond_sub`, if given, replaces it for conditions and switch subjects."""
+    cond_sub = cond_sub or sub
+    out = []
+    for node in nodes:
+        if isinstance(node, Raw):
+            mapped = Raw("")
+            mapped.text = sub(node.text)
+            out.append(mapped)
+        elif isinstance(node, If):
+            out.append(If(cond_sub(node.cond), _map_nodes(node.then, sub, cond_sub), _map_nodes(node.orelse, sub, cond_sub)))
+        elif isinstance(node, Block):
+            out.append(Block(sub(node.head), _map_nodes(node.body, sub, cond_sub)))
+        elif isinstance(node, Switch):
+            cases = [(v, _map_nodes(b, sub, cond_sub)) for v, b in node.cases]
+            out.append(Switch(cond_sub(node.subject), cases, _map_nodes(node.default, sub, cond_sub), node.bind, node.exhaustive))
+    return out
+
+def inline_constants(program, facts):
+    """
+    Replaces reads of generation-time constants in function bodies with their literal
+    value and drops them from `global` declarations, so the interpreter does no lookup.
+    Only names in `facts` are touched; the generator passes values that never change at runtime.
+    """
+    if not facts:
+        return program
+    pattern = re.compile(r"(" + OPAQUE_PATTERN + r")|(?<![.\w])(" + "|".join(map(re.escape, facts)) + r")\b(?!\s*:=)")
+
+    def sub(text):
+        lines = []
+        for line in text.split("\n"):
+            declaration = DECLARATION_RE.match(line)
+            if declaration and declaration.group(2) == "global":
+                names = [n.strip() for n in declaration.group(3).split(",") if n.strip() not in facts]
+                if names:
+                    lines.append(f"{declaration.group(1)}global {', '.join(names)}")
+                continue
+            lines.append(pattern.sub(lambda m: m.group(1) or quote(facts[m.group(2)]), line))
+        return "\n".join(lines)
+
+    def cond_sub(text):
+        # Conditions fold_constants can decide keep their names so it still sees them
+        return text if evaluate(text, facts) is not None or text in facts else sub(text)
+
+    items = []
+    for item in program.items:
+        if isinstance(item, Function):
+            item = Function(item.name, item.params, _map_nodes(item.body, sub, cond_sub), item.comment)
+        items.append(item)
+    return Program(items)
+
+def merge_duplicate_functions(program, facts):
+    """Keeps one copy of functions with identical parameters and bodies and redirects callers."""
+    seen = {}
+    renames = {}
+    for item in program.items:
+        if isinstance(item, Function):
+            key = (item.params, "\n".join(render_body(item.body)))
+            if key in seen:
+                renames[item.name] = seen[key]
+            else:
+                seen[key] = item.name
+    if not renames:
+        return program
+
+    # Method calls (`obj.Name`) are left alone
+    pattern = re.compile(r"(?<![.\w])(" + "|".join(map(re.escape, renames)) + r")\b")
+
+    def sub(text):
+        return pattern.sub(lambda m: renames[m.group(1)], text)
+
+    items = []
+    for item in program.items:
+        if isinstance(item, Function):
+            if item.name in renames:
+                continue
+            item = Function(item.name, item.params, _map_nodes(item.body, sub), item.comment)
+        elif isinstance(item, Class):
+            item = Class(item.name, sub(item.text), item.comment)
+        elif isinstance(item, Global):
+            item = Global(item.name, sub(item.value))
+        elif isinstance(item, Statement):
+            item = Statement(sub(item.text))
+        items.append(item)
+    return Program(items)
+
+def drop_empty_calls(program, facts):
+    """
+    Removes statements that only call a parameterless function with an empty body, such as
+    an instrumentation hook that is switched off; the function itself is left to dead-code
+    elimination.
+    """
+    empty = [item.name for item in program.items if isinstance(item, Function) and not item.params
+             and not any(line.strip() and not line.strip().startswith(";") for line in render_body(item.body))]
+    if not empty:
+        return program
+    pattern = re.compile(r"^\s*(" + "|".join(map(re.escape, empty)) + r")\(\)\s*$")
+
+    def sub(text):
+        return "\n".join(line for line in text.split("\n") if not pattern.match(line))
+
+    items = []
+    for item in program.items:
+        if isinstance(item, Function):
+            item = Function(item.name, item.params, _map_nodes(item.body, sub), item.comment)
+        elif isinstance(item, Class):
+            item = Class(item.name, sub(item.text), item.comment)
+        elif isinstance(item, Statement) and pattern.match(item.text):
+            continue
+        items.append(item)
+    return Program(items)
+
+def _references(item):
+    text = render_item(item)
+    code = "\n".join(line for line in text.split("\n") if not line.lstrip().startswith(";"))
+    return set(IDENTIFIER_RE.findall(code))
+
+def eliminate_dead_code(program, facts):
+    """
+    Drops functions and classes that nothing live refers to, and literal globals
+    that no live code reads. Top-level statements and globals with computed values
+    (they may have side effects) are the roots.
+    """
+    definitions = {item.name: item for item in program.items if isinstance(item, (Function, Class))}
+    live = set()
+    pending = []
+    for item in program.items:
+        if isinstance(item, Statement) or (isinstance(item, Global) and not LITERAL_RE.match(item.value)):
+            pending.extend(_references(item))
+    while pending:
+        name = pending.pop()
+        if name in definitions and name not in live:
+            live.add(name)
+            pending.extend(_references(definitions[name]))
+
+    used = set()
+    for item in program.items:
+        if isinstance(item, (Function, Class)) and item.name not in live:
+            continue
+        if isinstance(item, Global):
+            used.update(IDENTIFIER_RE.findall(item.value))
+        else:
+            used.update(_references(item))
+
+    items = []
+    for item in program.items:
+        if isinstance(item, (Function, Class)) and item.name not in live:
+            continue
+        if isinstance(item, Global) and LITERAL_RE.match(item.value) and item.name not in used:
+            continue
+        items.append(item)
+    return Program(items)
+
+PASSES = (inline_constants, fold_constants, drop_empty_calls, merge_duplicate_functions, eliminate_dead_code)
+
+def optimise(program, facts=None, passes=PASSES):
+    facts = dict(facts or {})
+    for run_pass in passes:
+        program = run_pass(program, facts)
+    return program
@@ -3,6 +3,7 @@ import sys
 import subprocess
 import ctypes
 from typing import Dict, Any
+from mousefx_logic import TelemetryReader
 
 class AnimationEngine:
     """
@@ -12,7 +13,9 @@ class AnimationEngine:
     # --- C# Template ---
     CS_TEMPLATE = r"""
 using System;
+using System.Diagnostics;
 using System.IO;
+using System.IO.MemoryMappedFiles;
 using System.Runtime.InteropServices;
 using System.Windows;
 using System.Windows.Controls;
@@ -66,6 +69,14 @@ namespace CursorOverlayApp
         
         private const bool ENABLE_BOUNCE = {{ENABLE_BOUNCE}};
         private const int EXIT_KEY = {{EXIT_KEY}}; 
+        
+        // Telemetry (read by the MouseFX app's Diagnostics page)
+        private const bool ENABLE_TELEMETRY = {{TELEMETRY}};
+        private TelemetryRing _telemetry;
+        private readonly Stopwatch _frameClock = Stopwatch.StartNew();
+        private double _lastFrameStart = -1;
+        private double _shortestInterval = double.MaxValue;
+        private int _drawCalls = 0;
 
         public OverlayWindow()
         {
@@ -130,6 +141,11 @@ namespace CursorOverlayApp
             SetupTrayIcon();
             ToggleSystemCursor(false);
 
+            if (ENABLE_TELEMETRY)
+            {
+                _telemetry = new TelemetryRing("{{TELEMETRY_NAME}}", {{TELEMETRY_CAPACITY}});
+            }
+
             CompositionTarget.Rendering += OnRendering;
         }
 
@@ -170,6 +186,10 @@ namespace CursorOverlayApp
                 _notifyIcon.Visible = false;
                 _notifyIcon.Dispose();
             }
+            if (_telemetry != null)
+            {
+                _telemetry.Dispose();
+            }
             ToggleSystemCursor(true);
         }
 
@@ -182,10 +202,27 @@ namespace CursorOverlayApp
                 return;
             }
 
+            double frameStart = _frameClock.Elapsed.TotalMilliseconds;
             UpdateCursorVisual();
             
             // Z-Order Enforcement (Keep TopMost)
             SetWindowPos(_windowHandle, new IntPtr(-1), 0, 0, 0, 0, 0x0002 | 0x0001 | 0x0010);
+            _drawCalls++;
+
+            if (_telemetry != null)
+            {
+                // Lateness is measured against the shortest frame interval seen, i.e. the display's frame period
+                double lateMs = 0;
+                if (_lastFrameStart >= 0)
+                {
+                    double interval = frameStart - _lastFrameStart;
+                    if (interval >= 4) _shortestInterval = Math.Min(_shortestInterval, interval);
+                    if (_shortestInterval != double.MaxValue) lateMs = Math.Max(0, interval - _shortestInterval);
+                }
+                _lastFrameStart = frameStart;
+                _telemetry.Write(_frameClock.Elapsed.TotalMilliseconds - frameStart, lateMs, _drawCalls);
+            }
+            _drawCalls = 0;
         }
 
         private void UpdateCursorVisual()
@@ -203,11 +240,13 @@ namespace CursorOverlayApp
                 Canvas.SetTop(_cursorImage, finalY);
                 Canvas.SetLeft(_fallbackCursor, finalX);
                 Canvas.SetTop(_fallbackCursor, finalY);
+                _drawCalls++;
 
                 // 2. Icon Update
                 if (pci.hCursor != _currentCursorHandle && pci.hCursor != IntPtr.Zero)
                 {
                     _currentCursorHandle = pci.hCursor;
+                    _drawCalls++;
                     try
                     {
                         var bitmapSource = Imaging.CreateBitmapSourceFromHIcon(
@@ -261,6 +300,7 @@ namespace CursorOverlayApp
 
                 _scaleTransform.ScaleX = _currentScale;
                 _scaleTransform.ScaleY = _currentScale;
+                _drawCalls++;
             }
         }
 
@@ -324,6 +364,81 @@ namespace CursorOverlayApp
 
         #endregion
     }
+
+    // Frame telemetry ring buffer in a named shared memory section, same layout as the AHK engine's:
+    // a 32-byte header (magic, version, capacity, record size, records written, pid) and 32-byte records
+    // (frame, work us, lateness us, draw calls, GDI objects, USER objects, working set).
+    // Each record is filled in before the written count is bumped.
+    public sealed class TelemetryRing : IDisposable
+    {
+        private const int HEADER_SIZE = 32;
+        private const int RECORD_SIZE = 32;
+
+        private readonly MemoryMappedFile _file;
+        private readonly MemoryMappedViewAccessor _view;
+        private readonly int _capacity;
+        private long _count = 0;
+        private uint _gdiObjects = 0;
+        private uint _userObjects = 0;
+        private long _workingSet = 0;
+
+        public TelemetryRing(string name, int capacity)
+        {
+            _capacity = capacity;
+            try
+            {
+                _file = MemoryMappedFile.CreateOrOpen(name, HEADER_SIZE + (long)capacity * RECORD_SIZE);
+                _view = _file.CreateViewAccessor();
+                _view.Write(0, 0x5458464Du); // "MFXT"
+                _view.Write(4, 1u);
+                _view.Write(8, (uint)capacity);
+                _view.Write(12, (uint)RECORD_SIZE);
+                _view.Write(16, 0L);
+                _view.Write(24, (uint)Process.GetCurrentProcess().Id);
+                _view.Write(28, 0u);
+            }
+            catch { _view = null; /* Telemetry is optional */ }
+        }
+
+        public void Write(double workMs, double lateMs, int drawCalls)
+        {
+            if (_view == null) return;
+
+            // Handle counts and the working set change slowly, sample them about once a second
+            if (_count % 60 == 0) SampleResources();
+
+            long record = HEADER_SIZE + (_count % _capacity) * RECORD_SIZE;
+            _view.Write(record, (uint)_count);
+            _view.Write(record + 4, (uint)Math.Round(workMs * 1000));
+            _view.Write(record + 8, (uint)Math.Round(lateMs * 1000));
+            _view.Write(record + 12, (uint)drawCalls);
+            _view.Write(record + 16, _gdiObjects);
+            _view.Write(record + 20, _userObjects);
+            _view.Write(record + 24, _workingSet);
+            _count++;
+            _view.Write(16, _count);
+        }
+
+        private void SampleResources()
+        {
+            IntPtr process = GetCurrentProcess();
+            _gdiObjects = GetGuiResources(process, 0);
+            _userObjects = GetGuiResources(process, 1);
+            _workingSet = Environment.WorkingSet;
+        }
+
+        public void Dispose()
+        {
+            if (_view != null) _view.Dispose();
+            if (_file != null) _file.Dispose();
+        }
+
+        [DllImport("user32.dll")]
+        static extern uint GetGuiResources(IntPtr hProcess, uint uiFlags);
+
+        [DllImport("kernel32.dll")]
+        static extern IntPtr GetCurrentProcess();
+    }
 }
 """
 
@@ -404,6 +519,7 @@ try {
         "/reference:$wpf\PresentationFramework.dll",
         "/reference:$wpf\WindowsBase.dll",
         "/reference:$frameworkPath\System.Xaml.dll",
+        "/reference:$frameworkPath\System.Core.dll",
         "/reference:$frameworkPath\System.Windows.Forms.dll",
         "/reference:$frameworkPath\System.Drawing.dll"
     )
@@ -481,6 +597,9 @@ catch {
         csharp_code = csharp_code.replace("{{OPACITY}}", str(config.get("CursorOpacity", 1.0)))
         csharp_code = csharp_code.replace("{{FALLBACK_COLOR}}", config.get("FallbackColor", "#FF0000"))
         csharp_code = csharp_code.replace("{{SHOW_TRAY}}", "true" if config.get("ShowTray", True) else "false")
+        csharp_code = csharp_code.replace("{{TELEMETRY}}", "true" if config.get("Telemetry", True) else "false")
+        csharp_code = csharp_code.replace("{{TELEMETRY_NAME}}", TelemetryReader.ANIMATOR_NAME)
+        csharp_code = csharp_code.replace("{{TELEMETRY_CAPACITY}}", str(TelemetryReader.CAPACITY))
         
         vk_code = self.map_key_to_vk(config.get("EmergencyKey", "F12"))
         csharp_code = csharp_code.replace("{{EXIT_KEY}}", str(vk_code))
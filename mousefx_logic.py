@@ -1,8 +1,25 @@
 import os
+import sys
 import json
+import math
+import ctypes
+import mmap
+import functools
+import collections
+import wave
+import struct
+import hashlib
 import subprocess
 import datetime
-from PyQt6.QtGui import QColor
+from PyQt6.QtCore import Qt, QPointF, QRectF
+from PyQt6.QtGui import QColor, QImage, QPainter, QPen, QBrush, QPolygonF
+from mousefx_ahk import Program, Function, Raw, If, Block, Switch, Literal, optimise, quote, render
+
+try:
+    import numpy as np
+except ImportError:
+    # Optional: without NumPy click sounds are used as-is and the engine applies the volume
+    np = None
 
 class ProfileManager:
     def __init__(self):
@@ -16,6 +33,10 @@ class ProfileManager:
         # Save the engine script to Documents so the user can easily find/edit it
         docs = os.path.expanduser("~/Documents")
         self.script_path = os.path.join(docs, "mousefx_engine.ahk")
+        # Sidecar with the config hash and generation time of the script on disk
+        self.script_meta_path = os.path.join(docs, "mousefx_engine.json")
+        # Pre-rendered click animation frames, loaded by the engine at startup
+        self.atlas_path = os.path.join(docs, "mousefx_click_atlas.bin")
         
         self.profiles = []
         self.current_index = 0
@@ -47,6 +68,19 @@ class ProfileManager:
             "HotkeyClickFX": "F10",
             "HotkeySpotlight": "Ctrl+Space",
             "RefreshRateIndex": 2, 
+            "TrackingMode": "Polling",
+            "OverlayMode": "Separate",
+            "HighlightRateIndex": -1,
+            "ClickRateIndex": -1,
+            "SpotlightRateIndex": -1,
+            "AdaptiveRate": True,
+            "MinRefreshRateIndex": 0,
+            "TelemetryEnabled": True,
+            "PredictionStrength": 0,
+            "BatterySaver": True,
+            "BatteryRefreshRateIndex": 0,
+            "PauseOnFullscreen": False,
+            "ExcludedProcesses": [],
             "HighlightEnabled": True,
             "HighlightColorHex": "#FFFF00",
             "HighlightSize": 60,
@@ -80,7 +114,104 @@ class ProfileManager:
             return self.profiles[index]
         return self.get_default_profile()
 
+    def get_atlas_path(self, index):
+        """The active profile uses atlas_path; profiles embedded for hotkey switching get their own file."""
+        if index == self.current_index:
+            return self.atlas_path
+        root, ext = os.path.splitext(self.atlas_path)
+        return f"{root}_{index + 1}{ext}"
+
 class ScriptGenerator:
+    REFRESH_MAP = {0: 33, 1: 16, 2: 7}
+    CLICK_ANIMATION_DURATION = 300
+    CLICK_ANIMATION_MAX_RADIUS = 50
+    SHAPE_DRAW_FUNCTIONS = {
+        "Circle Ripple": "DrawRippleShape",
+        "Solid Circle": "DrawSolidCircleShape",
+        "Square": "DrawSquareShape",
+        "Diamond": "DrawDiamondShape",
+        "Static Circle": "DrawStaticCircleShape",
+    }
+
+    # Keys that affect the generated script; feature keys only count while the feature is enabled
+    BASE_KEYS = ("AudioEnabled", "HighlightEnabled", "ClickFxEnabled", "SpotlightEnabled",
+                 "HighlightSize", "RefreshRateIndex", "OverlayMode", "PauseOnFullscreen", "ExcludedProcesses",
+                 "Profiles", "ActiveProfile")
+    # Frame tick keys, only used while a visual effect is enabled
+    TICK_KEYS = ("TrackingMode", "AdaptiveRate", "MinRefreshRateIndex", "TelemetryEnabled", "PredictionStrength",
+                 "BatterySaver", "BatteryRefreshRateIndex")
+    FEATURE_KEYS = {
+        "AudioEnabled": ("MasterVolume", "SyncSounds", "LeftSoundPath", "RightSoundPath",
+                         "HotkeySound", "SoundGainApplied"),
+        "HighlightEnabled": ("HighlightColorHex", "HighlightThickness", "HighlightOpacity", "HotkeyHighlight",
+                             "HighlightRateIndex"),
+        "ClickFxEnabled": ("SyncVisuals", "LeftClickShape", "LeftClickColorHex", "RightClickShape",
+                           "RightClickColorHex", "HotkeyClickFX", "ClickAtlasPath", "ClickRateIndex"),
+        "SpotlightEnabled": ("SpotlightRadius", "SpotlightAnimSpeed", "SpotlightOpacity",
+                             "SpotlightColorHex", "SpotlightAnimStyle", "HotkeySpotlight", "SpotlightRateIndex"),
+    }
+    # Right-hand keys are ignored while the matching sync option is on
+    SYNCED_KEYS = {
+        "SyncSounds": ("RightSoundPath",),
+        "SyncVisuals": ("RightClickShape", "RightClickColorHex"),
+    }
+    # Keys a profile switch changes at runtime; profiles that agree on everything else share one engine
+    PROFILE_KEYS = ("AudioEnabled", "HighlightEnabled", "ClickFxEnabled", "SpotlightEnabled",
+                    "MasterVolume", "SyncSounds", "LeftSoundPath", "RightSoundPath", "SoundGainApplied",
+                    "HighlightColorHex", "HighlightSize", "HighlightThickness", "HighlightOpacity",
+                    "LeftClickColorHex", "RightClickColorHex", "ClickAtlasPath",
+                    "SpotlightRadius", "SpotlightAnimSpeed", "SpotlightOpacity", "SpotlightColorHex", "SpotlightAnimStyle")
+    PROFILE_HOTKEY = "Ctrl+Alt+{}"
+    # Per-effect frame rates; -1 (the default) follows RefreshRateIndex
+    EFFECT_RATE_KEYS = {
+        "highlight": "HighlightRateIndex",
+        "clicks": "ClickRateIndex",
+        "spotlight": "SpotlightRateIndex",
+    }
+
+    @staticmethod
+    def get_refresh_rate_ms(config):
+        return ScriptGenerator.REFRESH_MAP.get(config.get('RefreshRateIndex', 1), 16)
+
+    @staticmethod
+    def get_effect_rate_ms(config, effect):
+        index = config.get(ScriptGenerator.EFFECT_RATE_KEYS[effect], -1)
+        if index not in ScriptGenerator.REFRESH_MAP:
+            return ScriptGenerator.get_refresh_rate_ms(config)
+        return ScriptGenerator.REFRESH_MAP[index]
+
+    @staticmethod
+    def get_profile_values(config):
+        """Highlight geometry and colours; runtime globals that profile switches and live edits replace."""
+        hl_radius = int(config.get('HighlightSize', 60) / 2)
+        hl_color = QColor(config.get('HighlightColorHex', '#FFFF00'))
+        left_color = QColor(config.get('LeftClickColorHex', '#00FFFF'))
+        right_color = left_color if config.get('SyncVisuals', True) else QColor(config.get('RightClickColorHex', '#FF00FF'))
+        values = {
+            "highlightRadius": hl_radius,
+            "highlightGuiSize": hl_radius * 2 + 10,
+            "highlightGuiHalf": hl_radius + 5,
+            "highlightArgb": Literal(ScriptGenerator.color_to_argb(hl_color, int(config.get('HighlightOpacity', 50) * 2.55))),
+            "highlightThickness": int(config.get('HighlightThickness', 0)),
+        }
+        for side, color in (("left", left_color), ("right", right_color)):
+            values[f"{side}ClickRgb"] = Literal(ScriptGenerator.color_to_argb(color, 0))
+            values[f"{side}ClickArgb"] = Literal(ScriptGenerator.color_to_argb(color, 255))
+        return values
+
+    @staticmethod
+    def get_live_params(config):
+        """The engine values a running engine takes over "param <name> <value>", as command text."""
+        # The engine derives the highlight window size from the radius
+        values = {name: value.text if isinstance(value, Literal) else value
+                  for name, value in ScriptGenerator.get_profile_values(config).items()
+                  if name not in ("highlightGuiSize", "highlightGuiHalf")}
+        values["soundVolume"] = config.get('MasterVolume', 80) * 10
+        values["spotlightRadius"] = config.get('SpotlightRadius', 200)
+        values["spotlightOpacity"] = config.get('SpotlightOpacity', 180)
+        values["spotlightColor"] = ScriptGenerator.color_to_rgb_str(QColor(config.get('SpotlightColorHex', '#000000')))
+        return values
+
     @staticmethod
     def color_to_bgr(qcolor):
         return f"{qcolor.blue():02X}{qcolor.green():02X}{qcolor.red():02X}"
@@ -88,6 +219,25 @@ class ScriptGenerator:
     @staticmethod
     def color_to_rgb_str(qcolor):
         return f"{qcolor.red():02X}{qcolor.green():02X}{qcolor.blue():02X}"
+
+    @staticmethod
+    def color_to_argb(qcolor, alpha):
+        """GDI+ ARGB literal, e.g. 0x80FFFF00."""
+        return f"0x{int(alpha):02X}{ScriptGenerator.color_to_rgb_str(qcolor)}"
+
+    @staticmethod
+    def get_click_frames(config):
+        """
+        (radius, opacity) of each animated click frame at the click effect's frame rate.
+        Same ease-out as before, sampled at the middle of each frame slot; shared by the
+        engine's lookup tables and the pre-rendered atlas.
+        """
+        frame_count = max(1, math.ceil(ScriptGenerator.CLICK_ANIMATION_DURATION / ScriptGenerator.get_effect_rate_ms(config, "clicks")))
+        frames = []
+        for k in range(frame_count):
+            progress = 1 - (1 - (k + 0.5) / frame_count) ** 2
+            frames.append((ScriptGenerator.CLICK_ANIMATION_MAX_RADIUS * progress, int(255 * (1 - progress))))
+        return frames
     
     @staticmethod
     def convert_hotkey(hotkey_str):
@@ -99,30 +249,140 @@ class ScriptGenerator:
         if not path: return ""
         return path.replace("\\", "\\\\")
 
+    @staticmethod
+    def is_feature_enabled(config, feature):
+        """Features are generated when the config or any profile embedded in it enables them."""
+        return bool(config.get(feature, False) or any(profile and profile.get(feature, False)
+                                                     for profile in config.get("Profiles") or []))
+
+    @staticmethod
+    def get_effective_config(config):
+        """Returns only the config entries that change the generated script."""
+        enabled = {feature for feature in ScriptGenerator.FEATURE_KEYS if ScriptGenerator.is_feature_enabled(config, feature)}
+        keys = list(ScriptGenerator.BASE_KEYS)
+        for feature, feature_keys in ScriptGenerator.FEATURE_KEYS.items():
+            if feature in enabled:
+                keys.extend(feature_keys)
+        for sync_key, synced in ScriptGenerator.SYNCED_KEYS.items():
+            if config.get(sync_key, True):
+                keys = [k for k in keys if k not in synced]
+        if not enabled & {"HighlightEnabled", "ClickFxEnabled"}:
+            keys.remove("OverlayMode")
+        if enabled & {"HighlightEnabled", "ClickFxEnabled", "SpotlightEnabled"}:
+            keys.extend(ScriptGenerator.TICK_KEYS)
+        return {k: config[k] for k in keys if k in config}
+
+    @staticmethod
+    def embed_profiles(config, profiles, active_index):
+        """
+        Lets the engine for `config` (the active profile) switch to the other stored profiles in
+        place. Profiles that only differ in PROFILE_KEYS are stored as config["Profiles"], in
+        stored order with None for those that need a different script. `profiles` must already
+        have their sound and atlas paths prepared like `config`.
+        """
+        def structure(profile):
+            everything = {k: v for k, v in profile.items() if k not in ("Profiles", "ActiveProfile")}
+            everything.update((feature, True) for feature in ScriptGenerator.FEATURE_KEYS)
+            return {k: v for k, v in ScriptGenerator.get_effective_config(everything).items()
+                    if k not in ScriptGenerator.PROFILE_KEYS}
+
+        active = structure(config)
+        tables = [{k: profile[k] for k in ScriptGenerator.PROFILE_KEYS if k in profile}
+                  if index == active_index or structure(profile) == active else None
+                  for index, profile in enumerate(profiles)]
+        config.pop("Profiles", None)
+        config.pop("ActiveProfile", None)
+        if sum(table is not None for table in tables) > 1:
+            config["Profiles"] = tables
+            config["ActiveProfile"] = active_index
+        return config
+
+    @staticmethod
+    def get_canonical_config(config):
+        return json.dumps(ScriptGenerator.get_effective_config(config), sort_keys=True, separators=(",", ":"))
+
+    @staticmethod
+    def get_config_hash(config):
+        return hashlib.sha256(ScriptGenerator.get_canonical_config(config).encode("utf-8")).hexdigest()
+
     @staticmethod
     def generate_ahk_script(config):
-        audio_enabled = config.get('AudioEnabled', False)
-        hl_enabled = config.get('HighlightEnabled', False)
-        click_fx_enabled = config.get('ClickFxEnabled', False)
-        spotlight_enabled = config.get('SpotlightEnabled', False)
+        """Deterministic and memoised: identical effective configs return the cached script."""
+        return ScriptGenerator._generate_cached(ScriptGenerator.get_canonical_config(config))
+
+    @staticmethod
+    @functools.lru_cache(maxsize=16)
+    def _generate_cached(canonical_config):
+        return ScriptGenerator.build_ahk_script(json.loads(canonical_config))
+
+    @staticmethod
+    def read_script_hash(meta_path):
+        """Config hash of the script currently on disk, from its sidecar file."""
+        if not os.path.exists(meta_path):
+            return None
+        try:
+            with open(meta_path, 'r') as f:
+                return json.load(f).get("ConfigHash")
+        except:
+            return None
+
+    @staticmethod
+    def write_script(config, script_path, meta_path):
+        with open(script_path, "w", encoding="utf-8") as f:
+            f.write(ScriptGenerator.generate_ahk_script(config))
+        # The generation time lives in the sidecar so the script bytes only depend on the config
+        with open(meta_path, "w") as f:
+            json.dump({
+                "ConfigHash": ScriptGenerator.get_config_hash(config),
+                "GenerationTime": datetime.datetime.now().isoformat(timespec="seconds")
+            }, f, indent=4)
+
+    @staticmethod
+    def build_ahk_script(config):
+        audio_enabled = ScriptGenerator.is_feature_enabled(config, 'AudioEnabled')
+        hl_enabled = ScriptGenerator.is_feature_enabled(config, 'HighlightEnabled')
+        click_fx_enabled = ScriptGenerator.is_feature_enabled(config, 'ClickFxEnabled')
+        spotlight_enabled = ScriptGenerator.is_feature_enabled(config, 'SpotlightEnabled')
+        # Profiles the engine switches between in place, None for ones that need their own script
+        profile_tables = config.get('Profiles') or []
+        multi_profile = sum(table is not None for table in profile_tables) > 1
         
         left_sound = ScriptGenerator.escape_path(config.get('LeftSoundPath', ''))
         right_sound = ScriptGenerator.escape_path(config.get('RightSoundPath', ''))
         
-        hl_color = QColor(config.get('HighlightColorHex', '#FFFF00'))
-        left_click_color = QColor(config.get('LeftClickColorHex', '#00FFFF'))
-        right_click_color = QColor(config.get('RightClickColorHex', '#FF00FF'))
-        
         hl_size = config.get('HighlightSize', 60)
-        hl_thickness = config.get('HighlightThickness', 0)
-        hl_opacity = config.get('HighlightOpacity', 50)
         
         left_click_shape = config.get('LeftClickShape', 'Circle Ripple')
         right_click_shape = config.get('RightClickShape', 'Circle Ripple')
         
-        refresh_rate_idx = config.get('RefreshRateIndex', 1)
-        refresh_map = {0: 33, 1: 16, 2: 7}
-        refresh_rate_ms = refresh_map.get(refresh_rate_idx, 16)
+        # Every visual effect runs from one UpdateEffects tick; it ticks at the fastest enabled
+        # effect rate and slower effects run every n-th frame
+        effect_rates = {effect: ScriptGenerator.get_effect_rate_ms(config, effect) for effect, enabled in
+                        (("highlight", hl_enabled), ("clicks", click_fx_enabled), ("spotlight", spotlight_enabled)) if enabled}
+        refresh_rate_ms = min(effect_rates.values(), default=ScriptGenerator.get_refresh_rate_ms(config))
+        has_tick = bool(effect_rates)
+        # Under load the governor slows the tick down, at most to MinRefreshRateIndex
+        min_rate_ms = ScriptGenerator.REFRESH_MAP.get(config.get('MinRefreshRateIndex', 0), 33)
+        rate_ladder = sorted(rate for rate in set(ScriptGenerator.REFRESH_MAP.values()) if refresh_rate_ms <= rate <= min_rate_ms)
+        governed = has_tick and config.get('AdaptiveRate', True) and len(rate_ladder) > 1
+        # Per-frame timings and resource counts for the app's Diagnostics page
+        telemetry = has_tick and config.get('TelemetryEnabled', True)
+        # Cursor-following overlays lead the sampled position by up to one frame interval
+        prediction_strength = max(0, min(100, int(config.get('PredictionStrength', 0))))
+        predicted = (hl_enabled or click_fx_enabled) and has_tick and prediction_strength > 0
+        timed = governed or telemetry
+        # On battery (or with Windows battery saver on) the engine drops to a cheaper tier: a slower
+        # tick, no antialiasing and no spotlight animation
+        power_tiers = has_tick and config.get('BatterySaver', True)
+        battery_rate_ms = max(refresh_rate_ms, ScriptGenerator.REFRESH_MAP.get(config.get('BatteryRefreshRateIndex', 0), 33))
+        use_mouse_hook = config.get('TrackingMode', 'Polling') == 'Hook' and has_tick
+        # One layered window around the cursor composites highlight and clicks; the spotlight
+        # keeps its full-desktop window
+        unified = config.get('OverlayMode', 'Separate') == 'Unified' and (hl_enabled or click_fx_enabled)
+        # Everything pauses while a fullscreen app or one of the excluded processes is in front
+        excluded_processes = sorted({name.strip().lower() for name in config.get('ExcludedProcesses', []) if name.strip()})
+        pause_fullscreen = config.get('PauseOnFullscreen', False)
+        pausing = (has_tick or audio_enabled) and (pause_fullscreen or bool(excluded_processes))
         
         sync_sounds = config.get('SyncSounds', True)
         sync_visuals = config.get('SyncVisuals', True)
@@ -142,45 +402,57 @@ class ScriptGenerator:
         lines = []
         lines.append("; AutoHotkey v2 - MouseFX Engine")
         lines.append(f"; Generated by MouseFX Generator Python Port")
-        lines.append(f"; Generation Time: {datetime.datetime.now()}")
+        lines.append(f"; Config Hash: {ScriptGenerator.get_config_hash(config)}")
         lines.append("")
         lines.append("#Requires AutoHotkey v2.0")
         lines.append("#SingleInstance Force")
         lines.append('CoordMode "Mouse", "Screen"')
         lines.append('DllCall("SetThreadDpiAwarenessContext", "Ptr", -4, "Ptr")')
+        # Held for the lifetime of the process so the app can tell whether the engine is running
+        lines.append(f'DllCall("CreateMutex", "Ptr", 0, "Int", 0, "Str", "{EngineMonitor.MUTEX_NAME}", "Ptr")')
+        # Manual-reset event, set once load and warm-up are done; a replaced engine may still hold it set
+        lines.append(f'global engineReadyEvent := DllCall("CreateEvent", "Ptr", 0, "Int", 1, "Int", 0, "Str", "{EngineMonitor.READY_EVENT_NAME}", "Ptr")')
+        lines.append('DllCall("ResetEvent", "Ptr", engineReadyEvent)')
         lines.append("")
         
         lines.append("; CONFIGURATION")
-        lines.append(f"global audioEnabled := {str(audio_enabled).lower()}")
-        lines.append(f"global highlightEnabled := {str(hl_enabled).lower()}")
-        lines.append(f"global clickFxEnabled := {str(click_fx_enabled).lower()}")
-        lines.append(f"global spotlightEnabled := {str(spotlight_enabled).lower()}")
+        lines.append(f"global audioEnabled := {str(config.get('AudioEnabled', False)).lower()}")
+        lines.append(f"global highlightEnabled := {str(config.get('HighlightEnabled', False)).lower()}")
+        lines.append(f"global clickFxEnabled := {str(config.get('ClickFxEnabled', False)).lower()}")
+        lines.append(f"global spotlightEnabled := {str(config.get('SpotlightEnabled', False)).lower()}")
         lines.append("")
         
-        # Always define highlightRadius (needed by Static Circle even if highlight is disabled)
-        lines.append(f"global highlightRadius := {int(hl_size / 2)}")
-        
+        # Everything derived from the config is computed here and inlined as literals by the
+        # optimiser, so the per-frame code does no colour packing, sizing or easing math
+        hl_radius = int(hl_size / 2)
+        profile_values = ScriptGenerator.get_profile_values(config)
+        # Static Circle uses the highlight geometry even if highlight is disabled
+        profile_names = ["highlightRadius", "highlightGuiSize", "highlightGuiHalf"] if hl_enabled or click_fx_enabled else []
         if hl_enabled:
-            lines.append("; Highlight Config")
-            lines.append(f"global highlightColor := 0x{ScriptGenerator.color_to_bgr(hl_color)}")
-            lines.append(f"global highlightThickness := {int(hl_thickness)}")
-            lines.append(f"global highlightOpacity := {int(hl_opacity * 2.55)}")
+            profile_names += ["highlightArgb", "highlightThickness"]
+        if click_fx_enabled:
+            profile_names += ["leftClickRgb", "leftClickArgb", "rightClickRgb", "rightClickArgb"]
+        constants = {}
+        # A profile switch or a live edit from the app replaces these, so they stay globals
+        # instead of being inlined
+        if profile_names:
+            lines.append("; Profile Values")
+            for name in profile_names:
+                lines.append(f"global {name} := {quote(profile_values[name])}")
             lines.append("")
             
         if click_fx_enabled:
-            lines.append("; Click FX Config")
-            lines.append(f"global leftClickColor := 0x{ScriptGenerator.color_to_bgr(left_click_color)}")
-            lines.append(f"global leftClickShape := \"{left_click_shape}\"")
+            click_frames = ScriptGenerator.get_click_frames(config)
+            constants["clickAnimationDuration"] = ScriptGenerator.CLICK_ANIMATION_DURATION
+            constants["clickFrameCount"] = len(click_frames)
+            constants["clickFrameSize"] = ScriptGenerator.CLICK_ANIMATION_MAX_RADIUS * 2 + 10
             
-            if sync_visuals:
-                lines.append(f"global rightClickColor := 0x{ScriptGenerator.color_to_bgr(left_click_color)}")
-                lines.append(f"global rightClickShape := \"{left_click_shape}\"")
-            else:
-                lines.append(f"global rightClickColor := 0x{ScriptGenerator.color_to_bgr(right_click_color)}")
-                lines.append(f"global rightClickShape := \"{right_click_shape}\"")
-                
-            lines.append("global clickAnimationDuration := 300")
-            lines.append("global clickAnimationMaxRadius := 50")
+            lines.append("; Click FX Config")
+            lines.append(f"global clickAtlasFile := \"{ScriptGenerator.escape_path(config.get('ClickAtlasPath', ''))}\"")
+            # Live-drawing fallback: per-frame radius, alpha (pre-shifted into ARGB position) and window size
+            lines.append("global clickRadiusTable := [" + ", ".join(f"{radius:.2f}" for radius, _ in click_frames) + "]")
+            lines.append("global clickAlphaTable := [" + ", ".join(f"0x{opacity:02X}000000" for _, opacity in click_frames) + "]")
+            lines.append("global clickSizeTable := [" + ", ".join(str(max(10, int(radius * 2 + 10))) for radius, _ in click_frames) + "]")
             lines.append("")
             
         if audio_enabled:
@@ -192,38 +464,133 @@ class ScriptGenerator:
             else:
                 lines.append(f"global rightSoundFile := \"{right_sound}\"")
             
-            lines.append(f"global soundVolume := {volume * 10}")
+            # Preprocessed sounds already carry the master volume in their samples
+            sound_volume = 1000 if config.get('SoundGainApplied', False) else volume * 10
+            lines.append(f"global soundVolume := {sound_volume}")
+            # Volume already mixed into the samples, 1000 when they are untouched
+            lines.append(f"global soundBakedVolume := {volume * 10 if config.get('SoundGainApplied', False) else 1000}")
+            lines.append("global soundVoiceCount := 4")
             lines.append("global soundCounter := 0")
             lines.append("")
             
+        def spotlight_speed(speed, style):
+            if style == "Fade":
+                speed = max(1, int((speed / 200.0) * 30))
+            # Steps are tuned for a 10 ms timer, scale them to the spotlight's scheduled interval
+            spot_divisor = max(1, round(effect_rates["spotlight"] / refresh_rate_ms))
+            return max(1, round(speed * refresh_rate_ms * spot_divisor / 10))
+        
         if spotlight_enabled:
             lines.append("; Spotlight Config")
             lines.append(f"global spotlightRadius := {spot_radius}")
-            final_speed = spot_anim_speed
-            if spot_anim_style == "Fade":
-                final_speed = max(1, int((spot_anim_speed / 200.0) * 30))
-            lines.append(f"global spotlightAnimSpeed := {final_speed}")
+            lines.append(f"global spotlightAnimSpeed := {spotlight_speed(spot_anim_speed, spot_anim_style)}")
             lines.append(f"global spotlightOpacity := {spot_opacity}")
             lines.append(f"global spotlightColor := \"{ScriptGenerator.color_to_rgb_str(spot_color)}\"")
             lines.append(f"global spotlightAnimStyle := \"{spot_anim_style}\"")
             lines.append("")
             
         lines.append(f"global refreshRate := {refresh_rate_ms}")
+        if has_tick and not use_mouse_hook:
+            # Idle after ~500 ms without movement or animation, then poll at 10 Hz
+            lines.append("global idleRefreshRate := 100")
+            lines.append(f"global idleFrameThreshold := {max(1, 500 // refresh_rate_ms)}")
+            lines.append("global effectsIdle := false")
+            lines.append("global idleTicks := 0")
+        if has_tick:
+            lines.append("global frameCount := 0")
+            lines.append("global scheduleTable := []")
+            lines.append("global scheduleByName := Map()")
+            lines.append("global deferredTasks := []")
+            lines.append("global mouseX := 0")
+            lines.append("global mouseY := 0")
+            lines.append("global cursorShowing := 1")
+            lines.append("global lastMouseX := 0")
+            lines.append("global lastMouseY := 0")
+            lines.append("global lastCursorShowing := 1")
+        if timed:
+            lines.append("global frameDueQpc := 0")
+        if governed:
+            # Frame intervals the governor steps between, fastest first
+            lines.append("global rateLadder := [" + ", ".join(str(rate) for rate in rate_ladder) + "]")
+            lines.append("global rateLevel := 1")
+            lines.append("global governorFrames := 0")
+            lines.append("global governorOverruns := 0")
+            lines.append("global governorPeakWork := 0")
+            lines.append("global governorCalmWindows := 0")
+            lines.append("global timerQuantum := TimerQuantumMs()")
+            constants["governorWindow"] = 30
+        if predicted:
+            constants["predictLead"] = prediction_strength / 100
+        if telemetry:
+            lines.append("global drawCallCount := 0")
+            lines.append(f'global engineTelemetry := TelemetryRing("{TelemetryReader.ENGINE_NAME}", {TelemetryReader.CAPACITY})')
+        if power_tiers:
+            lines.append("global powerSaving := false")
+            constants["batteryRefreshRate"] = battery_rate_ms
+        if pausing:
+            lines.append("global effectsPaused := false")
+            lines.append("global foregroundPid := 0")
+            lines.append("global foregroundMoveHook := 0")
+            if excluded_processes:
+                constants["excludedProcesses"] = "|" + "|".join(excluded_processes) + "|"
         lines.append("")
         
         lines.append("; GUI INIT")
-        if hl_enabled:
+        if hl_enabled or click_fx_enabled:
+            lines.append("; One GDI+ session for every surface, shut down on exit after they release their objects")
+            lines.append("global gdipToken := StartGdiplus()")
+            lines.append("OnExit(ShutdownGdiplus)")
+        if unified:
+            lines.append('global overlayGui := Gui("+AlwaysOnTop -Caption +ToolWindow +E0x80000 +E0x20")')
+            lines.append('overlayGui.Show("NA w1 h1")')
+            lines.append('global overlaySurface := LayeredSurface(overlayGui)')
+            lines.append('global overlayVisible := true')
+            if hl_enabled:
+                # Rendered once off-screen and blended into the overlay every frame
+                lines.append('global highlightSprite := LayeredSurface()')
+                lines.append('global highlightDirty := true')
+            lines.append("")
+        elif hl_enabled:
             lines.append('global highlightGui := Gui("+AlwaysOnTop -Caption +ToolWindow +E0x80000 +E0x20")')
             lines.append('highlightGui.Show("NA w100 h100")')
+            lines.append('global highlightSurface := LayeredSurface(highlightGui)')
+            lines.append('global highlightDirty := true')
+            lines.append('global highlightHidden := false')
             lines.append("")
             
         if click_fx_enabled:
-            lines.append('global clickGui := Gui("+AlwaysOnTop -Caption +ToolWindow +E0x80000 +E0x20")')
+            # Fixed pool of pre-created ripple windows so overlapping clicks each keep their animation
+            lines.append('global clickPoolSize := 6')
             lines.append('global isAnimating := false')
-            lines.append('global animationStartTime := 0')
-            lines.append('global clickType := ""')
-            lines.append('global clickX := 0')
-            lines.append('global clickY := 0')
+            slot_arrays = ["Active", "Start", "Type", "X", "Y"]
+            slot_defaults = {"Active": "false", "Type": '""'}
+            if unified:
+                # Slots only hold state here; their frame and size are drawn into the overlay
+                slot_arrays += ["Frame", "Size"]
+            else:
+                lines.append('global clickSlotGui := []')
+                lines.append('global clickSlotSurface := []')
+            for name in slot_arrays:
+                lines.append(f'global clickSlot{name} := []')
+            lines.append('Loop clickPoolSize {')
+            if not unified:
+                lines.append('    slotGui := Gui("+AlwaysOnTop -Caption +ToolWindow +E0x80000 +E0x20")')
+                lines.append('    clickSlotGui.Push(slotGui)')
+                lines.append('    clickSlotSurface.Push(LayeredSurface(slotGui))')
+            for name in slot_arrays:
+                lines.append(f'    clickSlot{name}.Push({slot_defaults.get(name, "0")})')
+            lines.append('}')
+            lines.append('global clickAtlas := LoadClickAtlas(clickAtlasFile)')
+            lines.append('global clickAtlasLoaded := clickAtlas.Length >= 2')
+            lines.append("")
+            
+        if audio_enabled:
+            lines.append("; Click sounds are loaded once and played from memory")
+            lines.append("global leftSoundPool := SoundVoicePool(leftSoundFile, soundVoiceCount, soundVolume)")
+            if sync_sounds:
+                lines.append("global rightSoundPool := leftSoundPool")
+            else:
+                lines.append("global rightSoundPool := (rightSoundFile = leftSoundFile) ? leftSoundPool : SoundVoicePool(rightSoundFile, soundVoiceCount, soundVolume)")
             lines.append("")
             
         if spotlight_enabled:
@@ -232,6 +599,77 @@ class ScriptGenerator:
             lines.append('global spCurrentOpacity := 0')
             lines.append('global spTargetState := 0')
             lines.append('global spMaxDist := 0')
+            lines.append('global spLastX := 0')
+            lines.append('global spLastY := 0')
+            lines.append('global spLastRadius := -1')
+            lines.append('global spFollowing := false')
+            lines.append('global spAnimating := false')
+            lines.append("")
+            lines.append("; Virtual desktop bounds are cached and only re-read when the display layout or DPI changes")
+            lines.append("global screenLeft := 0")
+            lines.append("global screenTop := 0")
+            lines.append("global screenWidth := 0")
+            lines.append("global screenHeight := 0")
+            lines.append("RefreshScreenMetrics()")
+            lines.append("OnMessage(0x7E, OnDisplayChange)  ; WM_DISPLAYCHANGE")
+            lines.append("OnMessage(0x2E0, OnDisplayChange)  ; WM_DPICHANGED")
+            lines.append("")
+            
+        if multi_profile:
+            # One table per stored profile with every value ApplyProfile swaps in; sounds and
+            # atlases are loaded here so a switch never touches the disk
+            lines.append("; PROFILES")
+            lines.append(f"global activeProfile := {config.get('ActiveProfile', 0) + 1}")
+            lines.append("global profileTables := []")
+            loaded = {}
+            if audio_enabled:
+                loaded[("sound", left_sound, sound_volume)] = "leftSoundPool"
+                loaded.setdefault(("sound", left_sound if sync_sounds else right_sound, sound_volume), "rightSoundPool")
+            if click_fx_enabled:
+                loaded[("atlas", ScriptGenerator.escape_path(config.get('ClickAtlasPath', '')))] = "clickAtlas"
+            for index, table in enumerate(profile_tables):
+                if table is None:
+                    lines.append('profileTables.Push("")')
+                    continue
+                fields = [f"{flag}: {str(table.get(key, False)).lower()}" for flag, key in
+                          (("audioEnabled", "AudioEnabled"), ("highlightEnabled", "HighlightEnabled"),
+                           ("clickFxEnabled", "ClickFxEnabled"), ("spotlightEnabled", "SpotlightEnabled"))]
+                values = ScriptGenerator.get_profile_values(dict(table, SyncVisuals=sync_visuals))
+                fields += [f"{name}: {quote(values[name])}" for name in profile_names]
+                # Resources this table shares with one of its own fields are linked after the Push
+                links = []
+
+                def resource(key, field, load):
+                    if key not in loaded:
+                        loaded[key] = f"profileTables[{index + 1}].{field}"
+                        return f"{field}: {load}"
+                    if loaded[key].startswith(f"profileTables[{index + 1}]."):
+                        links.append(f"profileTables[{index + 1}].{field} := {loaded[key]}")
+                        return f'{field}: ""'
+                    return f"{field}: {loaded[key]}"
+                if audio_enabled:
+                    table_left = ScriptGenerator.escape_path(table.get('LeftSoundPath', ''))
+                    table_right = table_left if table.get('SyncSounds', True) else ScriptGenerator.escape_path(table.get('RightSoundPath', ''))
+                    table_volume = 1000 if table.get('SoundGainApplied', False) else table.get('MasterVolume', 80) * 10
+                    table_baked = table.get('MasterVolume', 80) * 10 if table.get('SoundGainApplied', False) else 1000
+                    fields += [f'leftSoundFile: "{table_left}"', f'rightSoundFile: "{table_right}"',
+                               f"soundVolume: {table_volume}", f"soundBakedVolume: {table_baked}"]
+                    fields.append(resource(("sound", table_left, table_volume), "leftSoundPool",
+                                           f'SoundVoicePool("{table_left}", soundVoiceCount, {table_volume})'))
+                    fields.append(resource(("sound", table_right, table_volume), "rightSoundPool",
+                                           f'SoundVoicePool("{table_right}", soundVoiceCount, {table_volume})'))
+                if click_fx_enabled:
+                    table_atlas = ScriptGenerator.escape_path(table.get('ClickAtlasPath', ''))
+                    fields.append(resource(("atlas", table_atlas), "clickAtlas", f'LoadClickAtlas("{table_atlas}")'))
+                if spotlight_enabled:
+                    table_style = table.get('SpotlightAnimStyle', 'Zoom')
+                    fields += [f"spotlightRadius: {table.get('SpotlightRadius', 200)}",
+                               f"spotlightAnimSpeed: {spotlight_speed(table.get('SpotlightAnimSpeed', 20), table_style)}",
+                               f"spotlightOpacity: {table.get('SpotlightOpacity', 180)}",
+                               f'spotlightColor: "{ScriptGenerator.color_to_rgb_str(QColor(table.get("SpotlightColorHex", "#000000")))}"',
+                               f'spotlightAnimStyle: "{table_style}"']
+                lines.append("profileTables.Push({" + ", ".join(fields) + "})")
+                lines.extend(links)
             lines.append("")
             
         lines.append("; HOTKEYS")
@@ -241,12 +679,21 @@ class ScriptGenerator:
             if ahk_key:
                 lines.append(f"{ahk_key}::{func_name}()")
                 
+        if multi_profile:
+            for index, table in enumerate(profile_tables):
+                ahk_key = ScriptGenerator.convert_hotkey(ScriptGenerator.PROFILE_HOTKEY.format(index + 1))
+                if table is not None and ahk_key:
+                    lines.append(f"{ahk_key}::ApplyProfile({index + 1})")
         if audio_enabled: add_hotkey(hk_sound, "ToggleAudio")
         if hl_enabled: add_hotkey(hk_hl, "ToggleHighlight")
         if click_fx_enabled: add_hotkey(hk_click, "ToggleClickFx")
         if spotlight_enabled: add_hotkey(hk_spotlight, "ToggleSpotlight")
         lines.append("")
         
+        if pausing:
+            # Clicks only reach the fullscreen or excluded app while paused; the hotkeys above
+            # keep working there so effects can be switched on and off during a presentation
+            lines.append("#HotIf !effectsPaused")
         lines.append("~LButton::{")
         if click_fx_enabled: lines.append('    ShowClickAnimation("left")')
         if audio_enabled: lines.append('    PlayClickSound("left")')
@@ -257,59 +704,555 @@ class ScriptGenerator:
         if click_fx_enabled: lines.append('    ShowClickAnimation("right")')
         if audio_enabled: lines.append('    PlayClickSound("right")')
         lines.append("}")
+        if pausing:
+            lines.append("#HotIf")
         lines.append("")
         
+        if has_tick:
+            # (name, update function, interval, priority, runs again when the cursor moves)
+            schedule = []
+            if unified:
+                overlay_ms = min(rate for effect, rate in effect_rates.items() if effect != "spotlight")
+                schedule.append(("overlay", "ComposeOverlay", overlay_ms, 10, "true"))
+            else:
+                if hl_enabled:
+                    schedule.append(("highlight", "UpdateHighlight", effect_rates["highlight"], 10, "true"))
+                if click_fx_enabled:
+                    schedule.append(("clicks", "UpdateClickAnimation", effect_rates["clicks"], 20, "false"))
+            if spotlight_enabled:
+                schedule.append(("spotlight", "UpdateSpotlightEffect", effect_rates["spotlight"], 30, "true"))
+            lines.append("; FRAME SCHEDULE")
+            for name, func, interval, priority, follows_cursor in schedule:
+                divisor = max(1, round(interval / refresh_rate_ms))
+                lines.append(f'RegisterEffect("{name}", {func}, {divisor}, {priority}, {follows_cursor})')
+            lines.append("")
+            
         if hl_enabled or click_fx_enabled:
+            lines.append("WarmStart()")
+            lines.append("")
+            
+        if use_mouse_hook:
+            lines.append("; Event-driven tracking: mouse movement schedules frames, capped at refreshRate")
+            lines.append("global framePending := false")
+            lines.append("global lastFrameTick := 0")
+            lines.append("global mouseHookCallback := CallbackCreate(LowLevelMouseProc, \"F\", 3)")
+            lines.append("global mouseHook := DllCall(\"SetWindowsHookEx\", \"Int\", 14, \"Ptr\", mouseHookCallback, \"Ptr\", DllCall(\"GetModuleHandle\", \"Ptr\", 0, \"Ptr\"), \"UInt\", 0, \"Ptr\")")
+            lines.append("global cursorEventCallback := CallbackCreate(OnCursorVisibilityChange, \"F\", 7)")
+            lines.append("global cursorEventHook := DllCall(\"SetWinEventHook\", \"UInt\", 0x8002, \"UInt\", 0x8003, \"Ptr\", 0, \"Ptr\", cursorEventCallback, \"UInt\", 0, \"UInt\", 0, \"UInt\", 0, \"Ptr\")")
+            lines.append("OnExit(RemoveMouseHooks)")
+            lines.append("RequestFrame()")
+        elif has_tick:
             lines.append(f"SetTimer(UpdateEffects, {refresh_rate_ms})")
             
+        if pausing:
+            lines.append("; Foreground changes arrive as WinEvents instead of being polled")
+            lines.append("global foregroundCallback := CallbackCreate(OnForegroundEvent, \"F\", 7)")
+            lines.append("global foregroundHook := DllCall(\"SetWinEventHook\", \"UInt\", 0x3, \"UInt\", 0x3, \"Ptr\", 0, \"Ptr\", foregroundCallback, \"UInt\", 0, \"UInt\", 0, \"UInt\", 0x2, \"Ptr\")")
+            lines.append("OnExit(RemoveForegroundHooks)")
+            lines.append("CheckForeground()")
+            
+        if power_tiers:
+            lines.append("OnMessage(0x218, OnPowerBroadcast)  ; WM_POWERBROADCAST")
+            lines.append("CheckPowerStatus()")
+            
+        lines.append("; Control channel: the app toggles effects and queries status without a restart")
+        lines.append(f'global controlGui := Gui("+ToolWindow -Caption", "{EngineClient.WINDOW_TITLE}")')
+        lines.append("OnMessage(0x4A, OnControlMessage)  ; WM_COPYDATA")
+        lines.append('DllCall("SetEvent", "Ptr", engineReadyEvent)')
         lines.append('ToolTip("MouseFX Engine Started!")')
-        lines.append('SetTimer(() => ToolTip(), -2000)')
+        lines.append('Defer(() => ToolTip(), 2000)')
         lines.append("")
         
         lines.append("; FUNCTIONS")
         
+        # Set<Effect>Enabled is shared by the hotkeys and the control channel
+        def add_toggle(effect, flag, label):
+            lines.append(f"Toggle{effect}() {{")
+            lines.append(f"    global {flag}")
+            lines.append(f"    Set{effect}Enabled(!{flag})")
+            lines.append(f'    ToolTip("{label}: " . ({flag} ? "ON" : "OFF"))')
+            lines.append('    Defer(() => ToolTip(), 1000)')
+            lines.append("}")
+        
         if audio_enabled:
-            lines.append("ToggleAudio() {")
+            lines.append("SetAudioEnabled(on) {")
             lines.append("    global audioEnabled")
-            lines.append("    audioEnabled := !audioEnabled")
-            lines.append('    ToolTip("Audio Effects: " . (audioEnabled ? "ON" : "OFF"))')
-            lines.append('    SetTimer(() => ToolTip(), -1000)')
+            lines.append("    audioEnabled := on")
             lines.append("}")
+            add_toggle("Audio", "audioEnabled", "Audio Effects")
             
-        if hl_enabled:
-            lines.append("ToggleHighlight() {")
-            lines.append("    global highlightEnabled, highlightGui")
-            lines.append("    highlightEnabled := !highlightEnabled")
+        if hl_enabled and unified:
+            lines.append("SetHighlightEnabled(on) {")
+            lines.append("    global highlightEnabled")
+            lines.append("    highlightEnabled := on")
+            lines.append("    ; The overlay adds or drops the halo on its next frame")
+            lines.append('    MarkEffectDirty("overlay")')
+            lines.append("}")
+            add_toggle("Highlight", "highlightEnabled", "Highlight")
+        elif hl_enabled:
+            lines.append("SetHighlightEnabled(on) {")
+            lines.append("    global highlightEnabled, highlightGui, highlightDirty" + (", effectsPaused" if pausing else ""))
+            lines.append("    highlightEnabled := on")
             lines.append("    if (!highlightEnabled) {")
             lines.append("        highlightGui.Hide()")
+            if pausing:
+                # A paused engine shows the halo again when it resumes
+                lines.append("    } else if (!effectsPaused) {")
+            else:
+                lines.append("    } else {")
+            lines.append('        highlightGui.Show("NA")')
+            lines.append("        highlightDirty := true")
+            lines.append('        MarkEffectDirty("highlight")')
             lines.append("    }")
-            lines.append('    ToolTip("Highlight: " . (highlightEnabled ? "ON" : "OFF"))')
-            lines.append('    SetTimer(() => ToolTip(), -1000)')
             lines.append("}")
+            add_toggle("Highlight", "highlightEnabled", "Highlight")
             
         if click_fx_enabled:
-            lines.append("ToggleClickFx() {")
-            lines.append("    global clickFxEnabled, clickGui")
-            lines.append("    clickFxEnabled := !clickFxEnabled")
+            lines.append("SetClickFxEnabled(on) {")
+            if unified:
+                lines.append("    global clickFxEnabled, isAnimating, clickPoolSize, clickSlotActive")
+            else:
+                lines.append("    global clickFxEnabled, isAnimating, clickPoolSize, clickSlotGui, clickSlotActive")
+            lines.append("    clickFxEnabled := on")
             lines.append("    if (!clickFxEnabled) {")
-            lines.append("        clickGui.Hide()")
+            lines.append("        isAnimating := false")
+            lines.append("        Loop clickPoolSize {")
+            lines.append("            clickSlotActive[A_Index] := false")
+            if not unified:
+                lines.append("            clickSlotGui[A_Index].Hide()")
+            lines.append("        }")
+            if unified:
+                lines.append('        MarkEffectDirty("overlay")')
+            lines.append("    }")
+            lines.append("}")
+            add_toggle("ClickFx", "clickFxEnabled", "Click Effects")
+            
+        if pausing:
+            lines.append("""
+; EVENT_SYSTEM_FOREGROUND, and EVENT_OBJECT_LOCATIONCHANGE for the foreground process so a
+; window entering or leaving fullscreen without a focus change is noticed too
+OnForegroundEvent(hWinEventHook, event, hwnd, idObject, idChild, idEventThread, eventTime) {
+    if (event == 0x3 || (idObject == 0 && hwnd == DllCall("GetForegroundWindow", "Ptr"))) {
+        CheckForeground()
+    }
+}
+
+CheckForeground() {
+    global foregroundPid, foregroundMoveHook, foregroundCallback
+    hwnd := DllCall("GetForegroundWindow", "Ptr")
+    DllCall("GetWindowThreadProcessId", "Ptr", hwnd, "UInt*", &pid := 0)
+    if (pid != foregroundPid) {
+        foregroundPid := pid
+        if (foregroundMoveHook) {
+            DllCall("UnhookWinEvent", "Ptr", foregroundMoveHook)
+        }
+        foregroundMoveHook := pid ? DllCall("SetWinEventHook", "UInt", 0x800B, "UInt", 0x800B, "Ptr", 0, "Ptr", foregroundCallback, "UInt", pid, "UInt", 0, "UInt", 0x2, "Ptr") : 0
+    }
+    SetEffectsPaused(ShouldPause(hwnd))
+}
+
+RemoveForegroundHooks(*) {
+    global foregroundHook, foregroundMoveHook
+    DllCall("UnhookWinEvent", "Ptr", foregroundHook)
+    if (foregroundMoveHook) {
+        DllCall("UnhookWinEvent", "Ptr", foregroundMoveHook)
+    }
+}
+""")
+            should_pause = ["ShouldPause(hwnd) {",
+                            "    if (!hwnd) {",
+                            "        return false",
+                            "    }"]
+            if excluded_processes:
+                should_pause += ["    try {",
+                                 '        if (InStr(excludedProcesses, "|" WinGetProcessName("ahk_id " hwnd) "|")) {',
+                                 "            return true",
+                                 "        }",
+                                 "    }"]
+            if pause_fullscreen:
+                # Not QUNS_PRESENTATION_MODE (4): presenting is when the cursor effects are wanted most
+                should_pause += ["    ; QUNS_BUSY or QUNS_RUNNING_D3D_FULL_SCREEN",
+                                 '    if (!DllCall("shell32\\SHQueryUserNotificationState", "Int*", &state := 0) && state >= 2 && state <= 3) {',
+                                 "        return true",
+                                 "    }",
+                                 "    return IsFullscreenWindow(hwnd)"]
+            else:
+                should_pause.append("    return false")
+            should_pause.append("}")
+            lines.append("\n".join(should_pause) + "\n")
+            if pause_fullscreen:
+                lines.append("""
+; Borderless and exclusive fullscreen windows cover their whole monitor; the desktop does too.
+; So do maximized windows once the taskbar auto-hides, but those keep a caption or sizing frame,
+; or at least their maximized state
+IsFullscreenWindow(hwnd) {
+    static RECT := Buffer(16, 0)
+    static MONITORINFO := Buffer(40, 0)
+    try {
+        windowClass := WinGetClass("ahk_id " hwnd)
+        ; WS_CAPTION | WS_THICKFRAME
+        framed := WinGetStyle("ahk_id " hwnd) & 0xC40000
+        maximized := WinGetMinMax("ahk_id " hwnd) == 1
+    } catch {
+        return false
+    }
+    if (framed || maximized || windowClass == "Progman" || windowClass == "WorkerW" || !DllCall("GetWindowRect", "Ptr", hwnd, "Ptr", RECT)) {
+        return false
+    }
+    NumPut("UInt", MONITORINFO.Size, MONITORINFO, 0)
+    DllCall("GetMonitorInfo", "Ptr", DllCall("MonitorFromWindow", "Ptr", hwnd, "UInt", 2, "Ptr"), "Ptr", MONITORINFO)
+    coversLeft := NumGet(RECT, 0, "Int") <= NumGet(MONITORINFO, 4, "Int") && NumGet(RECT, 4, "Int") <= NumGet(MONITORINFO, 8, "Int")
+    coversRight := NumGet(RECT, 8, "Int") >= NumGet(MONITORINFO, 12, "Int") && NumGet(RECT, 12, "Int") >= NumGet(MONITORINFO, 16, "Int")
+    return coversLeft && coversRight
+}
+""")
+            pause, resume = [], []
+            if has_tick and not use_mouse_hook:
+                # No tick while paused; it only comes back for deferred tasks and on resume
+                pause.append("        SetTimer(UpdateEffects, 0)")
+                pause.append("        ScheduleDeferredTasks()")
+            if hl_enabled and unified:
+                pause.append("        overlayGui.Hide()")
+                pause.append("        overlayVisible := false")
+            elif hl_enabled:
+                pause.append("        highlightGui.Hide()")
+                pause.append("        highlightHidden := true")
+            if click_fx_enabled:
+                pause.append("        isAnimating := false")
+                pause.append("        Loop clickPoolSize {")
+                pause.append("            clickSlotActive[A_Index] := false")
+                if not unified:
+                    pause.append("            clickSlotGui[A_Index].Hide()")
+                pause.append("        }")
+                if unified and not hl_enabled:
+                    pause.append("        overlayGui.Hide()")
+                    pause.append("        overlayVisible := false")
+            if spotlight_enabled:
+                pause.append("        if IsSet(spotlightGui) {")
+                pause.append("            spotlightGui.Hide()")
+                pause.append("        }")
+                resume.append("        if IsSet(spotlightGui) {")
+                resume.append('            spotlightGui.Show("NA")')
+                resume.append("        }")
+            if has_tick:
+                resume.append("        ; Every overlay was hidden, so each one redraws")
+                resume.append("        for effect in scheduleTable {")
+                resume.append("            effect.dirty := true")
+                resume.append("        }")
+            if use_mouse_hook:
+                resume.append("        RequestFrame()")
+            elif has_tick:
+                resume.append("        effectsIdle := false")
+                resume.append("        idleTicks := 0")
+                resume.append("        SetTimer(UpdateEffects, refreshRate)")
+                if timed:
+                    resume.append("        frameDueQpc := 0")
+            names = ["effectsPaused", "scheduleTable", "effectsIdle", "idleTicks", "refreshRate", "frameDueQpc",
+                     "highlightGui", "highlightHidden", "overlayGui", "overlayVisible", "clickPoolSize",
+                     "clickSlotGui", "clickSlotActive", "isAnimating", "spotlightGui"]
+            body = "\n".join(pause + resume)
+            lines.append("SetEffectsPaused(paused) {")
+            lines.append("    global " + ", ".join(name for name in names if name == "effectsPaused" or name in body))
+            lines.append("    if (effectsPaused == !!paused) {")
+            lines.append("        return")
+            lines.append("    }")
+            lines.append("    effectsPaused := !!paused")
+            for branch, body in (("if (effectsPaused) {", pause), ("} else {", resume)):
+                if body:
+                    lines.append(f"    {branch}")
+                    lines.extend(body)
+            if pause or resume:
+                lines.append("    }")
+            lines.append("}")
+            lines.append("")
+            
+        if power_tiers:
+            lines.append("""
+OnPowerBroadcast(wParam, *) {
+    ; PBT_APMPOWERSTATUSCHANGE: plugged in or out, or battery saver switched
+    if (wParam == 0xA) {
+        CheckPowerStatus()
+    }
+}
+
+CheckPowerStatus() {
+    static SYSTEM_POWER_STATUS := Buffer(12, 0)
+    if (DllCall("GetSystemPowerStatus", "Ptr", SYSTEM_POWER_STATUS)) {
+        ; ACLineStatus offline, or SystemStatusFlag (battery saver) on
+        SetPowerSaving(NumGet(SYSTEM_POWER_STATUS, 0, "UChar") == 0 || NumGet(SYSTEM_POWER_STATUS, 3, "UChar") == 1)
+    }
+}
+""")
+            saving = []
+            if hl_enabled or click_fx_enabled:
+                # SmoothingModeNone (3) / SmoothingModeAntiAlias (4)
+                saving.append("    LayeredSurface.SetSmoothingMode(powerSaving ? 3 : 4)")
+            if hl_enabled:
+                saving.append("    ; The halo is pre-rendered, so it has to be drawn again in the new mode")
+                saving.append("    highlightDirty := true")
+                saving.append('    MarkEffectDirty("overlay")' if unified else '    MarkEffectDirty("highlight")')
+            if battery_rate_ms > refresh_rate_ms:
+                full_rate = "rateLadder[rateLevel]" if governed else str(refresh_rate_ms)
+                saving.append(f"    refreshRate := powerSaving ? batteryRefreshRate : {full_rate}")
+                if timed:
+                    saving.append("    frameDueQpc := 0")
+                if not use_mouse_hook:
+                    saving.append("    idleFrameThreshold := Max(1, 500 // refreshRate)")
+                    saving.append("    if (!effectsIdle" + (" && !effectsPaused" if pausing else "") + ") {")
+                    saving.append("        SetTimer(UpdateEffects, refreshRate)")
+                    saving.append("    }")
+            names = ["powerSaving", "highlightDirty", "refreshRate", "rateLadder", "rateLevel", "frameDueQpc",
+                     "idleFrameThreshold", "effectsIdle", "effectsPaused"]
+            body = "\n".join(saving)
+            lines.append("; Switches between the full and the battery tier without restarting the engine")
+            lines.append("SetPowerSaving(on) {")
+            lines.append("    global " + ", ".join(name for name in names if name == "powerSaving" or name in body))
+            lines.append("    if (powerSaving == !!on) {")
+            lines.append("        return")
             lines.append("    }")
-            lines.append('    ToolTip("Click Effects: " . (clickFxEnabled ? "ON" : "OFF"))')
-            lines.append('    SetTimer(() => ToolTip(), -1000)')
+            lines.append("    powerSaving := !!on")
+            lines.extend(saving)
             lines.append("}")
+            lines.append("")
+            
+        # Control channel commands, see EngineClient for the protocol
+        control = [("audio", audio_enabled, "audioEnabled", "SetAudioEnabled"),
+                   ("highlight", hl_enabled, "highlightEnabled", "SetHighlightEnabled"),
+                   ("clicks", click_fx_enabled, "clickFxEnabled", "SetClickFxEnabled"),
+                   ("spotlight", spotlight_enabled, "SpotlightShown()", "SetSpotlightShown")]
+        available = sum(EngineClient.AVAILABLE << i for i, (_, enabled, _, _) in enumerate(control) if enabled)
+        lines.append("EngineStatus() {")
+        lines.append("    global audioEnabled, highlightEnabled, clickFxEnabled")
+        lines.append(f"    status := 0x{EngineClient.STATUS_OK | available:X}")
+        for i, (effect, enabled, state, _) in enumerate(control):
+            if enabled:
+                lines.append(f"    if ({state}) {{")
+                lines.append(f"        status |= 0x{1 << i:X}")
+                lines.append("    }")
+        if multi_profile:
+            lines.append("    global activeProfile")
+            lines.append(f"    status |= activeProfile << {EngineClient.PROFILE_SHIFT}")
+        if pausing:
+            lines.append("    global effectsPaused")
+            lines.append("    if (effectsPaused) {")
+            lines.append(f"        status |= 0x{EngineClient.PAUSED:X}")
+            lines.append("    }")
+        lines.append("    return status")
+        lines.append("}")
+        lines.append("")
+        lines.append("; Returns false for effects this engine was generated without")
+        lines.append("ControlEffect(effect, command, value) {")
+        lines.append("    global audioEnabled, highlightEnabled, clickFxEnabled")
+        lines.append("    switch effect {")
+        for effect, enabled, state, setter in control:
+            if enabled:
+                lines.append(f'        case "{effect}":')
+                lines.append(f'            {setter}(command = "toggle" ? !{state} : value = "1")')
+        lines.append("        default:")
+        lines.append("            return false")
+        lines.append("    }")
+        lines.append("    return true")
+        lines.append("}")
+        lines.append(f"""
+; The app sends "<command> [args]" as UTF-16 text in WM_COPYDATA and gets EngineStatus()
+; back as the SendMessage result; 0 means the command was rejected
+OnControlMessage(wParam, lParam, msg, hwnd) {{
+    global controlGui
+    if (hwnd != controlGui.Hwnd || NumGet(lParam, 0, "UPtr") != {EngineClient.PROTOCOL}) {{
+        return
+    }}
+    text := StrGet(NumGet(lParam, 2 * A_PtrSize, "Ptr"), NumGet(lParam, A_PtrSize, "UInt") // 2, "UTF-16")
+    args := StrSplit(Trim(text), " ")
+    switch args[1] {{
+        case "status":
+        case "set", "toggle":
+            if (args.Length < 2 || !ControlEffect(args[2], args[1], args.Length >= 3 ? args[3] : "")) {{
+                return 0
+            }}
+""" + ("""        case "profile":
+            if (args.Length < 2 || !IsInteger(args[2]) || !ApplyProfile(Integer(args[2]))) {
+                return 0
+            }
+""" if multi_profile else "") + """        case "param":
+            if (args.Length < 3 || !SetParam(args[2], args[3])) {
+                return 0
+            }
+        default:
+            return 0
+    }
+    return EngineStatus()
+}
+""")
+            
+        if multi_profile:
+            apply = ["""
+; Swaps in every per-profile value from profileTables; false for profiles left out of this engine
+ApplyProfile(index) {
+    global activeProfile, profileTables"""]
+            if profile_names:
+                apply.append("""
+    global """ + ", ".join(profile_names))
+            if hl_enabled:
+                apply.append("""
+    global highlightDirty""")
+            if audio_enabled:
+                apply.append("""
+    global leftSoundFile, rightSoundFile, soundVolume, soundBakedVolume, leftSoundPool, rightSoundPool""")
+            if click_fx_enabled:
+                apply.append("""
+    global clickAtlas, clickAtlasLoaded""")
+            if spotlight_enabled:
+                apply.append("""
+    global spotlightEnabled, spotlightRadius, spotlightAnimSpeed, spotlightOpacity, spotlightColor, spotlightAnimStyle""")
+            apply.append("""
+    
+    if (index < 1 || index > profileTables.Length || !IsObject(profileTables[index])) {
+        return false
+    }
+    table := profileTables[index]
+    activeProfile := index
+""")
+            apply += [f"    {name} := table.{name}\n" for name in profile_names]
+            if hl_enabled:
+                apply.append("""    highlightDirty := true
+    SetHighlightEnabled(table.highlightEnabled)
+""")
+            if click_fx_enabled:
+                apply.append("""    clickAtlas := table.clickAtlas
+    clickAtlasLoaded := clickAtlas.Length >= 2
+    SetClickFxEnabled(table.clickFxEnabled)
+""")
+            if audio_enabled:
+                apply.append("""    leftSoundFile := table.leftSoundFile
+    rightSoundFile := table.rightSoundFile
+    soundVolume := table.soundVolume
+    soundBakedVolume := table.soundBakedVolume
+    leftSoundPool := table.leftSoundPool
+    rightSoundPool := table.rightSoundPool
+    ; Undoes a live volume edit on a pool this profile shares
+    leftSoundPool.SetVolume(soundVolume)
+    rightSoundPool.SetVolume(soundVolume)
+    SetAudioEnabled(table.audioEnabled)
+""")
+            if spotlight_enabled:
+                apply.append("""    if (!table.spotlightEnabled) {
+        SetSpotlightShown(false)
+    }
+    spotlightEnabled := table.spotlightEnabled
+    spotlightRadius := table.spotlightRadius
+    spotlightAnimSpeed := table.spotlightAnimSpeed
+    spotlightOpacity := table.spotlightOpacity
+    spotlightColor := table.spotlightColor
+    spotlightAnimStyle := table.spotlightAnimStyle
+    RestyleSpotlight()
+""")
+            apply.append("""    ToolTip("Profile " index)
+    Defer(() => ToolTip(), 1000)
+    return true
+}
+""")
+            lines.append("".join(apply))
+            
+        # "param <name> <value>" from the app: the same runtime values ApplyProfile swaps in,
+        # one at a time, followed by the same redraw
+        # Each entry: (name, assignment, follow-up lines, other globals they touch)
+        live = []
+        for name in profile_names:
+            if name in ("highlightGuiSize", "highlightGuiHalf"):
+                continue
+            # The window size follows the radius in the same command (see get_profile_values), so a
+            # frame never draws a radius that doesn't fit its window
+            derived, derived_names = [], []
+            if name == "highlightRadius":
+                derived = ["highlightGuiSize := highlightRadius * 2 + 10", "highlightGuiHalf := highlightRadius + 5"]
+                derived_names = ["highlightGuiSize", "highlightGuiHalf"]
+            if name.startswith("highlight") and hl_enabled:
+                live.append((name, f"{name} := Integer(value)",
+                             derived + ["highlightDirty := true", f'MarkEffectDirty("{"overlay" if unified else "highlight"}")'],
+                             derived_names + ["highlightDirty"]))
+            elif name.startswith("highlight"):
+                # Static Circle reads the geometry when it draws
+                live.append((name, f"{name} := Integer(value)", derived, derived_names))
+            else:
+                # The atlas was rendered in the old colours, ripples are drawn live until the next Apply
+                live.append((name, f"{name} := Integer(value)", ["clickAtlasLoaded := false"], ["clickAtlasLoaded"]))
+        if audio_enabled:
+            # The value is the level before any gain baked into the samples
+            live.append(("soundVolume", "soundVolume := Min(1000, Integer(value) * 1000 // Max(1, soundBakedVolume))",
+                         ["leftSoundPool.SetVolume(soundVolume)", "rightSoundPool.SetVolume(soundVolume)"],
+                         ["soundBakedVolume", "leftSoundPool", "rightSoundPool"]))
+        if spotlight_enabled:
+            live += [(name, f"{name} := Integer(value)", ["RestyleSpotlight()"], []) for name in ("spotlightRadius", "spotlightOpacity")]
+            live.append(("spotlightColor", "spotlightColor := value", ["RestyleSpotlight()"], []))
+        used = dict.fromkeys([entry[0] for entry in live] + [name for entry in live for name in entry[3]])
+        param = ["""
+; Live edits from the app; false for values this engine doesn't have
+SetParam(name, value) {"""]
+        if used:
+            param.append(f"""
+    global {", ".join(used)}""")
+        param.append("""
+    
+    if (name = "spotlightColor" ? !RegExMatch(value, "^[0-9A-Fa-f]{6}$") : !IsInteger(value)) {
+        return false
+    }
+    switch name {""")
+        for name, assign, refresh, _ in live:
+            param.append(f"""
+        case "{name}":
+            {assign}""" + "".join(f"""
+            {line}""" for line in refresh))
+        param.append("""
+        default:
+            return false
+    }
+    return true
+}
+""")
+        lines.append("".join(param))
             
         if spotlight_enabled:
             lines.append("""
+SpotlightShown() {
+    global spotlightGui, spTargetState
+    return IsSet(spotlightGui) && spTargetState == 1
+}
+
+SetSpotlightShown(on) {
+    if (SpotlightShown() != !!on) {
+        ToggleSpotlight()
+    }
+}
+
+; An open spotlight jumps straight to a new radius, opacity or colour
+RestyleSpotlight() {
+    global spotlightGui, spotlightRadius, spotlightOpacity, spotlightColor, spCurrentRadius, spCurrentOpacity, spLastRadius
+    if (!SpotlightShown()) {
+        return
+    }
+    spotlightGui.BackColor := spotlightColor
+    WinSetTransparent(spotlightOpacity, spotlightGui)
+    spCurrentRadius := spotlightRadius
+    spCurrentOpacity := spotlightOpacity
+    spLastRadius := -1
+    UpdateSpotlightRegion()
+}
+
 ToggleSpotlight() {
     global spotlightGui, spCurrentRadius, spTargetState, spMaxDist, spCurrentOpacity
     global spotlightRadius, spotlightColor, spotlightOpacity, spotlightAnimStyle
-    
-    vWidth := SysGet(78)
-    vHeight := SysGet(79)
-    spMaxDist := Sqrt(vWidth**2 + vHeight**2) + 50
+    global screenLeft, screenTop, screenWidth, screenHeight, spLastRadius
     
     if !IsSet(spotlightGui) {
-        spotlightGui := Gui("+AlwaysOnTop +ToolWindow -Caption +E0x20")
+""" + ("""        if (!spotlightEnabled || effectsPaused) {
+            ; Switched off by the active profile, or held back with the other effects
+            return
+        }
+""" if pausing else """        if (!spotlightEnabled) {
+            ; Switched off by the active profile
+            return
+        }
+""") + """        spotlightGui := Gui("+AlwaysOnTop +ToolWindow -Caption +E0x20")
         spotlightGui.BackColor := spotlightColor
         
         if (spotlightAnimStyle == "Fade") {
@@ -325,25 +1268,26 @@ ToggleSpotlight() {
             }
         }
         
-        vLeft := SysGet(76)
-        vTop := SysGet(77)
-        spotlightGui.Show("x" vLeft " y" vTop " w" vWidth " h" vHeight " NoActivate")
+        ; The window spans the virtual desktop
+        spLastRadius := -1
+        spotlightGui.Show("x" screenLeft " y" screenTop " w" screenWidth " h" screenHeight " NoActivate")
         
         spTargetState := 1
-        SetTimer(UpdateSpotlight, 10)
+        StartSpotlightAnimation()
     } else {
         if (spTargetState == 1) {
             spTargetState := 0
             if (spotlightAnimStyle == "None") {
+                StopSpotlightFollow()
+                StopSpotlightAnimation()
                 spotlightGui.Destroy()
                 spotlightGui := unset
-                SetTimer(UpdateSpotlight, 0)
             } else {
-                SetTimer(UpdateSpotlight, 10)
+                StartSpotlightAnimation()
             }
         } else {
             spTargetState := 1
-            SetTimer(UpdateSpotlight, 10)
+            StartSpotlightAnimation()
         }
     }
 }
@@ -352,443 +1296,2002 @@ UpdateSpotlight() {
     global spotlightGui, spCurrentRadius, spTargetState, spMaxDist, spCurrentOpacity
     global spotlightRadius, spotlightAnimSpeed, spotlightAnimStyle, spotlightOpacity
     
-    if !IsSet(spotlightGui)
+    if !IsSet(spotlightGui) {
+        StopSpotlightAnimation()
         return
+    }""" + ("""
+    global powerSaving
+    ; The battery tier skips the zoom/fade and settles in one step
+    step := powerSaving ? 0xFFFF : spotlightAnimSpeed""" if power_tiers else """
+    step := spotlightAnimSpeed""") + """
         
     if (spotlightAnimStyle == "Fade") {
         if (spTargetState == 1) {
             if (spCurrentOpacity < spotlightOpacity) {
-                spCurrentOpacity += spotlightAnimSpeed
+                spCurrentOpacity += step
                 if (spCurrentOpacity > spotlightOpacity)
                     spCurrentOpacity := spotlightOpacity
                 try WinSetTransparent(spCurrentOpacity, spotlightGui)
             }
         } else {
             if (spCurrentOpacity > 0) {
-                spCurrentOpacity -= spotlightAnimSpeed
+                spCurrentOpacity -= step
                 if (spCurrentOpacity <= 0) {
                     spotlightGui.Destroy()
                     spotlightGui := unset
-                    SetTimer(UpdateSpotlight, 0)
+                    StopSpotlightAnimation()
                     return
                 }
                 try WinSetTransparent(spCurrentOpacity, spotlightGui)
             }
         }
+        settled := (spTargetState == 1 && spCurrentOpacity >= spotlightOpacity)
     } else {
         if (spTargetState == 1) {
             if (spCurrentRadius > spotlightRadius) {
-                spCurrentRadius -= spotlightAnimSpeed
+                spCurrentRadius -= step
                 if (spCurrentRadius < spotlightRadius)
                     spCurrentRadius := spotlightRadius
             }
         } else {
             if (spCurrentRadius < spMaxDist) {
-                spCurrentRadius += spotlightAnimSpeed
+                spCurrentRadius += step
                 if (spCurrentRadius >= spMaxDist) {
                     spotlightGui.Destroy()
                     spotlightGui := unset
-                    SetTimer(UpdateSpotlight, 0)
+                    StopSpotlightAnimation()
                     return
                 }
             }
         }
+        settled := (spTargetState == 1 && spCurrentRadius <= spotlightRadius)
+    }
+    
+    UpdateSpotlightRegion()
+    
+    ; Zoom/fade reached its target: stop animating and only follow the mouse
+    if (settled) {
+        StopSpotlightAnimation()
+        StartSpotlightFollow()
     }
+}
+
+UpdateSpotlightRegion() {
+    global spotlightGui, spCurrentRadius, screenLeft, screenTop, screenWidth, screenHeight
+    global spLastX, spLastY, spLastRadius
     
     MouseGetPos(&mX, &mY)
-    spotlightGui.GetPos(,, &wW, &wH)
-    vLeft := SysGet(76)
-    vTop := SysGet(77)
-    relX := mX - vLeft
-    relY := mY - vTop
+    relX := mX - screenLeft
+    relY := mY - screenTop
+    radius := Integer(spCurrentRadius)
     
-    hRgnFull := DllCall("Gdi32.dll\\CreateRectRgn", "Int", 0, "Int", 0, "Int", wW, "Int", wH, "Ptr")
-    hRgnHole := DllCall("Gdi32.dll\\CreateEllipticRgn", "Int", relX - spCurrentRadius, "Int", relY - spCurrentRadius, "Int", relX + spCurrentRadius, "Int", relY + spCurrentRadius, "Ptr")
+    ; Rebuilding a region the size of the whole virtual desktop is expensive, skip it when nothing changed
+    if (relX == spLastX && relY == spLastY && radius == spLastRadius) {
+        return
+    }
+    spLastX := relX
+    spLastY := relY
+    spLastRadius := radius
+    
+    hRgnFull := DllCall("Gdi32.dll\\CreateRectRgn", "Int", 0, "Int", 0, "Int", screenWidth, "Int", screenHeight, "Ptr")
+    hRgnHole := DllCall("Gdi32.dll\\CreateEllipticRgn", "Int", relX - radius, "Int", relY - radius, "Int", relX + radius, "Int", relY + radius, "Ptr")
     
     DllCall("Gdi32.dll\\CombineRgn", "Ptr", hRgnFull, "Ptr", hRgnFull, "Ptr", hRgnHole, "Int", 3)
+    CountDraw()
     DllCall("SetWindowRgn", "Ptr", spotlightGui.Hwnd, "Ptr", hRgnFull, "Int", 1)
     
     DllCall("Gdi32.dll\\DeleteObject", "Ptr", hRgnHole)
     DllCall("Gdi32.dll\\DeleteObject", "Ptr", hRgnFull)
 }
-""")
 
-        if hl_enabled or click_fx_enabled:
-            lines.append("UpdateEffects() {")
-            if hl_enabled:
-                lines.append("""
-    global highlightEnabled, highlightGui, highlightRadius, highlightColor, highlightThickness, highlightOpacity
-    
-    if (highlightEnabled) {
-        POINT := Buffer(8)
-        DllCall("GetCursorPos", "Ptr", POINT)
-        mouseX := NumGet(POINT, 0, "Int")
-        mouseY := NumGet(POINT, 4, "Int")
-        
-        guiSize := highlightRadius * 2 + 10
-        guiX := mouseX - guiSize // 2
-        guiY := mouseY - guiSize // 2
-        
-        highlightGui.Show("NA x" guiX " y" guiY " w" guiSize " h" guiSize)
-        DrawCircleWithOpacity(highlightGui, guiSize // 2, guiSize // 2, highlightRadius, highlightColor, highlightThickness, highlightOpacity)
+RefreshScreenMetrics() {
+    global screenLeft, screenTop, screenWidth, screenHeight, spMaxDist
+    screenLeft := SysGet(76)
+    screenTop := SysGet(77)
+    screenWidth := SysGet(78)
+    screenHeight := SysGet(79)
+    spMaxDist := Sqrt(screenWidth**2 + screenHeight**2) + 50
+}
+
+; Monitors were added, removed, rearranged or rescaled: re-read the layout and refit an open spotlight
+OnDisplayChange(wParam, lParam, msg, hwnd) {
+    global spotlightGui, spLastRadius, screenLeft, screenTop, screenWidth, screenHeight
+    RefreshScreenMetrics()
+    if IsSet(spotlightGui) {
+        spLastRadius := -1
+        spotlightGui.Move(screenLeft, screenTop, screenWidth, screenHeight)
+        UpdateSpotlightRegion()
     }
+}
 """)
-            if click_fx_enabled:
-                lines.append("""
-    global isAnimating
-    if (isAnimating) {
-        UpdateClickAnimation()
+            lines.append("""
+; Zoom/fade steps and following run on the frame scheduler at the spotlight's rate
+StartSpotlightAnimation() {
+    global spAnimating
+    StopSpotlightFollow()
+    spAnimating := true
+    MarkEffectDirty("spotlight")
+}
+
+StopSpotlightAnimation() {
+    global spAnimating
+    spAnimating := false
+}
+
+StartSpotlightFollow() {
+    global spFollowing
+    spFollowing := true
+}
+
+StopSpotlightFollow() {
+    global spFollowing
+    spFollowing := false
+}
+
+UpdateSpotlightEffect() {
+    global spotlightGui, spAnimating, spFollowing
+    if (spAnimating) {
+        UpdateSpotlight()
+    } else if (spFollowing) {
+        if !IsSet(spotlightGui) {
+            spFollowing := false
+            return false
+        }
+        UpdateSpotlightRegion()
     }
+    return spAnimating
+}
 """)
-            lines.append("}")
-            lines.append("")
 
-        if audio_enabled:
+        if hl_enabled and not unified:
             lines.append("""
-PlayClickSound(clickType) {
-    global audioEnabled, leftSoundFile, rightSoundFile, soundCounter, soundVolume
+UpdateHighlight() {
+    global mouseX, mouseY, cursorShowing
+    global highlightEnabled, highlightGui, highlightSurface, highlightDirty, highlightHidden
     
-    if (!audioEnabled) {
-        return
+    if (!highlightEnabled) {
+        return false
     }
-    
-    soundFile := (clickType = "left") ? leftSoundFile : rightSoundFile
-    
-    if (!FileExist(soundFile)) {
-        return
+    if (!cursorShowing) {
+        if (!highlightHidden) {
+            highlightGui.Hide()
+            highlightHidden := true
+        }
+        return false
+    }
+    if (highlightHidden) {
+        highlightGui.Show("NA")
+        highlightHidden := false
     }
     
-    soundCounter++
-    alias := "clicksound" . soundCounter
+    guiX := mouseX - highlightGuiHalf
+    guiY := mouseY - highlightGuiHalf
     
-    try {
-        currentVolume := Buffer(4)
-        DllCall("winmm\\waveOutGetVolume", "Ptr", 0, "Ptr", currentVolume)
-        savedVolume := NumGet(currentVolume, 0, "UInt")
-        
-        volumeLevel := (soundVolume * 65535) // 1000
-        newVolume := volumeLevel | (volumeLevel << 16)
-        DllCall("winmm\\waveOutSetVolume", "Ptr", 0, "UInt", newVolume)
-        
-        DllCall("winmm\\mciSendString", "Str", "open `"" . soundFile . "`" type waveaudio alias " . alias, "Ptr", 0, "UInt", 0, "Ptr", 0)
-        DllCall("winmm\\mciSendString", "Str", "play " . alias . " from 0", "Ptr", 0, "UInt", 0, "Ptr", 0)
-        
-        SetTimer(() => (
-            DllCall("winmm\\waveOutSetVolume", "Ptr", 0, "UInt", savedVolume),
-            DllCall("winmm\\mciSendString", "Str", "close " . alias, "Ptr", 0, "UInt", 0, "Ptr", 0)
-        ), -500)
+    if (highlightDirty) {
+        ; The halo only changes with its config, so render it once and just move it afterwards
+        highlightSurface.Resize(highlightGuiSize, highlightGuiSize)
+        DrawCircle(highlightSurface, highlightGuiHalf, highlightGuiHalf, highlightRadius, highlightArgb, highlightThickness)
+        highlightSurface.Present(guiX, guiY)
+        highlightDirty := false
+    } else {
+        highlightSurface.MoveTo(guiX, guiY)
     }
+    return false
 }
 """)
 
-        if click_fx_enabled:
+        if hl_enabled or click_fx_enabled:
+            warm = ["""
+; Pays the one-time costs at load so the first effect is as fast as any later one: the halo is
+; pre-rendered and every overlay window is shown once off-screen with its buffer allocated
+WarmStart() {"""]
+            if unified:
+                # Large enough for the halo and a full-size ripple, in the overlay's 64 px steps
+                largest_radius = max([hl_radius] + [int(table.get('HighlightSize', 60) / 2) for table in profile_tables if table])
+                overlay_size = (max(largest_radius * 2 + 10 if hl_enabled else 0,
+                                    ScriptGenerator.CLICK_ANIMATION_MAX_RADIUS * 2 + 10 if click_fx_enabled else 0) + 63) & ~63
+                warm.append(f"""
+    global overlaySurface
+    overlaySurface.Resize({overlay_size}, {overlay_size})
+    overlaySurface.Present(-32000, -32000)""")
+                if hl_enabled:
+                    warm.append("""
+    global highlightSprite, highlightDirty
+    highlightSprite.Resize(highlightGuiSize, highlightGuiSize)
+    DrawCircle(highlightSprite, highlightGuiHalf, highlightGuiHalf, highlightRadius, highlightArgb, highlightThickness)
+    highlightSprite.Flush()
+    highlightDirty := false""")
+            else:
+                if hl_enabled:
+                    warm.append("""
+    global highlightSurface, highlightDirty
+    highlightSurface.Resize(highlightGuiSize, highlightGuiSize)
+    DrawCircle(highlightSurface, highlightGuiHalf, highlightGuiHalf, highlightRadius, highlightArgb, highlightThickness)
+    highlightSurface.Present(-32000, -32000)
+    highlightDirty := false""")
+                if click_fx_enabled:
+                    warm.append("""
+    global clickPoolSize, clickSlotGui, clickSlotSurface, clickAtlasLoaded
+    Loop clickPoolSize {
+        clickSlotGui[A_Index].Show("NA x-32000 y-32000 w1 h1")
+        if (!clickAtlasLoaded) {
+            ; Live-drawn ripples keep this size (see DrawClickSlot)
+            clickSlotSurface[A_Index].Resize(clickFrameSize, clickFrameSize)
+            clickSlotSurface[A_Index].Present(-32000, -32000)
+        }
+        clickSlotGui[A_Index].Hide()
+    }""")
+            warm.append("""
+}
+""")
+            lines.append("".join(warm))
+
+        if has_tick:
             lines.append("""
-ShowClickAnimation(type) {
-    global clickFxEnabled, isAnimating, animationStartTime, clickType, clickX, clickY
-    global clickGui, leftClickShape, rightClickShape, highlightRadius
-    
-    if (!clickFxEnabled) {
-        return
-    }
-    
-    ; Get new click position
-    POINT := Buffer(8)
-    DllCall("GetCursorPos", "Ptr", POINT)
-    clickX := NumGet(POINT, 0, "Int")
-    clickY := NumGet(POINT, 4, "Int")
-    
-    isAnimating := true
-    animationStartTime := A_TickCount
-    clickType := type
-    
-    ; Immediately position GUI at the new click location to prevent glitchy travel effect
-    shape := (type = "left") ? leftClickShape : rightClickShape
-    if (shape = "Static Circle") {
-        guiSize := Integer(highlightRadius * 2 + 10)
-    } else {
-        guiSize := 60
+; Frame scheduler: effects run from the single UpdateEffects timer every `divisor` frames, in
+; priority order, and are skipped while they report no pending change (a false return) until
+; the cursor moves or MarkEffectDirty() flags them again
+RegisterEffect(name, update, divisor, priority, followsCursor) {
+    global scheduleTable, scheduleByName
+    effect := {name: name, update: update, divisor: divisor, priority: priority, followsCursor: followsCursor, dirty: true}
+    index := scheduleTable.Length + 1
+    for i, other in scheduleTable {
+        if (other.priority > priority) {
+            index := i
+            break
+        }
     }
-    
-    guiX := Integer(clickX - guiSize // 2)
-    guiY := Integer(clickY - guiSize // 2)
-    clickGui.Show("NA x" guiX " y" guiY " w" guiSize " h" guiSize)
+    scheduleTable.InsertAt(index, effect)
+    scheduleByName[name] := effect
 }
 
-UpdateClickAnimation() {
-    global isAnimating, animationStartTime, clickAnimationDuration, clickGui
-    global clickType, clickX, clickY, clickAnimationMaxRadius, clickFxEnabled
-    global leftClickColor, rightClickColor, leftClickShape, rightClickShape
-    global highlightRadius
-    
-    if (!clickFxEnabled) {
-        isAnimating := false
-        clickGui.Hide()
+MarkEffectDirty(name) {
+    global scheduleByName
+    scheduleByName[name].dirty := true
+    WakeEffects()
+}
+""")
+            if use_mouse_hook:
+                lines.append("""
+; One-shot work (tooltip hides, sound closes) runs on the frame tick instead of its own timer
+Defer(task, delay) {
+    global deferredTasks
+    deferredTasks.Push({due: A_TickCount + delay, task: task})
+    RequestFrame()
+}
+""")
+            else:
+                lines.append("""
+; One-shot work (tooltip hides, sound closes) runs on the frame tick instead of its own timer
+Defer(task, delay) {
+    global deferredTasks""" + (""", effectsPaused
+    deferredTasks.Push({due: A_TickCount + delay, task: task})
+    if (effectsPaused) {
+        ; The tick is stopped while paused
+        ScheduleDeferredTasks()
+    }""" if pausing else """
+    deferredTasks.Push({due: A_TickCount + delay, task: task})""") + """
+}
+""")
+            if use_mouse_hook or pausing:
+                lines.append("""
+; Wakes the tick once, when the earliest deferred task is due
+ScheduleDeferredTasks() {
+    global deferredTasks
+    if (!deferredTasks.Length) {
         return
     }
-    
-    elapsed := A_TickCount - animationStartTime
-    
-    color := (clickType = "left") ? leftClickColor : rightClickColor
-    shape := (clickType = "left") ? leftClickShape : rightClickShape
-    
-    ; Static Circle special behavior: follows cursor while button held
-    if (shape = "Static Circle") {
-        ; Check if mouse button is still pressed
-        buttonPressed := (clickType = "left") ? GetKeyState("LButton", "P") : GetKeyState("RButton", "P")
-        
-        if (buttonPressed) {
-            ; Button still held - update position to follow cursor
-            POINT := Buffer(8)
-            DllCall("GetCursorPos", "Ptr", POINT)
-            clickX := NumGet(POINT, 0, "Int")
-            clickY := NumGet(POINT, 4, "Int")
-            
-            currentRadius := highlightRadius
-            opacity := 255
-            guiSize := Integer(highlightRadius * 2 + 10)
+    nextDue := deferredTasks[1].due
+    for task in deferredTasks {
+        nextDue := Min(nextDue, task.due)
+    }
+    SetTimer(UpdateEffects, -Max(1, nextDue - A_TickCount))
+}
+""")
+            lines.append("""
+RunDeferredTasks() {
+    global deferredTasks
+    index := 1
+    while (index <= deferredTasks.Length) {
+        if (A_TickCount >= deferredTasks[index].due) {
+            deferredTasks.RemoveAt(index).task.Call()
         } else {
-            ; Button released - hide immediately
-            isAnimating := false
-            clickGui.Hide()
-            return
+            index++
+        }
+    }
+}
+
+UpdateEffects() {
+    global refreshRate, frameCount, scheduleTable, deferredTasks
+    global mouseX, mouseY, cursorShowing, lastMouseX, lastMouseY, lastCursorShowing
+    static CURSORINFO := Buffer(16 + A_PtrSize, 0)
+""")
+            if use_mouse_hook:
+                lines.append("""    global framePending, lastFrameTick
+    framePending := false
+    lastFrameTick := A_TickCount
+""")
+            else:
+                lines.append("""    global effectsIdle, idleTicks, idleFrameThreshold, idleRefreshRate
+""")
+            if pausing:
+                lines.append("""    global effectsPaused
+    if (effectsPaused) {
+        ; Only one-shot work (tooltip hides, sound closes) runs while paused
+        RunDeferredTasks()
+        ScheduleDeferredTasks()
+        return
+    }
+""")
+            if telemetry:
+                lines.append("""    global engineTelemetry, drawCallCount
+""")
+            if timed:
+                lines.append("""    global frameDueQpc
+    frameStart := QpcMs()
+    lateMs := frameDueQpc ? Max(0, frameStart - frameDueQpc) : 0
+""")
+            lines.append("""
+    ; One GetCursorInfo call gives both the position and the CURSOR_SHOWING flag
+    NumPut("UInt", CURSORINFO.Size, CURSORINFO, 0)
+    DllCall("GetCursorInfo", "Ptr", CURSORINFO)
+    cursorShowing := NumGet(CURSORINFO, 4, "UInt") & 0x1
+    mouseX := NumGet(CURSORINFO, 8 + A_PtrSize, "Int")
+    mouseY := NumGet(CURSORINFO, 12 + A_PtrSize, "Int")
+""")
+            if predicted:
+                lines.append("""    PredictCursor()
+""")
+            lines.append("""
+    moved := (mouseX != lastMouseX || mouseY != lastMouseY)
+    cursorChanged := (cursorShowing != lastCursorShowing)
+    lastMouseX := mouseX
+    lastMouseY := mouseY
+    lastCursorShowing := cursorShowing
+    
+    frameCount++
+    busy := false
+    for effect in scheduleTable {
+        if (effect.followsCursor && (moved || cursorChanged)) {
+            effect.dirty := true
+        }
+        if (effect.dirty && !Mod(frameCount, effect.divisor)) {
+            effect.dirty := effect.update.Call()
+        }
+        if (effect.dirty) {
+            busy := true
+        }
+    }
+    
+    if (deferredTasks.Length) {
+        RunDeferredTasks()
+    }
+""")
+            if timed:
+                lines.append("""    workMs := QpcMs() - frameStart
+""")
+            if governed and use_mouse_hook:
+                lines.append("""    GovernFrameRate(workMs, lateMs)
+""")
+            elif governed:
+                lines.append("""    if (!effectsIdle) {
+        GovernFrameRate(workMs, lateMs)
+    }
+""")
+            if telemetry:
+                lines.append("""    engineTelemetry.Write(workMs, lateMs, drawCallCount)
+    drawCallCount := 0
+""")
+            if use_mouse_hook:
+                lines.append("""
+    ; Frames are driven by mouse events; only keep ticking while an effect has pending work,
+    ; otherwise sleep until the next deferred task is due
+    if (busy) {
+        SetTimer(UpdateEffects, -refreshRate)""" + ("""
+        frameDueQpc := QpcMs() + refreshRate""" if timed else "") + """
+    } else if (deferredTasks.Length) {
+        ScheduleDeferredTasks()""" + ("""
+        frameDueQpc := 0""" if timed else "") + """
+    }
+}
+
+WakeEffects() {
+    RequestFrame()
+}
+
+RequestFrame() {
+    global framePending, lastFrameTick, refreshRate""" + (""", frameDueQpc""" if timed else "") + """
+    if (framePending) {
+        return
+    }
+    framePending := true
+    wait := refreshRate - (A_TickCount - lastFrameTick)
+    SetTimer(UpdateEffects, wait > 0 ? -wait : -1)""" + ("""
+    frameDueQpc := QpcMs() + Max(0, wait)""" if timed else "") + """
+}
+
+LowLevelMouseProc(nCode, wParam, lParam) {
+    ; WM_MOUSEMOVE: schedule a frame instead of drawing inside the hook""" + ("""
+    global effectsPaused
+    if (nCode >= 0 && wParam == 0x200 && !effectsPaused) {""" if pausing else """
+    if (nCode >= 0 && wParam == 0x200) {""") + """
+        RequestFrame()
+    }
+    return DllCall("CallNextHookEx", "Ptr", 0, "Int", nCode, "Ptr", wParam, "Ptr", lParam, "Ptr")
+}
+
+OnCursorVisibilityChange(hWinEventHook, event, hwnd, idObject, idChild, idEventThread, eventTime) {
+    ; OBJID_CURSOR show/hide, so the halo follows cursor visibility without polling
+    if ((idObject & 0xFFFFFFFF) == 0xFFFFFFF7) {
+        RequestFrame()
+    }
+}
+
+RemoveMouseHooks(*) {
+    global mouseHook, cursorEventHook
+    DllCall("UnhookWindowsHookEx", "Ptr", mouseHook)
+    DllCall("UnhookWinEvent", "Ptr", cursorEventHook)
+}
+""")
+            else:
+                lines.append("""
+    ; Nothing moved, no effect with pending work or the cursor is hidden (fullscreen video/game):
+    ; fall back to a slow wake-up cadence until the next movement or click
+    if (busy || (moved && cursorShowing)) {
+        idleTicks := 0
+        if (effectsIdle) {
+            effectsIdle := false
+            SetTimer(UpdateEffects, refreshRate)
+        }
+    } else if (!effectsIdle) {
+        idleTicks++
+        if (idleTicks >= idleFrameThreshold) {
+            effectsIdle := true
+            SetTimer(UpdateEffects, idleRefreshRate)
+        }
+    }""" + ("""
+    ; Only full-rate ticks count towards lateness
+    frameDueQpc := effectsIdle ? 0 : frameStart + refreshRate""" if timed else "") + """
+}
+
+WakeEffects() {
+    global effectsIdle, idleTicks, refreshRate""" + (""", effectsPaused
+    idleTicks := 0
+    if (effectsIdle && !effectsPaused) {""" if pausing else """
+    idleTicks := 0
+    if (effectsIdle) {""") + """
+        effectsIdle := false
+        SetTimer(UpdateEffects, refreshRate)
+    }
+}
+""")
+
+            if timed or predicted:
+                lines.append("""
+QpcMs() {
+    static frequency := 0
+    if (!frequency) {
+        DllCall("QueryPerformanceFrequency", "Int64*", &frequency)
+    }
+    DllCall("QueryPerformanceCounter", "Int64*", &counter := 0)
+    return counter * 1000 / frequency
+}
+""")
+            if predicted:
+                lines.append("""
+; Moves mouseX/mouseY ahead along the smoothed cursor velocity, so overlays placed at tick time
+; land where the cursor will be when the frame is shown instead of trailing it by a frame
+PredictCursor() {
+    global mouseX, mouseY, refreshRate
+    static lastTime := 0
+    static lastX := 0
+    static lastY := 0
+    static velocityX := 0.0
+    static velocityY := 0.0
+    
+    now := QpcMs()
+    dt := now - lastTime
+    stepX := mouseX - lastX
+    stepY := mouseY - lastY
+    lastTime := now
+    lastX := mouseX
+    lastY := mouseY
+    if (dt <= 0 || dt > 250 || (!stepX && !stepY)) {
+        ; First sample, resumed after idle, or the cursor stopped: no lead
+        velocityX := 0.0
+        velocityY := 0.0
+        return
+    }
+    
+    velocityX += 0.5 * (stepX / dt - velocityX)
+    velocityY += 0.5 * (stepY / dt - velocityY)
+    lead := predictLead * refreshRate
+    ; Never lead further than the last step or against it, so sudden stops and turns don't overshoot
+    offsetX := Max(-Abs(stepX), Min(Abs(stepX), velocityX * lead))
+    offsetY := Max(-Abs(stepY), Min(Abs(stepY), velocityY * lead))
+    if (offsetX * stepX > 0) {
+        mouseX += Round(offsetX)
+    }
+    if (offsetY * stepY > 0) {
+        mouseY += Round(offsetY)
+    }
+}
+""")
+            if governed:
+                lines.append("""
+; Frame-rate governor: after each window of frames it steps refreshRate one rateLadder level
+; slower when more than a quarter of the frames overran (work over 3/4 of the budget or the
+; tick fired over half a frame later than the timer can deliver it), and one level faster
+; after a few clean windows whose slowest frame would also fit the faster budget
+GovernFrameRate(workMs, lateMs) {
+    global refreshRate, rateLadder, rateLevel, timerQuantum
+    global governorFrames, governorOverruns, governorPeakWork, governorCalmWindows
+    """ + ("""
+    global powerSaving
+    if (powerSaving) {
+        ; The battery tier holds its own rate
+        return
+    }
+    """ if power_tiers and battery_rate_ms > refresh_rate_ms else "") + """
+    governorFrames++
+    governorPeakWork := Max(governorPeakWork, workMs)
+    if (workMs > refreshRate * 0.75 || lateMs > refreshRate * 0.5 + timerQuantum) {
+        governorOverruns++
+    }
+    if (governorFrames < governorWindow) {
+        return
+    }
+    
+    overruns := governorOverruns
+    peakWork := governorPeakWork
+    governorFrames := 0
+    governorOverruns := 0
+    governorPeakWork := 0
+    ; Other programs raise and release the system timer resolution at any time
+    timerQuantum := TimerQuantumMs()
+    
+    if (overruns * 4 > governorWindow) {
+        governorCalmWindows := 0
+        if (rateLevel < rateLadder.Length) {
+            SetFrameRateLevel(rateLevel + 1)
+        }
+    } else if (overruns == 0 && rateLevel > 1 && peakWork < rateLadder[rateLevel - 1] * 0.5) {
+        governorCalmWindows++
+        if (governorCalmWindows >= 4) {
+            governorCalmWindows := 0
+            SetFrameRateLevel(rateLevel - 1)
         }
     } else {
-        ; Regular animated shapes
-        if (elapsed >= clickAnimationDuration) {
-            isAnimating := false
-            clickGui.Hide()
+        governorCalmWindows := 0
+    }
+}
+
+; SetTimer only fires on system timer ticks (15.6 ms unless a program raised the resolution),
+; so a tick up to one tick period late is the timer, not load
+TimerQuantumMs() {
+    if (DllCall("ntdll\\NtQueryTimerResolution", "UInt*", &coarsest := 0, "UInt*", &finest := 0, "UInt*", &current := 0)) {
+        return 15.625
+    }
+    return current / 10000
+}
+""")
+                if use_mouse_hook:
+                    lines.append("""
+SetFrameRateLevel(level) {
+    global refreshRate, rateLadder, rateLevel, frameDueQpc
+    rateLevel := level
+    refreshRate := rateLadder[level]
+    frameDueQpc := 0
+}
+""")
+                else:
+                    lines.append("""
+SetFrameRateLevel(level) {
+    global refreshRate, rateLadder, rateLevel, frameDueQpc
+    global effectsIdle, idleFrameThreshold
+    rateLevel := level
+    refreshRate := rateLadder[level]
+    frameDueQpc := 0
+    idleFrameThreshold := Max(1, 500 // refreshRate)
+    if (!effectsIdle) {
+        SetTimer(UpdateEffects, refreshRate)
+    }
+}
+""")
+
+            if telemetry:
+                lines.append("""
+; Frame telemetry ring buffer in a named shared memory section, read by the app's Diagnostics page.
+; Header: magic, version, capacity, record size, records written (Int64), pid.
+; Record: frame, work us, lateness us, draw calls, GDI objects, USER objects, working set (Int64).
+; Each record is filled in before the written count is bumped, so readers never see a half-written slot.
+class TelemetryRing {
+    __New(name, capacity) {
+        this.view := 0
+        this.capacity := capacity
+        this.count := 0
+        this.gdiObjects := 0
+        this.userObjects := 0
+        this.workingSet := 0
+        this.memoryCounters := Buffer(8 + 8 * A_PtrSize, 0)
+        
+        ; PAGE_READWRITE section backed by the paging file
+        this.mapping := DllCall("CreateFileMapping", "Ptr", -1, "Ptr", 0, "UInt", 0x04, "UInt", 0, "UInt", 32 + capacity * 32, "Str", name, "Ptr")
+        if (!this.mapping) {
             return
         }
-        
-        progress := elapsed / clickAnimationDuration
-        progress := 1 - (1 - progress) ** 2
-        
-        currentRadius := clickAnimationMaxRadius * progress
-        opacity := Integer(255 * (1 - progress))
-        guiSize := Integer(currentRadius * 2 + 10)
+        ; FILE_MAP_WRITE
+        this.view := DllCall("MapViewOfFile", "Ptr", this.mapping, "UInt", 0x02, "UInt", 0, "UInt", 0, "UPtr", 0, "Ptr")
+        if (!this.view) {
+            return
+        }
+        NumPut("UInt", 0x5458464D, "UInt", 1, "UInt", capacity, "UInt", 32, "Int64", 0, "UInt", DllCall("GetCurrentProcessId", "UInt"), "UInt", 0, this.view)
+    }
+    
+    ; Handle counts and the working set change slowly, sample them once a second or so
+    SampleResources() {
+        hProcess := DllCall("GetCurrentProcess", "Ptr")
+        this.gdiObjects := DllCall("GetGuiResources", "Ptr", hProcess, "UInt", 0, "UInt")
+        this.userObjects := DllCall("GetGuiResources", "Ptr", hProcess, "UInt", 1, "UInt")
+        NumPut("UInt", this.memoryCounters.Size, this.memoryCounters, 0)
+        if (DllCall("K32GetProcessMemoryInfo", "Ptr", hProcess, "Ptr", this.memoryCounters, "UInt", this.memoryCounters.Size)) {
+            this.workingSet := NumGet(this.memoryCounters, 8 + A_PtrSize, "UPtr")
+        }
     }
     
-    if (guiSize < 10) {
-        guiSize := 10
+    Write(workMs, lateMs, drawCalls) {
+        if (!this.view) {
+            return
+        }
+        if (!Mod(this.count, 60)) {
+            this.SampleResources()
+        }
+        record := this.view + 32 + Mod(this.count, this.capacity) * 32
+        NumPut("UInt", this.count & 0xFFFFFFFF, "UInt", Round(workMs * 1000), "UInt", Round(lateMs * 1000), "UInt", drawCalls
+             , "UInt", this.gdiObjects, "UInt", this.userObjects, "Int64", this.workingSet, record)
+        this.count++
+        NumPut("Int64", this.count, this.view, 16)
     }
-    guiX := Integer(clickX - guiSize // 2)
-    guiY := Integer(clickY - guiSize // 2)
     
-    clickGui.Show("NA x" guiX " y" guiY " w" guiSize " h" guiSize)
-    DrawShape(clickGui, guiSize // 2, guiSize // 2, currentRadius, color, shape, opacity)
+    __Delete() {
+        if (this.view) {
+            DllCall("UnmapViewOfFile", "Ptr", this.view)
+        }
+        if (this.mapping) {
+            DllCall("CloseHandle", "Ptr", this.mapping)
+        }
+    }
 }
 """)
 
-        if hl_enabled or click_fx_enabled:
+        else:
             lines.append("""
-DrawCircleWithOpacity(guiObj, centerX, centerY, radius, color, thickness, opacity) {
-    static pToken := 0
-    static Startup := 0
+; No frame tick in this engine: one-shot work keeps its own timer
+Defer(task, delay) {
+    SetTimer(task, -delay)
+}
+""")
+
+        if audio_enabled:
+            lines.append("""
+PlayClickSound(clickType) {
+    global audioEnabled, leftSoundPool, rightSoundPool, leftSoundFile, rightSoundFile
     
-    if (radius <= 0 || opacity <= 0) {
+    if (!audioEnabled) {
         return
     }
     
-    if (!Startup) {
-        si := Buffer(24, 0)
-        NumPut("UInt", 1, si)
-        DllCall("gdiplus\\GdiplusStartup", "Ptr*", &pToken, "Ptr", si, "Ptr", 0)
-        Startup := 1
+    pool := (clickType = "left") ? leftSoundPool : rightSoundPool
+    if (pool.ready) {
+        pool.Play()
+    } else {
+        PlayClickSoundFile((clickType = "left") ? leftSoundFile : rightSoundFile)
     }
+}
+
+; Fallback for files the voice pool cannot decode; MCI per-alias volume leaves the device volume alone
+PlayClickSoundFile(soundFile) {
+    global soundCounter, soundVolume
     
-    hwnd := guiObj.Hwnd
+    if (!FileExist(soundFile)) {
+        return
+    }
     
-    RECT := Buffer(16)
-    DllCall("GetClientRect", "Ptr", hwnd, "Ptr", RECT)
-    width := NumGet(RECT, 8, "Int")
-    height := NumGet(RECT, 12, "Int")
+    soundCounter++
+    alias := "clicksound" . soundCounter
     
-    if (width <= 0 || height <= 0) {
-        return
+    try {
+        DllCall("winmm\\mciSendString", "Str", "open `"" . soundFile . "`" type mpegvideo alias " . alias, "Ptr", 0, "UInt", 0, "Ptr", 0)
+        DllCall("winmm\\mciSendString", "Str", "setaudio " . alias . " volume to " . soundVolume, "Ptr", 0, "UInt", 0, "Ptr", 0)
+        DllCall("winmm\\mciSendString", "Str", "play " . alias . " from 0", "Ptr", 0, "UInt", 0, "Ptr", 0)
+        
+        Defer(() => DllCall("winmm\\mciSendString", "Str", "close " . alias, "Ptr", 0, "UInt", 0, "Ptr", 0), 500)
+    }
+}
+
+; WAV data kept in memory and played through pre-opened waveOut voices.
+; Voices are used round-robin so fast clicks overlap instead of cutting each other off,
+; and volume is set per voice handle instead of on the global device.
+class SoundVoicePool {
+    __New(path, voiceCount, volume) {
+        this.ready := false
+        this.voices := []
+        this.headers := []
+        this.next := 1
+        
+        if (path = "" || !FileExist(path)) {
+            return
+        }
+        try {
+            data := FileRead(path, "RAW")
+        } catch {
+            return
+        }
+        if (data.Size < 12 || StrGet(data.Ptr, 4, "CP0") != "RIFF" || StrGet(data.Ptr + 8, 4, "CP0") != "WAVE") {
+            return
+        }
+        
+        fmtPtr := 0
+        dataPtr := 0
+        dataSize := 0
+        pos := 12
+        while (pos + 8 <= data.Size) {
+            chunkId := StrGet(data.Ptr + pos, 4, "CP0")
+            chunkSize := NumGet(data, pos + 4, "UInt")
+            if (chunkId == "fmt ") {
+                fmtPtr := data.Ptr + pos + 8
+            } else if (chunkId == "data") {
+                dataPtr := data.Ptr + pos + 8
+                dataSize := Min(chunkSize, data.Size - pos - 8)
+            }
+            pos += 8 + chunkSize + (chunkSize & 1)
+        }
+        if (!fmtPtr || !dataPtr || dataSize <= 0) {
+            return
+        }
+        this.data := data
+        
+        DllCall("LoadLibrary", "Str", "winmm", "Ptr")
+        Loop voiceCount {
+            ; WAVE_MAPPER picks the default output device
+            if (DllCall("winmm\\waveOutOpen", "Ptr*", &hWaveOut:=0, "UInt", 0xFFFFFFFF, "Ptr", fmtPtr, "Ptr", 0, "Ptr", 0, "UInt", 0, "UInt") != 0) {
+                break
+            }
+            hdr := Buffer(A_PtrSize * 4 + 16, 0)
+            NumPut("Ptr", dataPtr, hdr, 0)
+            NumPut("UInt", dataSize, hdr, A_PtrSize)
+            DllCall("winmm\\waveOutPrepareHeader", "Ptr", hWaveOut, "Ptr", hdr, "UInt", hdr.Size)
+            this.voices.Push(hWaveOut)
+            this.headers.Push(hdr)
+        }
+        this.SetVolume(volume)
+        this.ready := this.voices.Length > 0
     }
     
-    hdc := DllCall("GetDC", "Ptr", hwnd, "Ptr")
-    memDC := DllCall("CreateCompatibleDC", "Ptr", hdc, "Ptr")
+    SetVolume(volume) {
+        volumeLevel := (volume * 65535) // 1000
+        for hWaveOut in this.voices {
+            DllCall("winmm\\waveOutSetVolume", "Ptr", hWaveOut, "UInt", volumeLevel | (volumeLevel << 16))
+        }
+    }
     
-    BITMAPINFO := Buffer(40, 0)
-    NumPut("UInt", 40, BITMAPINFO, 0)
-    NumPut("Int", width, BITMAPINFO, 4)
-    NumPut("Int", -height, BITMAPINFO, 8)
-    NumPut("UShort", 1, BITMAPINFO, 12)
-    NumPut("UShort", 32, BITMAPINFO, 14)
-    NumPut("UInt", 0, BITMAPINFO, 16)
+    Play() {
+        hWaveOut := this.voices[this.next]
+        hdr := this.headers[this.next]
+        this.next := Mod(this.next, this.voices.Length) + 1
+        
+        ; Reset returns the prepared header if this voice is still busy, then replay it
+        DllCall("winmm\\waveOutReset", "Ptr", hWaveOut)
+        DllCall("winmm\\waveOutWrite", "Ptr", hWaveOut, "Ptr", hdr, "UInt", hdr.Size)
+    }
     
-    hBitmap := DllCall("CreateDIBSection", "Ptr", memDC, "Ptr", BITMAPINFO, "UInt", 0, "Ptr*", &pBits:=0, "Ptr", 0, "UInt", 0, "Ptr")
-    DllCall("SelectObject", "Ptr", memDC, "Ptr", hBitmap)
+    __Delete() {
+        Loop this.voices.Length {
+            DllCall("winmm\\waveOutReset", "Ptr", this.voices[A_Index])
+            DllCall("winmm\\waveOutUnprepareHeader", "Ptr", this.voices[A_Index], "Ptr", this.headers[A_Index], "UInt", this.headers[A_Index].Size)
+            DllCall("winmm\\waveOutClose", "Ptr", this.voices[A_Index])
+        }
+    }
+}
+""")
+
+        if click_fx_enabled:
+            # Shape dispatch is written once per click type and specialised by the optimiser:
+            # with the shapes known, the string comparisons fold away into direct draw calls
+            click_bind = {"left": {"shape": left_click_shape},
+                          "right": {"shape": left_click_shape if sync_visuals else right_click_shape}}
+            show_click = [
+                Raw("global clickFxEnabled, isAnimating, clickPoolSize" + ("" if unified else ", clickSlotGui, clickAtlasLoaded")),
+                Raw("""
+                    global mouseX, mouseY, clickSlotActive, clickSlotStart, clickSlotType, clickSlotX, clickSlotY
+                    static POINT := Buffer(8)
+                    
+                    if (!clickFxEnabled) {
+                        return
+                    }
+                    
+                    ; Take a free slot, or take over the oldest running ripple when all are busy
+                    slot := 0
+                    oldest := 0
+                    Loop clickPoolSize {
+                        if (!clickSlotActive[A_Index]) {
+                            slot := A_Index
+                            break
+                        }
+                        if (!oldest || clickSlotStart[A_Index] < clickSlotStart[oldest]) {
+                            oldest := A_Index
+                        }
+                    }
+                    if (!slot) {
+                        slot := oldest
+                    }
+                    
+                    ; Get new click position
+                    DllCall("GetCursorPos", "Ptr", POINT)
+                    clickX := NumGet(POINT, 0, "Int")
+                    clickY := NumGet(POINT, 4, "Int")
+                    ; The tick may have been idle; a Static Circle's first frame reads the shared position
+                    mouseX := clickX
+                    mouseY := clickY
+                    
+                    clickSlotActive[slot] := true
+                    clickSlotStart[slot] := A_TickCount
+                    clickSlotType[slot] := type
+                    clickSlotX[slot] := clickX
+                    clickSlotY[slot] := clickY
+                    isAnimating := true
+                """),
+                Raw(f'MarkEffectDirty("{"overlay" if unified else "clicks"}")')
+            ]
+            if not unified:
+                show_click += [
+                    Raw("""
+                        
+                        if (clickAtlasLoaded) {
+                            ; Blit the first frame in place before showing, so the window never appears at a stale spot
+                            BlitClickSlot(slot)
+                            clickSlotGui[slot].Show("NA")
+                            return
+                        }
+                        
+                        ; Immediately position GUI at the new click location to prevent glitchy travel effect
+                    """),
+                    Switch("type", [(side, [
+                        If('shape = "Static Circle"',
+                           [Raw("guiSize := highlightGuiSize")],
+                           [Raw("guiSize := clickFrameSize")])
+                    ]) for side in ("left", "right")], bind=click_bind, exhaustive=True),
+                    Raw("""
+                        
+                        guiX := clickX - guiSize // 2
+                        guiY := clickY - guiSize // 2
+                        clickSlotGui[slot].Show("NA x" guiX " y" guiY " w" guiSize " h" guiSize)
+                    """)
+                ]
+            lines.append(Function("ShowClickAnimation", "type", show_click))
+            lines.append("""
+UpdateClickAnimation() {
+    global isAnimating, clickFxEnabled, clickPoolSize, clickSlotGui, clickSlotActive, clickAtlasLoaded
     
-    DllCall("gdiplus\\GdipCreateFromHDC", "Ptr", memDC, "Ptr*", &pGraphics:=0)
-    DllCall("gdiplus\\GdipSetSmoothingMode", "Ptr", pGraphics, "Int", 4)
-    DllCall("gdiplus\\GdipGraphicsClear", "Ptr", pGraphics, "UInt", 0x00000000)
+    if (!clickFxEnabled) {
+        isAnimating := false
+        Loop clickPoolSize {
+            clickSlotActive[A_Index] := false
+            clickSlotGui[A_Index].Hide()
+        }
+        return false
+    }
     
-    r := (color >> 0) & 0xFF
-    g := (color >> 8) & 0xFF
-    b := (color >> 16) & 0xFF
-    argbColor := (Integer(opacity) << 24) | (r << 16) | (g << 8) | b
+    ; One pass advances every running ripple
+    anyActive := false
+    Loop clickPoolSize {
+        if (clickSlotActive[A_Index]) {
+            if (clickAtlasLoaded) {
+                BlitClickSlot(A_Index)
+            } else {
+                DrawClickSlot(A_Index)
+            }
+            if (clickSlotActive[A_Index]) {
+                anyActive := true
+            }
+        }
+    }
+    isAnimating := anyActive
+    return anyActive
+}
+
+; Atlas path: every frame was pre-rendered at Apply time, so a frame is a single UpdateLayeredWindow
+BlitClickSlot(slot) {
+    global mouseX, mouseY, clickAnimationDuration, clickAtlas
+    global clickSlotGui, clickSlotActive, clickSlotStart, clickSlotType, clickSlotX, clickSlotY
     
-    x := Float(centerX - radius)
-    y := Float(centerY - radius)
-    w := Float(radius * 2)
-    h := Float(radius * 2)
+    clickType := clickSlotType[slot]
+    entry := clickAtlas[(clickType = "left") ? 1 : 2]
     
-    if (thickness > 0) {
-        DllCall("gdiplus\\GdipCreatePen1", "UInt", argbColor, "Float", Float(thickness), "Int", 2, "Ptr*", &pPen:=0)
-        DllCall("gdiplus\\GdipDrawEllipse", "Ptr", pGraphics, "Ptr", pPen, "Float", x, "Float", y, "Float", w, "Float", h)
-        DllCall("gdiplus\\GdipDeletePen", "Ptr", pPen)
+    if (entry.follow) {
+        ; Static Circle: follows cursor while the button is held
+        buttonPressed := (clickType = "left") ? GetKeyState("LButton", "P") : GetKeyState("RButton", "P")
+        if (!buttonPressed) {
+            clickSlotActive[slot] := false
+            clickSlotGui[slot].Hide()
+            return
+        }
+        clickSlotX[slot] := mouseX
+        clickSlotY[slot] := mouseY
+        frame := 0
     } else {
-        DllCall("gdiplus\\GdipCreateSolidFill", "UInt", argbColor, "Ptr*", &pBrush:=0)
-        DllCall("gdiplus\\GdipFillEllipse", "Ptr", pGraphics, "Ptr", pBrush, "Float", x, "Float", y, "Float", w, "Float", h)
-        DllCall("gdiplus\\GdipDeleteBrush", "Ptr", pBrush)
+        elapsed := A_TickCount - clickSlotStart[slot]
+        if (elapsed >= clickAnimationDuration) {
+            clickSlotActive[slot] := false
+            clickSlotGui[slot].Hide()
+            return
+        }
+        frame := (elapsed * entry.frames) // clickAnimationDuration
+    }
+    
+    entry.Blit(clickSlotGui[slot].Hwnd, clickSlotX[slot] - entry.size // 2, clickSlotY[slot] - entry.size // 2, frame)
+}
+""")
+            def slot_frame(side):
+                follow_cursor = Raw(f"""
+                    ; Static Circle special behavior: follows cursor while button held
+                    if (!GetKeyState("{'LButton' if side == 'left' else 'RButton'}", "P")) {{
+                        ; Button released - hide immediately
+                        clickSlotActive[slot] := false
+                        clickSlotGui[slot].Hide()
+                        return
+                    }}
+                    
+                    ; Button still held - update position to follow cursor
+                    clickSlotX[slot] := mouseX
+                    clickSlotY[slot] := mouseY
+                    
+                    currentRadius := highlightRadius
+                    argbColor := {side}ClickArgb
+                    guiSize := highlightGuiSize
+                """)
+                animate = Raw(f"""
+                    ; Regular animated shapes: radius and alpha come from the frame tables; the window keeps
+                    ; the size of the largest frame so only its pixels change
+                    elapsed := A_TickCount - clickSlotStart[slot]
+                    if (elapsed >= clickAnimationDuration) {{
+                        clickSlotActive[slot] := false
+                        clickSlotGui[slot].Hide()
+                        return
+                    }}
+                    
+                    frame := (elapsed * clickFrameCount) // clickAnimationDuration + 1
+                    currentRadius := clickRadiusTable[frame]
+                    argbColor := clickAlphaTable[frame] | {side}ClickRgb
+                    guiSize := clickFrameSize
+                """)
+                return [
+                    If('shape = "Static Circle"', [follow_cursor], [animate]),
+                    Raw("""
+                        
+                        half := guiSize // 2
+                        surface := clickSlotSurface[slot]
+                        ; No-op unless the slot switches between a ripple and a Static Circle
+                        surface.Resize(guiSize, guiSize)
+                        surface.Clear()
+                    """),
+                    Switch("shape", [(shape, [Raw(func + "(surface, half, half, currentRadius, argbColor)")])
+                                     for shape, func in ScriptGenerator.SHAPE_DRAW_FUNCTIONS.items()]),
+                    Raw("surface.Present(clickSlotX[slot] - half, clickSlotY[slot] - half)")
+                ]
+            lines.append(Function("DrawClickSlot", "slot", [
+                Raw("""
+                    global mouseX, mouseY, clickRadiusTable, clickAlphaTable
+                    global clickSlotGui, clickSlotSurface, clickSlotActive, clickSlotStart, clickSlotType, clickSlotX, clickSlotY
+                    
+                """),
+                Switch("clickSlotType[slot]", [(side, slot_frame(side)) for side in ("left", "right")], bind=click_bind, exhaustive=True)
+            ], comment="; Fallback when the atlas is missing: draw the frame live with GDI+"))
+            if unified:
+                def shape_call(surface, radius, argb):
+                    return Switch("shape", [(shape, [Raw(f"{func}({surface}, x + size // 2, y + size // 2, {radius}, {argb})")])
+                                            for shape, func in ScriptGenerator.SHAPE_DRAW_FUNCTIONS.items()])
+
+                def advance_slot(side):
+                    return [If('shape = "Static Circle"', [Raw(f"""
+                        ; Static Circle follows the cursor while the button is held
+                        if (!GetKeyState("{'LButton' if side == 'left' else 'RButton'}", "P")) {{
+                            clickSlotActive[slot] := false
+                            continue
+                        }}
+                        clickSlotX[slot] := mouseX
+                        clickSlotY[slot] := mouseY
+                        clickSlotFrame[slot] := 1
+                        clickSlotSize[slot] := highlightGuiSize
+                    """)], [Raw("""
+                        elapsed := A_TickCount - clickSlotStart[slot]
+                        if (elapsed >= clickAnimationDuration) {
+                            clickSlotActive[slot] := false
+                            continue
+                        }
+                        frame := (elapsed * clickFrameCount) // clickAnimationDuration + 1
+                        clickSlotFrame[slot] := frame
+                        clickSlotSize[slot] := clickAtlasLoaded ? clickFrameSize : clickSizeTable[frame]
+                    """)])]
+
+                lines.append(Function("AdvanceClickSlots", "", [
+                    Raw("""
+                        global mouseX, mouseY, isAnimating, clickPoolSize, clickAtlasLoaded, clickSizeTable
+                        global clickSlotActive, clickSlotStart, clickSlotType, clickSlotX, clickSlotY, clickSlotFrame, clickSlotSize
+                        
+                        anyActive := false
+                    """),
+                    Block("Loop clickPoolSize", [
+                        Raw("""
+                            slot := A_Index
+                            if (!clickSlotActive[slot]) {
+                                continue
+                            }
+                        """),
+                        Switch("clickSlotType[slot]", [(side, advance_slot(side)) for side in ("left", "right")], bind=click_bind, exhaustive=True),
+                        Raw("anyActive := true")
+                    ]),
+                    Raw("isAnimating := anyActive")
+                ], comment="; Unified overlay: moves every running ripple to its current frame and size without drawing"))
+
+                lines.append(Function("CompositeClickSlot", "slot, originX, originY", [
+                    Raw("""
+                        global overlaySurface, clickAtlas, clickAtlasLoaded, clickRadiusTable, clickAlphaTable
+                        global clickSlotType, clickSlotX, clickSlotY, clickSlotFrame, clickSlotSize
+                        
+                        size := clickSlotSize[slot]
+                        x := clickSlotX[slot] - size // 2 - originX
+                        y := clickSlotY[slot] - size // 2 - originY
+                        frame := clickSlotFrame[slot]
+                        
+                        if (clickAtlasLoaded) {
+                            entry := clickAtlas[(clickSlotType[slot] = "left") ? 1 : 2]
+                            overlaySurface.Blend(entry.memDC, 0, (frame - 1) * entry.size, entry.size, entry.size, x, y)
+                            return
+                        }
+                        
+                        ; No atlas: draw the shape live into the overlay
+                    """),
+                    Switch("clickSlotType[slot]", [(side, [
+                        If('shape = "Static Circle"',
+                           [shape_call("overlaySurface", "highlightRadius", f"{side}ClickArgb")],
+                           [shape_call("overlaySurface", "clickRadiusTable[frame]", f"clickAlphaTable[frame] | {side}ClickRgb")])
+                    ]) for side in ("left", "right")], bind=click_bind, exhaustive=True)
+                ]))
+            lines.append("""
+; One click style from the atlas file: a strip of square premultiplied BGRA frames in a memory DC
+class ClickAtlasEntry {
+    __New(data, offset, frameSize, frameCount, flags) {
+        this.size := frameSize
+        this.frames := frameCount
+        this.follow := flags & 1
+        
+        hdcScreen := DllCall("GetDC", "Ptr", 0, "Ptr")
+        this.memDC := DllCall("CreateCompatibleDC", "Ptr", hdcScreen, "Ptr")
+        DllCall("ReleaseDC", "Ptr", 0, "Ptr", hdcScreen)
+        
+        BITMAPINFO := Buffer(40, 0)
+        NumPut("UInt", 40, BITMAPINFO, 0)
+        NumPut("Int", frameSize, BITMAPINFO, 4)
+        NumPut("Int", -(frameSize * frameCount), BITMAPINFO, 8)
+        NumPut("UShort", 1, BITMAPINFO, 12)
+        NumPut("UShort", 32, BITMAPINFO, 14)
+        
+        this.hBitmap := DllCall("CreateDIBSection", "Ptr", this.memDC, "Ptr", BITMAPINFO, "UInt", 0, "Ptr*", &pBits:=0, "Ptr", 0, "UInt", 0, "Ptr")
+        DllCall("RtlMoveMemory", "Ptr", pBits, "Ptr", data.Ptr + offset, "UPtr", frameSize * frameSize * frameCount * 4)
+        this.hOldBitmap := DllCall("SelectObject", "Ptr", this.memDC, "Ptr", this.hBitmap, "Ptr")
+        
+        this.ptSrc := Buffer(8, 0)
+        this.ptDst := Buffer(8, 0)
+        this.sizeBuf := Buffer(8, 0)
+        NumPut("Int", frameSize, this.sizeBuf, 0)
+        NumPut("Int", frameSize, this.sizeBuf, 4)
+        this.blend := Buffer(4, 0)
+        NumPut("UChar", 255, this.blend, 2)
+        NumPut("UChar", 1, this.blend, 3)
+    }
+    
+    ; Moves the window and shows frame k (a row offset into the strip) in one call
+    Blit(hwnd, x, y, frame) {
+        NumPut("Int", frame * this.size, this.ptSrc, 4)
+        NumPut("Int", x, this.ptDst, 0)
+        NumPut("Int", y, this.ptDst, 4)
+        CountDraw()
+        DllCall("UpdateLayeredWindow", "Ptr", hwnd, "Ptr", 0, "Ptr", this.ptDst, "Ptr", this.sizeBuf, "Ptr", this.memDC, "Ptr", this.ptSrc, "UInt", 0, "Ptr", this.blend, "UInt", 2)
+    }
+    
+    __Delete() {
+        DllCall("SelectObject", "Ptr", this.memDC, "Ptr", this.hOldBitmap, "Ptr")
+        DllCall("DeleteObject", "Ptr", this.hBitmap)
+        DllCall("DeleteDC", "Ptr", this.memDC)
+    }
+}
+
+LoadClickAtlas(path) {
+    entries := []
+    if (path = "" || !FileExist(path)) {
+        return entries
+    }
+    try {
+        data := FileRead(path, "RAW")
+    } catch {
+        return entries
+    }
+    if (data.Size < 12 || StrGet(data.Ptr, 4, "CP0") != "MFXA" || NumGet(data, 4, "UInt") != 1) {
+        return entries
     }
     
-    DllCall("gdiplus\\GdipFlush", "Ptr", pGraphics, "Int", 1)
+    ; Left and right share one strip when their style is identical
+    loaded := Map()
+    Loop NumGet(data, 8, "UInt") {
+        base := 12 + (A_Index - 1) * 16
+        offset := NumGet(data, base + 12, "UInt")
+        if (!loaded.Has(offset)) {
+            loaded[offset] := ClickAtlasEntry(data, offset, NumGet(data, base, "UInt"), NumGet(data, base + 4, "UInt"), NumGet(data, base + 8, "UInt"))
+        }
+        entries.Push(loaded[offset])
+    }
+    return entries
+}
+""")
+
+        if unified:
+            compose = ["""
+; Unified overlay: the halo and every running ripple are composited into one premultiplied
+; buffer covering just their bounding box and presented with a single UpdateLayeredWindow
+ComposeOverlay() {
+    global mouseX, mouseY, cursorShowing, overlayGui, overlaySurface, overlayVisible
+    static highlightOnly := false
     
-    POINT := Buffer(8, 0)
-    SIZE := Buffer(8)
-    NumPut("Int", width, SIZE, 0)
-    NumPut("Int", height, SIZE, 4)
-    BLENDFUNCTION := Buffer(4)
-    NumPut("UChar", 0, BLENDFUNCTION, 0)
-    NumPut("UChar", 0, BLENDFUNCTION, 1)
-    NumPut("UChar", 255, BLENDFUNCTION, 2)
-    NumPut("UChar", 1, BLENDFUNCTION, 3)
+    left := 0x7FFFFFFF
+    top := 0x7FFFFFFF
+    right := -0x7FFFFFFF
+    bottom := -0x7FFFFFFF
+"""]
+            if hl_enabled:
+                compose.append("""
+    global highlightEnabled, highlightSprite, highlightDirty
+    showHighlight := highlightEnabled && cursorShowing
+    if (showHighlight) {
+        if (highlightDirty) {
+            highlightSprite.Resize(highlightGuiSize, highlightGuiSize)
+            DrawCircle(highlightSprite, highlightGuiHalf, highlightGuiHalf, highlightRadius, highlightArgb, highlightThickness)
+            highlightSprite.Flush()
+            highlightDirty := false
+            highlightOnly := false
+        }
+        left := mouseX - highlightGuiHalf
+        top := mouseY - highlightGuiHalf
+        right := left + highlightGuiSize
+        bottom := top + highlightGuiSize
+    }
+""")
+            else:
+                compose.append("    showHighlight := false\n")
+            if click_fx_enabled:
+                compose.append("""
+    global isAnimating, clickPoolSize, clickSlotActive, clickSlotX, clickSlotY, clickSlotSize
+    if (isAnimating) {
+        AdvanceClickSlots()
+    }
+    drawClicks := isAnimating
+    if (drawClicks) {
+        Loop clickPoolSize {
+            if (clickSlotActive[A_Index]) {
+                slotLeft := clickSlotX[A_Index] - clickSlotSize[A_Index] // 2
+                slotTop := clickSlotY[A_Index] - clickSlotSize[A_Index] // 2
+                left := Min(left, slotLeft)
+                top := Min(top, slotTop)
+                right := Max(right, slotLeft + clickSlotSize[A_Index])
+                bottom := Max(bottom, slotTop + clickSlotSize[A_Index])
+            }
+        }
+    }
+""")
+            else:
+                compose.append("    drawClicks := false\n")
+            compose.append("""
+    if (right <= left) {
+        ; Nothing visible: hide once and wait for the next effect
+        if (overlayVisible) {
+            overlayGui.Hide()
+            overlayVisible := false
+        }
+        highlightOnly := false
+        return false
+    }
     
-    DllCall("UpdateLayeredWindow", "Ptr", hwnd, "Ptr", hdc, "Ptr", 0, "Ptr", SIZE, "Ptr", memDC, "Ptr", POINT, "UInt", 0, "Ptr", BLENDFUNCTION, "UInt", 2)
+    if (showHighlight && !drawClicks && highlightOnly) {
+        ; Only the unchanged halo is on screen: move the window and keep its bitmap
+        overlaySurface.MoveTo(left, top)
+        return false
+    }
     
-    DllCall("gdiplus\\GdipDeleteGraphics", "Ptr", pGraphics)
-    DllCall("DeleteObject", "Ptr", hBitmap)
-    DllCall("DeleteDC", "Ptr", memDC)
-    DllCall("ReleaseDC", "Ptr", hwnd, "Ptr", hdc)
+    ; The buffer grows in 64 px steps and only shrinks when far too large, so it is rarely reallocated
+    width := (right - left + 63) & ~63
+    height := (bottom - top + 63) & ~63
+    if (width > overlaySurface.width || height > overlaySurface.height || width * 2 < overlaySurface.width || height * 2 < overlaySurface.height) {
+        overlaySurface.Resize(width, height)
+    }
+    overlaySurface.Clear()
+    overlaySurface.Flush()
+""")
+            if hl_enabled:
+                compose.append("""
+    if (showHighlight) {
+        overlaySurface.Blend(highlightSprite.memDC, 0, 0, highlightGuiSize, highlightGuiSize, mouseX - highlightGuiHalf - left, mouseY - highlightGuiHalf - top)
+    }
+""")
+            if click_fx_enabled:
+                compose.append("""
+    if (drawClicks) {
+        Loop clickPoolSize {
+            if (clickSlotActive[A_Index]) {
+                CompositeClickSlot(A_Index, left, top)
+            }
+        }
+    }
+""")
+            compose.append("""
+    overlaySurface.Present(left, top)
+    if (!overlayVisible) {
+        overlayGui.Show("NA")
+        overlayVisible := true
+    }
+    highlightOnly := showHighlight && !drawClicks
+    ; Running ripples need the next frame even without mouse input
+    return drawClicks
 }
+""")
+            lines.append("".join(compose))
 
-DrawShape(guiObj, centerX, centerY, size, color, shape, opacity) {
-    static pToken := 0
-    static Startup := 0
+        if hl_enabled or click_fx_enabled:
+            lines.append("""
+; Persistent render target for one layered overlay window, or an off-screen sprite without one.
+; The memory DC, DIB section, GDI+ graphics, pen, brush and path are created once
+; and only rebuilt when the surface size changes (colour changes re-tint in place).
+class LayeredSurface {
+    static instances := []
+    static smoothingMode := 4
     
-    if (size <= 0 || opacity <= 0) {
-        return
+    __New(guiObj?) {
+        LayeredSurface.instances.Push(this)
+        this.hwnd := IsSet(guiObj) ? guiObj.Hwnd : 0
+        this.width := 0
+        this.height := 0
+        this.x := ""
+        this.y := ""
+        this.hdcScreen := DllCall("GetDC", "Ptr", 0, "Ptr")
+        this.memDC := DllCall("CreateCompatibleDC", "Ptr", this.hdcScreen, "Ptr")
+        this.hBitmap := 0
+        this.hOldBitmap := 0
+        this.pGraphics := 0
+        this.pPen := 0
+        this.penColor := -1
+        this.penWidth := -1
+        this.pBrush := 0
+        this.brushColor := -1
+        this.pPath := 0
+        
+        this.ptSrc := Buffer(8, 0)
+        this.ptDst := Buffer(8, 0)
+        this.sizeBuf := Buffer(8, 0)
+        this.blend := Buffer(4, 0)
+        NumPut("UChar", 255, this.blend, 2)
+        NumPut("UChar", 1, this.blend, 3)
     }
     
-    if (!Startup) {
-        si := Buffer(24, 0)
-        NumPut("UInt", 1, si)
-        DllCall("gdiplus\\GdiplusStartup", "Ptr*", &pToken, "Ptr", si, "Ptr", 0)
-        Startup := 1
+    Resize(width, height) {
+        if (width == this.width && height == this.height) {
+            return
+        }
+        this.ReleaseBitmap()
+        
+        static BITMAPINFO := Buffer(40, 0)
+        NumPut("UInt", 40, BITMAPINFO, 0)
+        NumPut("Int", width, BITMAPINFO, 4)
+        NumPut("Int", -height, BITMAPINFO, 8)
+        NumPut("UShort", 1, BITMAPINFO, 12)
+        NumPut("UShort", 32, BITMAPINFO, 14)
+        NumPut("UInt", 0, BITMAPINFO, 16)
+        
+        this.hBitmap := DllCall("CreateDIBSection", "Ptr", this.memDC, "Ptr", BITMAPINFO, "UInt", 0, "Ptr*", &pBits:=0, "Ptr", 0, "UInt", 0, "Ptr")
+        this.hOldBitmap := DllCall("SelectObject", "Ptr", this.memDC, "Ptr", this.hBitmap, "Ptr")
+        
+        DllCall("gdiplus\\GdipCreateFromHDC", "Ptr", this.memDC, "Ptr*", &pGraphics:=0)
+        DllCall("gdiplus\\GdipSetSmoothingMode", "Ptr", pGraphics, "Int", LayeredSurface.smoothingMode)
+        this.pGraphics := pGraphics
+        
+        this.width := width
+        this.height := height
+        NumPut("Int", width, this.sizeBuf, 0)
+        NumPut("Int", height, this.sizeBuf, 4)
     }
     
-    hwnd := guiObj.Hwnd
+    Clear() {
+        DllCall("gdiplus\\GdipGraphicsClear", "Ptr", this.pGraphics, "UInt", 0x00000000)
+    }
     
-    RECT := Buffer(16)
-    DllCall("GetClientRect", "Ptr", hwnd, "Ptr", RECT)
-    width := NumGet(RECT, 8, "Int")
-    height := NumGet(RECT, 12, "Int")
+    ; Completes pending GDI+ drawing before the bitmap is read or written with GDI
+    Flush() {
+        DllCall("gdiplus\\GdipFlush", "Ptr", this.pGraphics, "Int", 1)
+    }
     
-    if (width <= 0 || height <= 0) {
-        return
+    ; Composites a premultiplied source DC onto this surface (AC_SRC_OVER, per-pixel alpha)
+    Blend(srcDC, srcX, srcY, width, height, dstX, dstY) {
+        CountDraw()
+        DllCall("msimg32\\AlphaBlend", "Ptr", this.memDC, "Int", dstX, "Int", dstY, "Int", width, "Int", height, "Ptr", srcDC, "Int", srcX, "Int", srcY, "Int", width, "Int", height, "UInt", 0x01FF0000)
     }
     
-    hdc := DllCall("GetDC", "Ptr", hwnd, "Ptr")
-    memDC := DllCall("CreateCompatibleDC", "Ptr", hdc, "Ptr")
-    
-    BITMAPINFO := Buffer(40, 0)
-    NumPut("UInt", 40, BITMAPINFO, 0)
-    NumPut("Int", width, BITMAPINFO, 4)
-    NumPut("Int", -height, BITMAPINFO, 8)
-    NumPut("UShort", 1, BITMAPINFO, 12)
-    NumPut("UShort", 32, BITMAPINFO, 14)
-    NumPut("UInt", 0, BITMAPINFO, 16)
-    
-    hBitmap := DllCall("CreateDIBSection", "Ptr", memDC, "Ptr", BITMAPINFO, "UInt", 0, "Ptr*", &pBits:=0, "Ptr", 0, "UInt", 0, "Ptr")
-    DllCall("SelectObject", "Ptr", memDC, "Ptr", hBitmap)
-    
-    DllCall("gdiplus\\GdipCreateFromHDC", "Ptr", memDC, "Ptr*", &pGraphics:=0)
-    DllCall("gdiplus\\GdipSetSmoothingMode", "Ptr", pGraphics, "Int", 4)
-    DllCall("gdiplus\\GdipGraphicsClear", "Ptr", pGraphics, "UInt", 0x00000000)
-    
-    r := (color >> 0) & 0xFF
-    g := (color >> 8) & 0xFF
-    b := (color >> 16) & 0xFF
-    argbColor := (Integer(opacity) << 24) | (r << 16) | (g << 8) | b
-    
-    switch shape {
-        case "Circle Ripple":
-        {
-            DllCall("gdiplus\\GdipCreatePen1", "UInt", argbColor, "Float", Float(3), "Int", 2, "Ptr*", &pPen:=0)
-            x := Float(centerX - size)
-            y := Float(centerY - size)
-            DllCall("gdiplus\\GdipDrawEllipse", "Ptr", pGraphics, "Ptr", pPen, "Float", x, "Float", y, "Float", size*2, "Float", size*2)
-            DllCall("gdiplus\\GdipDeletePen", "Ptr", pPen)
-        }
-        case "Solid Circle":
-        {
-            DllCall("gdiplus\\GdipCreateSolidFill", "UInt", argbColor, "Ptr*", &pBrush:=0)
-            x := Float(centerX - size)
-            y := Float(centerY - size)
-            DllCall("gdiplus\\GdipFillEllipse", "Ptr", pGraphics, "Ptr", pBrush, "Float", x, "Float", y, "Float", size*2, "Float", size*2)
-            DllCall("gdiplus\\GdipDeleteBrush", "Ptr", pBrush)
+    Pen(argbColor, width) {
+        if (!this.pPen) {
+            DllCall("gdiplus\\GdipCreatePen1", "UInt", argbColor, "Float", Float(width), "Int", 2, "Ptr*", &pPen:=0)
+            this.pPen := pPen
+        } else {
+            if (argbColor != this.penColor) {
+                DllCall("gdiplus\\GdipSetPenColor", "Ptr", this.pPen, "UInt", argbColor)
+            }
+            if (width != this.penWidth) {
+                DllCall("gdiplus\\GdipSetPenWidth", "Ptr", this.pPen, "Float", Float(width))
+            }
         }
-        case "Square":
-        {
+        this.penColor := argbColor
+        this.penWidth := width
+        return this.pPen
+    }
+    
+    Brush(argbColor) {
+        if (!this.pBrush) {
             DllCall("gdiplus\\GdipCreateSolidFill", "UInt", argbColor, "Ptr*", &pBrush:=0)
-            x := Float(centerX - size)
-            y := Float(centerY - size)
-            DllCall("gdiplus\\GdipFillRectangle", "Ptr", pGraphics, "Ptr", pBrush, "Float", x, "Float", y, "Float", size*2, "Float", size*2)
-            DllCall("gdiplus\\GdipDeleteBrush", "Ptr", pBrush)
+            this.pBrush := pBrush
+        } else if (argbColor != this.brushColor) {
+            DllCall("gdiplus\\GdipSetSolidFillColor", "Ptr", this.pBrush, "UInt", argbColor)
         }
-        case "Diamond":
-        {
-            DllCall("gdiplus\\GdipCreateSolidFill", "UInt", argbColor, "Ptr*", &pBrush:=0)
+        this.brushColor := argbColor
+        return this.pBrush
+    }
+    
+    Path() {
+        if (!this.pPath) {
             DllCall("gdiplus\\GdipCreatePath", "Int", 0, "Ptr*", &pPath:=0)
-            
-            points := Buffer(32)
-            NumPut("Float", Float(centerX), points, 0)
-            NumPut("Float", Float(centerY - size), points, 4)
-            NumPut("Float", Float(centerX + size), points, 8)
-            NumPut("Float", Float(centerY), points, 12)
-            NumPut("Float", Float(centerX), points, 16)
-            NumPut("Float", Float(centerY + size), points, 20)
-            NumPut("Float", Float(centerX - size), points, 24)
-            NumPut("Float", Float(centerY), points, 28)
-            
-            DllCall("gdiplus\\GdipAddPathPolygon", "Ptr", pPath, "Ptr", points, "Int", 4)
-            DllCall("gdiplus\\GdipFillPath", "Ptr", pGraphics, "Ptr", pBrush, "Ptr", pPath)
-            
-            DllCall("gdiplus\\GdipDeletePath", "Ptr", pPath)
-            DllCall("gdiplus\\GdipDeleteBrush", "Ptr", pBrush)
+            this.pPath := pPath
+        } else {
+            DllCall("gdiplus\\GdipResetPath", "Ptr", this.pPath)
         }
-        case "Static Circle":
-        {
-            DllCall("gdiplus\\GdipCreatePen1", "UInt", argbColor, "Float", Float(3), "Int", 2, "Ptr*", &pPen:=0)
-            x := Float(centerX - size)
-            y := Float(centerY - size)
-            DllCall("gdiplus\\GdipDrawEllipse", "Ptr", pGraphics, "Ptr", pPen, "Float", x, "Float", y, "Float", size*2, "Float", size*2)
-            DllCall("gdiplus\\GdipDeletePen", "Ptr", pPen)
+        return this.pPath
+    }
+    
+    ; Pushes the bitmap to the window, optionally repositioning it in the same call
+    Present(x?, y?) {
+        ptDst := 0
+        if (IsSet(x) && IsSet(y)) {
+            this.x := x
+            this.y := y
+            NumPut("Int", x, this.ptDst, 0)
+            NumPut("Int", y, this.ptDst, 4)
+            ptDst := this.ptDst
         }
+        this.Flush()
+        CountDraw()
+        DllCall("UpdateLayeredWindow", "Ptr", this.hwnd, "Ptr", this.hdcScreen, "Ptr", ptDst, "Ptr", this.sizeBuf, "Ptr", this.memDC, "Ptr", this.ptSrc, "UInt", 0, "Ptr", this.blend, "UInt", 2)
     }
     
-    DllCall("gdiplus\\GdipFlush", "Ptr", pGraphics, "Int", 1)
+    ; Moves the already rendered window without touching its bitmap
+    MoveTo(x, y) {
+        if (x == this.x && y == this.y) {
+            return
+        }
+        this.x := x
+        this.y := y
+        ; SWP_NOSIZE | SWP_NOZORDER | SWP_NOREDRAW | SWP_NOACTIVATE
+        CountDraw()
+        DllCall("SetWindowPos", "Ptr", this.hwnd, "Ptr", 0, "Int", x, "Int", y, "Int", 0, "Int", 0, "UInt", 0x1D)
+    }
     
-    POINT := Buffer(8, 0)
-    SIZE := Buffer(8)
-    NumPut("Int", width, SIZE, 0)
-    NumPut("Int", height, SIZE, 4)
-    BLENDFUNCTION := Buffer(4)
-    NumPut("UChar", 0, BLENDFUNCTION, 0)
-    NumPut("UChar", 0, BLENDFUNCTION, 1)
-    NumPut("UChar", 255, BLENDFUNCTION, 2)
-    NumPut("UChar", 1, BLENDFUNCTION, 3)
+    ReleaseBitmap() {
+        if (this.pGraphics) {
+            DllCall("gdiplus\\GdipDeleteGraphics", "Ptr", this.pGraphics)
+            this.pGraphics := 0
+        }
+        if (this.hBitmap) {
+            DllCall("SelectObject", "Ptr", this.memDC, "Ptr", this.hOldBitmap, "Ptr")
+            DllCall("DeleteObject", "Ptr", this.hBitmap)
+            this.hBitmap := 0
+        }
+        this.width := 0
+        this.height := 0
+    }
     
-    DllCall("UpdateLayeredWindow", "Ptr", hwnd, "Ptr", hdc, "Ptr", 0, "Ptr", SIZE, "Ptr", memDC, "Ptr", POINT, "UInt", 0, "Ptr", BLENDFUNCTION, "UInt", 2)
+    ; Frees every GDI and GDI+ object; GdiplusShutdown must only run after this
+    Dispose() {
+        if (!this.memDC) {
+            return
+        }
+        this.ReleaseBitmap()
+        if (this.pPen) {
+            DllCall("gdiplus\\GdipDeletePen", "Ptr", this.pPen)
+            this.pPen := 0
+        }
+        if (this.pBrush) {
+            DllCall("gdiplus\\GdipDeleteBrush", "Ptr", this.pBrush)
+            this.pBrush := 0
+        }
+        if (this.pPath) {
+            DllCall("gdiplus\\GdipDeletePath", "Ptr", this.pPath)
+            this.pPath := 0
+        }
+        DllCall("DeleteDC", "Ptr", this.memDC)
+        DllCall("ReleaseDC", "Ptr", 0, "Ptr", this.hdcScreen)
+        this.memDC := 0
+    }
+    
+    __Delete() {
+        this.Dispose()
+    }
     
-    DllCall("gdiplus\\GdipDeleteGraphics", "Ptr", pGraphics)
-    DllCall("DeleteObject", "Ptr", hBitmap)
-    DllCall("DeleteDC", "Ptr", memDC)
-    DllCall("ReleaseDC", "Ptr", hwnd, "Ptr", hdc)
+    ; Applies to every surface, including ones created or resized later
+    static SetSmoothingMode(mode) {
+        LayeredSurface.smoothingMode := mode
+        for surface in LayeredSurface.instances {
+            if (surface.pGraphics) {
+                DllCall("gdiplus\\GdipSetSmoothingMode", "Ptr", surface.pGraphics, "Int", mode)
+            }
+        }
+    }
+}
+
+StartGdiplus() {
+    DllCall("LoadLibrary", "Str", "gdiplus", "Ptr")
+    ; msimg32 provides AlphaBlend for LayeredSurface.Blend
+    DllCall("LoadLibrary", "Str", "msimg32", "Ptr")
+    si := Buffer(24, 0)
+    NumPut("UInt", 1, si)
+    DllCall("gdiplus\\GdiplusStartup", "Ptr*", &token:=0, "Ptr", si, "Ptr", 0)
+    return token
+}
+
+ShutdownGdiplus(*) {
+    global gdipToken
+    if (!gdipToken) {
+        return
+    }
+    for surface in LayeredSurface.instances {
+        surface.Dispose()
+    }
+    DllCall("gdiplus\\GdiplusShutdown", "Ptr", gdipToken)
+    gdipToken := 0
+}
+
+DrawCircle(surface, centerX, centerY, radius, argbColor, thickness) {
+    surface.Clear()
+    if (radius <= 0) {
+        return
+    }
+    
+    x := Float(centerX - radius)
+    y := Float(centerY - radius)
+    w := Float(radius * 2)
+    h := Float(radius * 2)
+    
+    CountDraw()
+    if (thickness > 0) {
+        DllCall("gdiplus\\GdipDrawEllipse", "Ptr", surface.pGraphics, "Ptr", surface.Pen(argbColor, thickness), "Float", x, "Float", y, "Float", w, "Float", h)
+    } else {
+        DllCall("gdiplus\\GdipFillEllipse", "Ptr", surface.pGraphics, "Ptr", surface.Brush(argbColor), "Float", x, "Float", y, "Float", w, "Float", h)
+    }
+}
+
+; One helper per click shape, called directly from the specialised DrawClickSlot
+DrawRippleShape(surface, centerX, centerY, size, argbColor) {
+    CountDraw()
+    DllCall("gdiplus\\GdipDrawEllipse", "Ptr", surface.pGraphics, "Ptr", surface.Pen(argbColor, 3), "Float", Float(centerX - size), "Float", Float(centerY - size), "Float", size*2, "Float", size*2)
+}
+
+DrawSolidCircleShape(surface, centerX, centerY, size, argbColor) {
+    CountDraw()
+    DllCall("gdiplus\\GdipFillEllipse", "Ptr", surface.pGraphics, "Ptr", surface.Brush(argbColor), "Float", Float(centerX - size), "Float", Float(centerY - size), "Float", size*2, "Float", size*2)
+}
+
+DrawSquareShape(surface, centerX, centerY, size, argbColor) {
+    CountDraw()
+    DllCall("gdiplus\\GdipFillRectangle", "Ptr", surface.pGraphics, "Ptr", surface.Brush(argbColor), "Float", Float(centerX - size), "Float", Float(centerY - size), "Float", size*2, "Float", size*2)
+}
+
+DrawDiamondShape(surface, centerX, centerY, size, argbColor) {
+    static points := Buffer(32)
+    NumPut("Float", Float(centerX), points, 0)
+    NumPut("Float", Float(centerY - size), points, 4)
+    NumPut("Float", Float(centerX + size), points, 8)
+    NumPut("Float", Float(centerY), points, 12)
+    NumPut("Float", Float(centerX), points, 16)
+    NumPut("Float", Float(centerY + size), points, 20)
+    NumPut("Float", Float(centerX - size), points, 24)
+    NumPut("Float", Float(centerY), points, 28)
+    
+    pPath := surface.Path()
+    DllCall("gdiplus\\GdipAddPathPolygon", "Ptr", pPath, "Ptr", points, "Int", 4)
+    CountDraw()
+    DllCall("gdiplus\\GdipFillPath", "Ptr", surface.pGraphics, "Ptr", surface.Brush(argbColor), "Ptr", pPath)
+}
+
+DrawStaticCircleShape(surface, centerX, centerY, size, argbColor) {
+    CountDraw()
+    DllCall("gdiplus\\GdipDrawEllipse", "Ptr", surface.pGraphics, "Ptr", surface.Pen(argbColor, 3), "Float", Float(centerX - size), "Float", Float(centerY - size), "Float", size*2, "Float", size*2)
 }
 """)
 
-        return "\n".join(lines)
\ No newline at end of file
+        # Every window update and GDI/GDI+ draw calls CountDraw(); without telemetry its body is
+        # empty and the optimiser drops the calls
+        lines.append("CountDraw() {")
+        if telemetry:
+            lines.append("    global drawCallCount")
+            lines.append("    drawCallCount++")
+        lines.append("}")
+        
+        # Dead code elimination, shape specialisation and helper merging before printing
+        return render(optimise(Program.build(lines), constants))
+
+
+class EngineMonitor:
+    MUTEX_NAME = "MouseFXEngine_Running"
+    READY_EVENT_NAME = "MouseFXEngine_Ready"
+
+    @staticmethod
+    def is_running():
+        """True while a generated engine holds its named mutex (Windows only)."""
+        if sys.platform != 'win32':
+            return False
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenMutexW(0x00100000, False, EngineMonitor.MUTEX_NAME)  # SYNCHRONIZE
+        if not handle:
+            return False
+        kernel32.CloseHandle(handle)
+        return True
+
+    @staticmethod
+    def is_ready():
+        """True once a running engine has finished its warm start (Windows only)."""
+        if sys.platform != 'win32':
+            return False
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenEventW(0x00100000, False, EngineMonitor.READY_EVENT_NAME)  # SYNCHRONIZE
+        if not handle:
+            return False
+        signaled = kernel32.WaitForSingleObject(handle, 0) == 0  # WAIT_OBJECT_0
+        kernel32.CloseHandle(handle)
+        return signaled
+
+class EngineClient:
+    """
+    Sends commands to a running engine over its control channel, so effects can be switched
+    without regenerating and restarting the script.
+
+    Commands are one line of text: "status", "set <effect> <0|1>", "toggle <effect>",
+    "profile <n>" (1-based) and "param <name> <value>", with effect one of EFFECTS and name one
+    of ScriptGenerator.get_live_params(). The reply is the engine's
+    status bitmask: bit i is set while EFFECTS[i] is on, bit `AVAILABLE << i` when the engine
+    was generated with that effect, the 1-based active profile from PROFILE_SHIFT on when
+    profiles are embedded, PAUSED while a fullscreen or excluded app holds the effects back,
+    and STATUS_OK on every accepted command. 0 means no engine or a rejected command.
+    `transport` is any callable that delivers a command and returns the reply; the default
+    sends WM_COPYDATA to the engine's control window, a stand-in can be passed elsewhere.
+    """
+    WINDOW_TITLE = "MouseFXEngine_Control"
+    PROTOCOL = 0x4D46  # COPYDATASTRUCT.dwData, "MF"
+    EFFECTS = ("audio", "highlight", "clicks", "spotlight")
+    AVAILABLE = 0x100
+    STATUS_OK = 0x10000
+    PAUSED = 0x20000
+    PROFILE_SHIFT = 20
+    PROFILE_KEYS = {
+        "audio": "AudioEnabled",
+        "highlight": "HighlightEnabled",
+        "clicks": "ClickFxEnabled",
+        "spotlight": "SpotlightEnabled",
+    }
+
+    class COPYDATASTRUCT(ctypes.Structure):
+        _fields_ = [("dwData", ctypes.c_size_t), ("cbData", ctypes.c_uint32), ("lpData", ctypes.c_void_p)]
+
+    def __init__(self, transport=None):
+        self.transport = transport or EngineClient.copydata_transport
+
+    @staticmethod
+    def copydata_transport(text):
+        if sys.platform != 'win32':
+            return 0
+        user32 = ctypes.windll.user32
+        user32.FindWindowW.restype = ctypes.c_void_p
+        user32.SendMessageTimeoutW.argtypes = [ctypes.c_void_p, ctypes.c_uint, ctypes.c_size_t, ctypes.c_void_p,
+                                               ctypes.c_uint, ctypes.c_uint, ctypes.POINTER(ctypes.c_size_t)]
+        hwnd = user32.FindWindowW("AutoHotkeyGUI", EngineClient.WINDOW_TITLE)
+        if not hwnd:
+            return 0
+        payload = text.encode("utf-16-le")
+        data = ctypes.create_string_buffer(payload)
+        cds = EngineClient.COPYDATASTRUCT(EngineClient.PROTOCOL, len(payload), ctypes.cast(data, ctypes.c_void_p))
+        result = ctypes.c_size_t(0)
+        # SMTO_ABORTIFHUNG, so a stuck engine can't freeze the UI
+        if not user32.SendMessageTimeoutW(hwnd, 0x4A, 0, ctypes.byref(cds), 0x0002, 1000, ctypes.byref(result)):
+            return 0
+        return result.value
+
+    def send(self, command, *args):
+        """Returns the status bitmask, or 0 when the engine is gone or rejected the command."""
+        try:
+            return int(self.transport(" ".join([command, *map(str, args)])) or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def status(self):
+        return self.send("status")
+
+    def set_effect(self, effect, on):
+        return self.send("set", effect, int(bool(on)))
+
+    def toggle_effect(self, effect):
+        return self.send("toggle", effect)
+
+    def set_param(self, name, value):
+        """Replaces one live value (see ScriptGenerator.get_live_params); 0 when the engine lacks it."""
+        return self.send("param", name, value)
+
+    def switch_profile(self, index):
+        """Makes the 0-based stored profile active in place; 0 when the engine doesn't embed it."""
+        return self.send("profile", index + 1)
+
+    @staticmethod
+    def is_on(status, effect):
+        return bool(status & (1 << EngineClient.EFFECTS.index(effect)))
+
+    @staticmethod
+    def has_effect(status, effect):
+        return bool(status & (EngineClient.AVAILABLE << EngineClient.EFFECTS.index(effect)))
+
+    @staticmethod
+    def is_paused(status):
+        return bool(status & EngineClient.PAUSED)
+
+    @staticmethod
+    def active_profile(status):
+        """0-based active profile, or None for engines built from a single profile."""
+        profile = (status >> EngineClient.PROFILE_SHIFT) & 0xF
+        return profile - 1 if profile else None
+
+TelemetrySample = collections.namedtuple(
+    "TelemetrySample", "frame work_us late_us draw_calls gdi_objects user_objects working_set")
+
+class TelemetryReader:
+    """
+    Reads the frame telemetry ring buffer an engine keeps in a named shared memory section.
+
+    Layout (little-endian): a 32-byte header (magic "MFXT", version, capacity, record size,
+    records written as uint64, writer pid, reserved) followed by `capacity` 32-byte records.
+    Record n lives in slot n % capacity and is complete before the written count passes it.
+    Records are unpacked straight from a memoryview over the mapping, without copying it.
+    `path` reads a file with the same layout instead, e.g. a stand-in written on Linux.
+    """
+    MAGIC = b"MFXT"
+    VERSION = 1
+    CAPACITY = 512
+    HEADER = struct.Struct("<4sIIIQII")
+    RECORD = struct.Struct("<IIIIIIQ")
+    ENGINE_NAME = "MouseFXTelemetry_Engine"
+    ANIMATOR_NAME = "MouseFXTelemetry_Animator"
+
+    def __init__(self, name, path=None):
+        self.name = name
+        self.path = path
+        self._mmap = None
+        self._view = None
+
+    def open(self):
+        """Maps the section; False while no engine has created it yet."""
+        if self._view is not None:
+            return True
+        try:
+            if self.path:
+                with open(self.path, "rb") as f:
+                    self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            elif sys.platform == 'win32':
+                # Only attach to a section an engine created; mmap would otherwise create an empty one
+                kernel32 = ctypes.windll.kernel32
+                handle = kernel32.OpenFileMappingW(0x0004, False, self.name)  # FILE_MAP_READ
+                if not handle:
+                    return False
+                kernel32.CloseHandle(handle)
+                size = TelemetryReader.HEADER.size + TelemetryReader.CAPACITY * TelemetryReader.RECORD.size
+                self._mmap = mmap.mmap(-1, size, tagname=self.name)
+            else:
+                return False
+        except (OSError, ValueError):
+            self._mmap = None
+            return False
+        self._view = memoryview(self._mmap)
+        return True
+
+    def close(self):
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def read(self):
+        """(writer pid, records written, samples oldest first), or None if nothing valid is mapped."""
+        if not self.open():
+            return None
+        view = self._view
+        if len(view) < TelemetryReader.HEADER.size:
+            return None
+        magic, version, capacity, record_size, count, pid, _ = TelemetryReader.HEADER.unpack_from(view, 0)
+        if (magic != TelemetryReader.MAGIC or version != TelemetryReader.VERSION or record_size != TelemetryReader.RECORD.size
+                or capacity == 0 or len(view) < TelemetryReader.HEADER.size + capacity * record_size):
+            return None
+
+        first = max(0, count - capacity)
+        records = view[TelemetryReader.HEADER.size:TelemetryReader.HEADER.size + capacity * record_size]
+        start = first % capacity
+        stop = start + count - first
+        chunks = [records[start * record_size:min(stop, capacity) * record_size]]
+        if stop > capacity:
+            chunks.append(records[:(stop - capacity) * record_size])
+        samples = [TelemetrySample(*fields) for chunk in chunks for fields in TelemetryReader.RECORD.iter_unpack(chunk)]
+
+        # Slots the writer lapped while they were read, and the one it may be filling, are dropped
+        latest = TelemetryReader.HEADER.unpack_from(view, 0)[4]
+        stale = latest - capacity + 1 - first
+        if stale > 0:
+            samples = samples[stale:]
+        return pid, count, samples
+
+    @staticmethod
+    def percentile(values, fraction):
+        """Nearest-rank percentile of an already sorted list."""
+        if not values:
+            return 0
+        return values[min(len(values) - 1, max(0, math.ceil(fraction * len(values)) - 1))]
+
+    @staticmethod
+    def summarize(samples):
+        """Frame time and lateness percentiles in ms plus the latest resource counts."""
+        if not samples:
+            return None
+        work = sorted(sample.work_us / 1000 for sample in samples)
+        late = sorted(sample.late_us / 1000 for sample in samples)
+        latest = samples[-1]
+        return {
+            "Frames": len(samples),
+            "WorkP50": TelemetryReader.percentile(work, 0.50),
+            "WorkP95": TelemetryReader.percentile(work, 0.95),
+            "WorkP99": TelemetryReader.percentile(work, 0.99),
+            "LateP95": TelemetryReader.percentile(late, 0.95),
+            "DrawCalls": sum(sample.draw_calls for sample in samples) / len(samples),
+            "GdiObjects": latest.gdi_objects,
+            "UserObjects": latest.user_objects,
+            "WorkingSetMB": latest.working_set / (1024 * 1024),
+        }
+
+class ClickAtlasBuilder:
+    """
+    Pre-renders the click animation frames into a premultiplied BGRA atlas for the engine.
+
+    Layout (little-endian): 'MFXA', version, entry count, then per entry
+    (frame size, frame count, flags, data offset). Each entry is a top-down strip
+    of square frames stacked vertically, ready for UpdateLayeredWindow.
+    Entry 1 is the left click, entry 2 the right click.
+    """
+    MAGIC = b"MFXA"
+    VERSION = 1
+    FLAG_FOLLOW_CURSOR = 1
+
+    @staticmethod
+    def get_click_styles(config):
+        left = (config.get('LeftClickShape', 'Circle Ripple'), config.get('LeftClickColorHex', '#00FFFF'))
+        if config.get('SyncVisuals', True):
+            return left, left
+        right = (config.get('RightClickShape', 'Circle Ripple'), config.get('RightClickColorHex', '#FF00FF'))
+        return left, right
+
+    @staticmethod
+    def draw_shape(painter, center, size, color, shape):
+        if size <= 0 or color.alpha() <= 0:
+            return
+        if shape in ("Circle Ripple", "Static Circle"):
+            painter.setPen(QPen(color, 3))
+            painter.setBrush(Qt.BrushStyle.NoBrush)
+        else:
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(QBrush(color))
+
+        rect = QRectF(center.x() - size, center.y() - size, size * 2, size * 2)
+        if shape == "Square":
+            painter.drawRect(rect)
+        elif shape == "Diamond":
+            painter.drawPolygon(QPolygonF([
+                QPointF(center.x(), center.y() - size), QPointF(center.x() + size, center.y()),
+                QPointF(center.x(), center.y() + size), QPointF(center.x() - size, center.y())
+            ]))
+        else:
+            painter.drawEllipse(rect)
+
+    @staticmethod
+    def render_strip(config, shape, color_hex):
+        """Returns (frame_size, frame_count, flags, bgra_bytes) for one click style."""
+        color = QColor(color_hex)
+        if shape == "Static Circle":
+            # Held circle: a single full-opacity frame the size of the highlight
+            radius = int(config.get('HighlightSize', 60) / 2)
+            frame_size = radius * 2 + 10
+            frames = [(radius, 255)]
+            flags = ClickAtlasBuilder.FLAG_FOLLOW_CURSOR
+        else:
+            frame_size = ScriptGenerator.CLICK_ANIMATION_MAX_RADIUS * 2 + 10
+            frames = ScriptGenerator.get_click_frames(config)
+            flags = 0
+
+        image = QImage(frame_size, frame_size * len(frames), QImage.Format.Format_ARGB32_Premultiplied)
+        image.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        for index, (size, opacity) in enumerate(frames):
+            frame_color = QColor(color)
+            frame_color.setAlpha(opacity)
+            center = QPointF(frame_size / 2, index * frame_size + frame_size / 2)
+            ClickAtlasBuilder.draw_shape(painter, center, size, frame_color, shape)
+        painter.end()
+
+        bits = image.constBits()
+        bits.setsize(image.sizeInBytes())
+        return frame_size, len(frames), flags, bytes(bits)
+
+    @staticmethod
+    def build(config):
+        styles = ClickAtlasBuilder.get_click_styles(config)
+        strips = {}
+        for style in styles:
+            if style not in strips:
+                strips[style] = ClickAtlasBuilder.render_strip(config, *style)
+
+        header_size = 12 + 16 * len(styles)
+        offsets = {}
+        data = bytearray()
+        for style, strip in strips.items():
+            offsets[style] = header_size + len(data)
+            data += strip[3]
+
+        header = bytearray(ClickAtlasBuilder.MAGIC)
+        header += struct.pack("<II", ClickAtlasBuilder.VERSION, len(styles))
+        for style in styles:
+            frame_size, frame_count, flags, _ = strips[style]
+            header += struct.pack("<IIII", frame_size, frame_count, flags, offsets[style])
+        return bytes(header + data)
+
+    @staticmethod
+    def write(config, path):
+        with open(path, "wb") as f:
+            f.write(ClickAtlasBuilder.build(config))
+        return path
+
+class AudioPreprocessor:
+    """
+    Prepares click sounds at Apply time so the engine only has to play a ready buffer:
+    leading silence trimmed, master volume baked in, 16-bit PCM at one common sample rate.
+    Outputs are cached under %APPDATA% and named by a hash of the source data and settings.
+    """
+    VERSION = 1
+    SAMPLE_RATE = 44100
+    SILENCE_THRESHOLD = 10 ** (-50 / 20)  # -50 dBFS
+    PRE_ROLL_MS = 2
+
+    @staticmethod
+    def get_cache_dir():
+        path = os.path.join(os.environ["APPDATA"], "MouseFX Generator", "sound_cache")
+        if not os.path.exists(path):
+            os.makedirs(path)
+        return path
+
+    @staticmethod
+    def read_samples(path):
+        """Returns (float32 samples shaped (frames, channels), sample rate)."""
+        with wave.open(path, "rb") as w:
+            channels = w.getnchannels()
+            width = w.getsampwidth()
+            rate = w.getframerate()
+            raw = w.readframes(w.getnframes())
+
+        if width == 1:
+            samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128) / 128
+        elif width == 2:
+            samples = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768
+        elif width == 3:
+            b = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+            ints = b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)
+            ints = np.where(ints & 0x800000, ints - 0x1000000, ints)
+            samples = ints.astype(np.float32) / 8388608
+        elif width == 4:
+            samples = np.frombuffer(raw, dtype="<i4").astype(np.float32) / 2147483648
+        else:
+            raise wave.Error(f"Unsupported sample width: {width}")
+        return samples.reshape(-1, channels), rate
+
+    @staticmethod
+    def process_samples(samples, rate, gain):
+        # Trim leading silence, keeping a short pre-roll so the attack is not clipped
+        loud = np.nonzero(np.abs(samples).max(axis=1) > AudioPreprocessor.SILENCE_THRESHOLD)[0]
+        if len(loud):
+            start = max(0, loud[0] - rate * AudioPreprocessor.PRE_ROLL_MS // 1000)
+            samples = samples[start:]
+
+        if rate != AudioPreprocessor.SAMPLE_RATE and len(samples) > 1:
+            count = max(1, int(round(len(samples) * AudioPreprocessor.SAMPLE_RATE / rate)))
+            src_t = np.arange(len(samples)) / rate
+            dst_t = np.arange(count) / AudioPreprocessor.SAMPLE_RATE
+            samples = np.stack([np.interp(dst_t, src_t, samples[:, c]) for c in range(samples.shape[1])], axis=1)
+
+        pcm = np.clip(samples * gain, -1.0, 1.0)
+        return (pcm * 32767).astype("<i2")
+
+    @staticmethod
+    def process(path, volume):
+        """Returns the cached, normalised copy of a WAV file, or None if it cannot be processed."""
+        if np is None or not path or not os.path.exists(path):
+            return None
+        try:
+            with open(path, "rb") as f:
+                source = f.read()
+            settings = f"{AudioPreprocessor.VERSION}|{AudioPreprocessor.SAMPLE_RATE}|{volume}"
+            digest = hashlib.sha256(source + settings.encode("utf-8")).hexdigest()[:16]
+            stem = os.path.splitext(os.path.basename(path))[0]
+            out_path = os.path.join(AudioPreprocessor.get_cache_dir(), f"{stem}_{digest}.wav")
+            if os.path.exists(out_path):
+                return out_path
+
+            samples, rate = AudioPreprocessor.read_samples(path)
+            pcm = AudioPreprocessor.process_samples(samples, rate, volume / 100.0)
+
+            tmp_path = out_path + ".tmp"
+            with wave.open(tmp_path, "wb") as w:
+                w.setnchannels(pcm.shape[1])
+                w.setsampwidth(2)
+                w.setframerate(AudioPreprocessor.SAMPLE_RATE)
+                w.writeframes(pcm.tobytes())
+            os.replace(tmp_path, out_path)
+            return out_path
+        except (wave.Error, EOFError, OSError, ValueError) as e:
+            print(f"Error preprocessing {path}: {e}")
+            return None
+
+    @staticmethod
+    def prepare_click_sounds(config):
+        """Swaps the click sound paths for processed copies when both sides can be processed."""
+        volume = config.get("MasterVolume", 80)
+        left = AudioPreprocessor.process(config.get("LeftSoundPath", ""), volume)
+        if config.get("SyncSounds", True):
+            right = left
+        else:
+            right = AudioPreprocessor.process(config.get("RightSoundPath", ""), volume)
+
+        # All or nothing: the engine applies one volume to both sides
+        if left and right:
+            config["LeftSoundPath"] = left
+            config["RightSoundPath"] = right
+            config["SoundGainApplied"] = True
+        return config
+
+    @staticmethod
+    def prune_cache(profiles):
+        """Deletes cached sounds that none of `profiles` (already prepared) refers to."""
+        cache_dir = os.path.abspath(AudioPreprocessor.get_cache_dir())
+        keep = {os.path.normcase(os.path.abspath(profile.get(key, "")))
+                for profile in profiles for key in ("LeftSoundPath", "RightSoundPath") if profile.get(key)}
+        for name in os.listdir(cache_dir):
+            path = os.path.join(cache_dir, name)
+            # listdir keeps the file's own case, the kept paths are normcased
+            if os.path.normcase(path) not in keep:
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    # Still open in a running engine; it goes on the next Apply
+                    print(f"Error pruning {path}: {e}")
@@ -3,8 +3,8 @@ import os
 import shutil
 import subprocess
 from enum import Enum
-from PyQt6.QtCore import Qt, QSize, QPoint, QTimer, QUrl, pyqtSignal, QRect, QSettings
-from PyQt6.QtGui import QColor, QPainter, QPen, QBrush, QAction, QDesktopServices, QFont, QIcon, QPixmap, QMovie
+from PyQt6.QtCore import Qt, QSize, QPoint, QPointF, QTimer, QUrl, pyqtSignal, QRect, QSettings
+from PyQt6.QtGui import QColor, QPainter, QPen, QBrush, QPolygonF, QAction, QDesktopServices, QFont, QIcon, QPixmap, QMovie
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QHBoxLayout, QVBoxLayout, QGridLayout, 
     QLabel, QFrame, QSizePolicy, QScrollArea, QGraphicsOpacityEffect
@@ -18,13 +18,13 @@ from qfluentwidgets import (
     CardWidget, SwitchButton, Slider, ColorPickerButton,
     ComboBox, PrimaryPushButton, PushButton, RadioButton,
     FluentIcon as FIF, InfoBar, InfoBarPosition,
-    setTheme, Theme, isDarkTheme, setThemeColor,
+    setTheme, Theme, isDarkTheme, setThemeColor, themeColor,
     TransparentToolButton, RoundMenu, Action, 
     SegmentedWidget, CheckBox, MSFluentWindow, NavigationItemPosition,
-    MessageBox, HyperlinkButton
+    MessageBox, HyperlinkButton, LineEdit
 )
 
-from mousefx_logic import ProfileManager, ScriptGenerator
+from mousefx_logic import ProfileManager, ScriptGenerator, ClickAtlasBuilder, AudioPreprocessor, EngineMonitor, EngineClient, TelemetryReader
 from mousefx_animation import AnimationEngine
 
 # --- Helper for PyInstaller Single File ---
@@ -82,6 +82,19 @@ class Localizer:
             "AnimStyle": "Animation Style",
             "System": "System",
             "RefreshRate": "Refresh Rate",
+            "TrackingMode": "Mouse Tracking",
+            "OverlayMode": "Overlay Windows",
+            "HighlightRate": "Highlight Rate",
+            "ClickRate": "Click Effects Rate",
+            "SpotlightRate": "Spotlight Rate",
+            "AdaptiveRate": "Lower the rate under load",
+            "MinRefreshRate": "Minimum Rate",
+            "TelemetryOpt": "Record engine telemetry",
+            "Prediction": "Motion Prediction",
+            "PauseFullscreen": "Pause in fullscreen apps",
+            "ExcludedApps": "Excluded Apps",
+            "BatterySaver": "Save power on battery",
+            "BatteryRate": "Battery Rate",
             "Preview": "Preview",
             "InteractivePrev": "\n\nInteractive Preview\nClick anywhere to test",
             "InteractivePrevAr": "\n\nمعاينة تفاعلية\nانقر في أي مكان للتجربة",
@@ -90,6 +103,7 @@ class Localizer:
             "GenConfig": "Generating configuration...",
             "SuccessTitle": "Success",
             "SuccessMsg": "Engine script generated and started successfully.",
+            "UpToDateMsg": "The running engine already uses these settings.",
             "EngineRun": "Engine Running!",
             "ApplyBtn": "Apply & Run Engine",
             "KillEngine": "How to Stop the Engine",
@@ -119,6 +133,13 @@ class Localizer:
             "Q3": "Does this impact performance?",
             "A3": "No. The engine is extremely lightweight (0-3% CPU, ~5MB RAM). It does not affect gaming performance.",
             "Version": "Version 1.0.0 | By: os4ma31",
+            "Diagnostics": "Diagnostics",
+            "EngineDiag": "MouseFX Engine",
+            "AnimatorDiag": "Cursor Animator",
+            "DiagWaiting": "No telemetry yet. Apply a profile or deploy the animator.",
+            "DiagStalled": "No new frames (idle or stopped)",
+            "DiagStatus": "PID {pid} | {frames} frames buffered",
+            "DiagStats": "Frame time p50 {WorkP50:.2f} ms | p95 {WorkP95:.2f} ms | p99 {WorkP99:.2f} ms\nLateness p95 {LateP95:.2f} ms | {DrawCalls:.1f} draw calls per frame\nGDI objects {GdiObjects} | USER objects {UserObjects} | Working set {WorkingSetMB:.1f} MB",
             # --- Animation Tab Strings ---
             "Animator": "Animator",
             "AnimWarning": "EXPERIMENTAL FEATURE",
@@ -184,6 +205,19 @@ class Localizer:
             "AnimStyle": "نمط الحركة",
             "System": "النظام",
             "RefreshRate": "معدل التحديث",
+            "TrackingMode": "تتبع الماوس",
+            "OverlayMode": "نوافذ التراكب",
+            "HighlightRate": "معدل التمييز",
+            "ClickRate": "معدل تأثيرات النقر",
+            "SpotlightRate": "معدل الكشاف",
+            "AdaptiveRate": "خفض المعدل عند الضغط",
+            "MinRefreshRate": "الحد الأدنى للمعدل",
+            "TelemetryOpt": "تسجيل بيانات أداء المحرك",
+            "Prediction": "توقع حركة المؤشر",
+            "PauseFullscreen": "إيقاف مؤقت في تطبيقات ملء الشاشة",
+            "ExcludedApps": "التطبيقات المستثناة",
+            "BatterySaver": "توفير الطاقة عند العمل بالبطارية",
+            "BatteryRate": "المعدل على البطارية",
             "Preview": "المعاينة",
             "InteractivePrev": "\n\nمعاينة تفاعلية\nانقر في أي مكان للتجربة",
             "InteractivePrevAr": "\n\nمعاينة تفاعلية\nانقر في أي مكان للتجربة",
@@ -192,6 +226,7 @@ class Localizer:
             "GenConfig": "جاري إنشاء التكوين...",
             "SuccessTitle": "تم بنجاح",
             "SuccessMsg": "تم إنشاء وتشغيل المحرك بنجاح.",
+            "UpToDateMsg": "المحرك قيد التشغيل يستخدم هذه الإعدادات بالفعل.",
             "EngineRun": "المحرك يعمل!",
             "ApplyBtn": "تطبيق وتشغيل",
             "KillEngine": "كيفية إيقاف المحرك",
@@ -221,6 +256,13 @@ class Localizer:
             "Q3": "هل يؤثر هذا على الأداء؟",
             "A3": "لا. المحرك خفيف جداً (0-3% معالج، ~5 ميجابايت رام). ولا يؤثر على أداء الألعاب.",
             "Version": "الإصدار 1.0.0 | بواسطة: أُسامة",
+            "Diagnostics": "التشخيص",
+            "EngineDiag": "محرك MouseFX",
+            "AnimatorDiag": "محرك المؤشر المتحرك",
+            "DiagWaiting": "لا توجد بيانات بعد. طبّق ملفًا شخصيًا أو شغّل المحرك المتحرك.",
+            "DiagStalled": "لا توجد إطارات جديدة (خامل أو متوقف)",
+            "DiagStatus": "المعرف {pid} | {frames} إطار مخزن",
+            "DiagStats": "زمن الإطار p50 {WorkP50:.2f} مللي ثانية | p95 {WorkP95:.2f} مللي ثانية | p99 {WorkP99:.2f} مللي ثانية\nالتأخير p95 {LateP95:.2f} مللي ثانية | {DrawCalls:.1f} عملية رسم لكل إطار\nكائنات GDI {GdiObjects} | كائنات USER {UserObjects} | الذاكرة {WorkingSetMB:.1f} ميغابايت",
             # --- Animation Tab Strings ---
             "Animator": "Animator",
             "AnimWarning": "EXPERIMENTAL FEATURE",
@@ -286,6 +328,19 @@ class Localizer:
             "AnimStyle": "نمط الحركة",
             "System": "النظام",
             "RefreshRate": "معدل التحديث",
+            "TrackingMode": "تتبع الماوس",
+            "OverlayMode": "نوافذ التراكب",
+            "HighlightRate": "معدل التمييز",
+            "ClickRate": "معدل تأثيرات النقر",
+            "SpotlightRate": "معدل الكشاف",
+            "AdaptiveRate": "خفض المعدل عند الضغط",
+            "MinRefreshRate": "الحد الأدنى للمعدل",
+            "TelemetryOpt": "تسجيل بيانات أداء المحرك",
+            "Prediction": "توقع حركة المؤشر",
+            "PauseFullscreen": "إيقاف مؤقت في تطبيقات ملء الشاشة",
+            "ExcludedApps": "التطبيقات المستثناة",
+            "BatterySaver": "توفير الطاقة عند العمل بالبطارية",
+            "BatteryRate": "المعدل على البطارية",
             "Preview": "المعاينة",
             "InteractivePrev": "\n\nمعاينة تفاعلية\nانقر في أي مكان للتجربة",
             "InteractivePrevAr": "\n\nمعاينة تفاعلية\nانقر في أي مكان للتجربة",
@@ -294,6 +349,7 @@ class Localizer:
             "GenConfig": "جاري إنشاء التكوين...",
             "SuccessTitle": "تم بنجاح",
             "SuccessMsg": "تم إنشاء وتشغيل المحرك بنجاح.",
+            "UpToDateMsg": "المحرك قيد التشغيل يستخدم هذه الإعدادات بالفعل.",
             "EngineRun": "المحرك يعمل!",
             "ApplyBtn": "تطبيق وتشغيل",
             "KillEngine": "كيفية إيقاف المحرك",
@@ -323,6 +379,13 @@ class Localizer:
             "Q3": "هل يؤثر هذا على الأداء؟",
             "A3": "لا. المحرك خفيف جداً (0-3% معالج، ~5 ميجابايت رام). ولا يؤثر على أداء الألعاب.",
             "Version": "الإصدار 1.0.0 | بواسطة: أُسامة",
+            "Diagnostics": "التشخيص",
+            "EngineDiag": "محرك MouseFX",
+            "AnimatorDiag": "محرك المؤشر المتحرك",
+            "DiagWaiting": "لا توجد بيانات بعد. طبّق ملفًا شخصيًا أو شغّل المحرك المتحرك.",
+            "DiagStalled": "لا توجد إطارات جديدة (خامل أو متوقف)",
+            "DiagStatus": "المعرف {pid} | {frames} إطار مخزن",
+            "DiagStats": "زمن الإطار p50 {WorkP50:.2f} مللي ثانية | p95 {WorkP95:.2f} مللي ثانية | p99 {WorkP99:.2f} مللي ثانية\nالتأخير p95 {LateP95:.2f} مللي ثانية | {DrawCalls:.1f} عملية رسم لكل إطار\nكائنات GDI {GdiObjects} | كائنات USER {UserObjects} | الذاكرة {WorkingSetMB:.1f} ميغابايت",
             # --- Animation Tab Strings (Auto-translated placeholders) ---
             "Animator": "محرك الرسوم",
             "AnimWarning": "ميزة تجريبية",
@@ -535,6 +598,8 @@ class MouseFXWidget(QWidget):
         self.setObjectName("MouseFXWidget")
         
         self.profile_manager = ProfileManager()
+        self.engine_client = EngineClient()
+        self.loading_profile = False
         
         # Keep track of labels to update text dynamically
         self.ui_texts = {} 
@@ -1101,6 +1166,136 @@ class MouseFXWidget(QWidget):
         
         card_layout.addLayout(header)
         
+        adaptive_row = QHBoxLayout()
+        self.chk_adaptive_rate = CheckBox(Localizer.get("AdaptiveRate"))
+        self.ui_texts["AdaptiveRate"] = self.chk_adaptive_rate
+        self.chk_adaptive_rate.setChecked(True)
+        adaptive_row.addWidget(self.chk_adaptive_rate)
+        adaptive_row.addStretch(1)
+        card_layout.addLayout(adaptive_row)
+        
+        telemetry_row = QHBoxLayout()
+        self.chk_telemetry = CheckBox(Localizer.get("TelemetryOpt"))
+        self.ui_texts["TelemetryOpt"] = self.chk_telemetry
+        self.chk_telemetry.setChecked(True)
+        telemetry_row.addWidget(self.chk_telemetry)
+        telemetry_row.addStretch(1)
+        card_layout.addLayout(telemetry_row)
+        
+        min_rate_row = QHBoxLayout()
+        lbl_min_rate = CaptionLabel(Localizer.get("MinRefreshRate"))
+        self.ui_texts["MinRefreshRate"] = lbl_min_rate
+        min_rate_row.addWidget(lbl_min_rate)
+        
+        self.cmb_min_refresh = ComboBox()
+        self.cmb_min_refresh.addItems(["30 Hz", "60 Hz", "144 Hz"])
+        self.cmb_min_refresh.setFixedWidth(130)
+        
+        min_rate_row.addStretch(1)
+        min_rate_row.addWidget(self.cmb_min_refresh)
+        card_layout.addLayout(min_rate_row)
+        
+        prediction_row = QHBoxLayout()
+        lbl_prediction = CaptionLabel(Localizer.get("Prediction"))
+        self.ui_texts["Prediction"] = lbl_prediction
+        prediction_row.addWidget(lbl_prediction)
+        
+        self.slider_prediction = Slider(Qt.Orientation.Horizontal)
+        self.slider_prediction.setRange(0, 100)
+        self.slider_prediction.setValue(0)
+        self.slider_prediction.setFixedWidth(130)
+        
+        prediction_row.addStretch(1)
+        prediction_row.addWidget(self.slider_prediction)
+        card_layout.addLayout(prediction_row)
+        
+        pause_row = QHBoxLayout()
+        self.chk_pause_fullscreen = CheckBox(Localizer.get("PauseFullscreen"))
+        self.ui_texts["PauseFullscreen"] = self.chk_pause_fullscreen
+        self.chk_pause_fullscreen.setChecked(False)
+        pause_row.addWidget(self.chk_pause_fullscreen)
+        pause_row.addStretch(1)
+        card_layout.addLayout(pause_row)
+        
+        excluded_row = QHBoxLayout()
+        lbl_excluded = CaptionLabel(Localizer.get("ExcludedApps"))
+        self.ui_texts["ExcludedApps"] = lbl_excluded
+        excluded_row.addWidget(lbl_excluded)
+        
+        self.txt_excluded = LineEdit()
+        self.txt_excluded.setPlaceholderText("obs64.exe, zoom.exe")
+        self.txt_excluded.setFixedWidth(180)
+        
+        excluded_row.addStretch(1)
+        excluded_row.addWidget(self.txt_excluded)
+        card_layout.addLayout(excluded_row)
+        
+        battery_row = QHBoxLayout()
+        self.chk_battery_saver = CheckBox(Localizer.get("BatterySaver"))
+        self.ui_texts["BatterySaver"] = self.chk_battery_saver
+        self.chk_battery_saver.setChecked(True)
+        battery_row.addWidget(self.chk_battery_saver)
+        battery_row.addStretch(1)
+        card_layout.addLayout(battery_row)
+        
+        battery_rate_row = QHBoxLayout()
+        lbl_battery_rate = CaptionLabel(Localizer.get("BatteryRate"))
+        self.ui_texts["BatteryRate"] = lbl_battery_rate
+        battery_rate_row.addWidget(lbl_battery_rate)
+        
+        self.cmb_battery_refresh = ComboBox()
+        self.cmb_battery_refresh.addItems(["30 Hz", "60 Hz", "144 Hz"])
+        self.cmb_battery_refresh.setFixedWidth(130)
+        
+        battery_rate_row.addStretch(1)
+        battery_rate_row.addWidget(self.cmb_battery_refresh)
+        card_layout.addLayout(battery_rate_row)
+        
+        tracking_row = QHBoxLayout()
+        lbl_tracking = CaptionLabel(Localizer.get("TrackingMode"))
+        self.ui_texts["TrackingMode"] = lbl_tracking
+        tracking_row.addWidget(lbl_tracking)
+        
+        self.cmb_tracking = ComboBox()
+        self.cmb_tracking.addItems(["Polling", "Mouse Hook"])
+        self.cmb_tracking.setFixedWidth(130)
+        
+        tracking_row.addStretch(1)
+        tracking_row.addWidget(self.cmb_tracking)
+        card_layout.addLayout(tracking_row)
+        
+        overlay_row = QHBoxLayout()
+        lbl_overlay = CaptionLabel(Localizer.get("OverlayMode"))
+        self.ui_texts["OverlayMode"] = lbl_overlay
+        overlay_row.addWidget(lbl_overlay)
+        
+        self.cmb_overlay = ComboBox()
+        self.cmb_overlay.addItems(["Separate", "Unified"])
+        self.cmb_overlay.setFixedWidth(130)
+        
+        overlay_row.addStretch(1)
+        overlay_row.addWidget(self.cmb_overlay)
+        card_layout.addLayout(overlay_row)
+        
+        # Per-effect frame rates; "Default" follows the refresh rate above
+        self.cmb_effect_rates = {}
+        for text_key, profile_key in (("HighlightRate", "HighlightRateIndex"),
+                                      ("ClickRate", "ClickRateIndex"),
+                                      ("SpotlightRate", "SpotlightRateIndex")):
+            rate_row = QHBoxLayout()
+            lbl_rate = CaptionLabel(Localizer.get(text_key))
+            self.ui_texts[text_key] = lbl_rate
+            rate_row.addWidget(lbl_rate)
+            
+            cmb_rate = ComboBox()
+            cmb_rate.addItems(["Default", "30 Hz", "60 Hz", "144 Hz"])
+            cmb_rate.setFixedWidth(130)
+            self.cmb_effect_rates[profile_key] = cmb_rate
+            
+            rate_row.addStretch(1)
+            rate_row.addWidget(cmb_rate)
+            card_layout.addLayout(rate_row)
+        
         layout.addWidget(card)
         self.col3_layout.addWidget(wrapper)
 
@@ -1193,12 +1388,23 @@ class MouseFXWidget(QWidget):
             )
 
     def connect_signals(self):
+        # Effect switches take effect in a running engine right away; Apply still saves the profile
+        self.audio_switch.checkedChanged.connect(lambda c: self.set_live_effect("audio", c))
+        self.highlight_switch.checkedChanged.connect(lambda c: self.set_live_effect("highlight", c))
+        self.clickfx_switch.checkedChanged.connect(lambda c: self.set_live_effect("clicks", c))
+        self.spotlight_switch.checkedChanged.connect(lambda c: self.set_live_effect("spotlight", c))
         self.chk_sync_audio.stateChanged.connect(
             lambda s: self.cmb_right_sound.setEnabled(s != Qt.CheckState.Checked.value)
         )
         self.chk_sync_visuals.stateChanged.connect(
             lambda s: self.set_visuals_sync(s == Qt.CheckState.Checked.value)
         )
+        self.chk_adaptive_rate.stateChanged.connect(
+            lambda s: self.cmb_min_refresh.setEnabled(s == Qt.CheckState.Checked.value)
+        )
+        self.chk_battery_saver.stateChanged.connect(
+            lambda s: self.cmb_battery_refresh.setEnabled(s == Qt.CheckState.Checked.value)
+        )
         self.hl_color_picker.colorChanged.connect(lambda c: self.preview_widget.update_settings(hl_color=c))
         self.slider_hl_size.valueChanged.connect(lambda v: self.preview_widget.update_settings(hl_size=v))
         self.slider_hl_thick.valueChanged.connect(lambda v: self.preview_widget.update_settings(hl_thick=v))
@@ -1213,6 +1419,41 @@ class MouseFXWidget(QWidget):
         self.cmb_lc_shape.currentTextChanged.connect(lambda s: self.preview_widget.update_settings(lc_shape=s))
         self.cmb_rc_shape.currentTextChanged.connect(lambda s: self.preview_widget.update_settings(rc_shape=s))
 
+        # Parameter edits reach a running engine the same way; Apply still saves and regenerates
+        click_params = ("leftClickRgb", "leftClickArgb", "rightClickRgb", "rightClickArgb")
+        self.vol_slider.valueChanged.connect(lambda v: self.set_live_params("soundVolume"))
+        self.hl_color_picker.colorChanged.connect(lambda c: self.set_live_params("highlightArgb"))
+        self.slider_hl_opacity.valueChanged.connect(lambda v: self.set_live_params("highlightArgb"))
+        self.slider_hl_size.valueChanged.connect(lambda v: self.set_live_params("highlightRadius"))
+        self.slider_hl_thick.valueChanged.connect(lambda v: self.set_live_params("highlightThickness"))
+        self.lc_color.colorChanged.connect(lambda c: self.set_live_params(*click_params))
+        self.rc_color.colorChanged.connect(lambda c: self.set_live_params(*click_params))
+        self.chk_sync_visuals.stateChanged.connect(lambda s: self.set_live_params(*click_params))
+        self.slider_spot_radius.valueChanged.connect(lambda v: self.set_live_params("spotlightRadius"))
+        self.slider_spot_opacity.valueChanged.connect(lambda v: self.set_live_params("spotlightOpacity"))
+        self.spot_color.colorChanged.connect(lambda c: self.set_live_params("spotlightColor"))
+
+    def set_live_effect(self, effect, on):
+        if self.loading_profile or not EngineMonitor.is_running():
+            return
+        # Switching the spotlight feature on doesn't open the spotlight, it only becomes available
+        if effect == "spotlight" and on:
+            return
+        status = self.engine_client.status()
+        if EngineClient.has_effect(status, effect):
+            self.engine_client.set_effect(effect, on)
+
+    def set_live_params(self, *names):
+        if self.loading_profile or not EngineMonitor.is_running():
+            return
+        # Only while the engine runs the profile on screen
+        active = EngineClient.active_profile(self.engine_client.status())
+        if active is not None and active != self.profile_manager.current_index:
+            return
+        values = ScriptGenerator.get_live_params(self.get_configuration())
+        for name in names:
+            self.engine_client.set_param(name, values[name])
+
     def set_visuals_sync(self, synced):
         self.cmb_rc_shape.setEnabled(not synced)
         self.rc_color.setEnabled(not synced)
@@ -1227,6 +1468,9 @@ class MouseFXWidget(QWidget):
             self.profile_manager.current_index = index
             self.load_profile_ui(index)
             self.lbl_status.setText(f"Loaded Profile {index + 1}")
+            # An engine that embeds this profile switches to it right away
+            if EngineMonitor.is_running():
+                self.engine_client.switch_profile(index)
 
     def save_current_to_profile(self, index):
         data = self.get_configuration()
@@ -1234,6 +1478,7 @@ class MouseFXWidget(QWidget):
 
     def load_profile_ui(self, index):
         p = self.profile_manager.get_profile(index)
+        self.loading_profile = True
         
         # Audio
         self.audio_switch.setChecked(p.get("AudioEnabled", True))
@@ -1250,6 +1495,18 @@ class MouseFXWidget(QWidget):
         
         # System
         self.cmb_refresh.setCurrentIndex(p.get("RefreshRateIndex", 1))
+        self.chk_adaptive_rate.setChecked(p.get("AdaptiveRate", True))
+        self.cmb_min_refresh.setCurrentIndex(p.get("MinRefreshRateIndex", 0))
+        self.slider_prediction.setValue(p.get("PredictionStrength", 0))
+        self.chk_pause_fullscreen.setChecked(p.get("PauseOnFullscreen", False))
+        self.txt_excluded.setText(", ".join(p.get("ExcludedProcesses", [])))
+        self.chk_battery_saver.setChecked(p.get("BatterySaver", True))
+        self.cmb_battery_refresh.setCurrentIndex(p.get("BatteryRefreshRateIndex", 0))
+        self.chk_telemetry.setChecked(p.get("TelemetryEnabled", True))
+        self.cmb_tracking.setCurrentIndex(1 if p.get("TrackingMode", "Polling") == "Hook" else 0)
+        self.cmb_overlay.setCurrentIndex(1 if p.get("OverlayMode", "Separate") == "Unified" else 0)
+        for key, cmb_rate in self.cmb_effect_rates.items():
+            cmb_rate.setCurrentIndex(p.get(key, -1) + 1)
         
         # Highlight
         hl_enabled = p.get("HighlightEnabled", True)
@@ -1297,6 +1554,7 @@ class MouseFXWidget(QWidget):
             click_enabled=click_enabled, sync_visuals=sync_vis,
             lc_color=lc_col, rc_color=rc_col, lc_shape=lc_shape, rc_shape=rc_shape
         )
+        self.loading_profile = False
 
     def get_configuration(self):
         data = {}
@@ -1316,6 +1574,18 @@ class MouseFXWidget(QWidget):
         data["HotkeySpotlight"] = self.btn_hk_spot.text()
         
         data["RefreshRateIndex"] = self.cmb_refresh.currentIndex()
+        data["AdaptiveRate"] = self.chk_adaptive_rate.isChecked()
+        data["MinRefreshRateIndex"] = self.cmb_min_refresh.currentIndex()
+        data["PredictionStrength"] = self.slider_prediction.value()
+        data["PauseOnFullscreen"] = self.chk_pause_fullscreen.isChecked()
+        data["ExcludedProcesses"] = [name.strip() for name in self.txt_excluded.text().split(",") if name.strip()]
+        data["BatterySaver"] = self.chk_battery_saver.isChecked()
+        data["BatteryRefreshRateIndex"] = self.cmb_battery_refresh.currentIndex()
+        data["TelemetryEnabled"] = self.chk_telemetry.isChecked()
+        data["TrackingMode"] = "Hook" if self.cmb_tracking.currentIndex() == 1 else "Polling"
+        data["OverlayMode"] = "Unified" if self.cmb_overlay.currentIndex() == 1 else "Separate"
+        for key, cmb_rate in self.cmb_effect_rates.items():
+            data[key] = cmb_rate.currentIndex() - 1
         
         data["HighlightEnabled"] = self.highlight_switch.isChecked()
         data["HighlightColorHex"] = self.hl_color_picker.color.name()
@@ -1369,6 +1639,13 @@ class MouseFXWidget(QWidget):
                             print(f"Error copying {filename}: {e}")
         return dest_sounds_dir
 
+    def wait_for_engine_ready(self, attempts=50):
+        # The engine sets its ready event once warm-up is done; give up after about five seconds
+        if attempts <= 0 or sys.platform != 'win32' or EngineMonitor.is_ready():
+            self.lbl_status.setText(Localizer.get("EngineRun"))
+            return
+        QTimer.singleShot(100, lambda: self.wait_for_engine_ready(attempts - 1))
+
     def on_apply(self):
         # Save current state first
         self.save_current_to_profile(self.profile_manager.current_index)
@@ -1392,16 +1669,67 @@ class MouseFXWidget(QWidget):
                 filename = os.path.basename(path)
                 return os.path.join(persistent_sound_dir, filename)
 
-            config["LeftSoundPath"] = resolve_ahk_sound_path(config["LeftSoundPath"])
-            config["RightSoundPath"] = resolve_ahk_sound_path(config["RightSoundPath"])
+            # The other stored profiles are embedded too when they fit the same engine, so the
+            # profile hotkeys can switch between them, and need the same path preparation
+            current = self.profile_manager.current_index
+            profiles = [config if index == current else dict(profile)
+                        for index, profile in enumerate(self.profile_manager.profiles)]
+            any_audio = any(profile.get("AudioEnabled") for profile in profiles)
+            any_click_fx = any(profile.get("ClickFxEnabled") for profile in profiles)
+            for index, profile in enumerate(profiles):
+                profile["LeftSoundPath"] = resolve_ahk_sound_path(profile.get("LeftSoundPath", ""))
+                profile["RightSoundPath"] = resolve_ahk_sound_path(profile.get("RightSoundPath", ""))
+
+                # Trim, normalise and bake the volume into cached copies of the click sounds
+                if any_audio:
+                    AudioPreprocessor.prepare_click_sounds(profile)
+
+                if any_click_fx:
+                    profile["ClickAtlasPath"] = self.profile_manager.get_atlas_path(index)
+            ScriptGenerator.embed_profiles(config, profiles, current)
+            # Click atlases of every profile the engine loads
+            atlas_configs = [profile for profile, table in zip(profiles, config.get("Profiles") or [None] * len(profiles))
+                             if profile is config or table is not None]
+            uses_click_fx = ScriptGenerator.is_feature_enabled(config, "ClickFxEnabled")
 
-            # Generate Script Content
-            ahk_content = ScriptGenerator.generate_ahk_script(config)
-            
-            # Save Script File
             script_path = self.profile_manager.script_path
-            with open(script_path, "w", encoding="utf-8") as f:
-                f.write(ahk_content)
+            meta_path = self.profile_manager.script_meta_path
+            up_to_date = (
+                os.path.exists(script_path)
+                and (not uses_click_fx or all(os.path.exists(profile["ClickAtlasPath"]) for profile in atlas_configs))
+                and ScriptGenerator.read_script_hash(meta_path) == ScriptGenerator.get_config_hash(config)
+            )
+
+            # Nothing changed and the engine is alive: skip the rewrite and the restart
+            if up_to_date and EngineMonitor.is_running():
+                # Hotkeys may have switched profiles or effects since the last Apply
+                if config.get("Profiles"):
+                    self.engine_client.switch_profile(current)
+                status = self.engine_client.status()
+                for effect, key in EngineClient.PROFILE_KEYS.items():
+                    if effect != "spotlight" and EngineClient.has_effect(status, effect):
+                        self.engine_client.set_effect(effect, config.get(key, False))
+                InfoBar.info(
+                    title=Localizer.get("SuccessTitle"),
+                    content=Localizer.get("UpToDateMsg"),
+                    orient=Qt.Orientation.Horizontal,
+                    isClosable=True,
+                    position=InfoBarPosition.BOTTOM_RIGHT,
+                    duration=3000,
+                    parent=self
+                )
+                self.lbl_status.setText(Localizer.get("EngineRun"))
+                return
+
+            if not up_to_date:
+                # Pre-render click animation frames next to the script
+                if uses_click_fx:
+                    for profile in atlas_configs:
+                        ClickAtlasBuilder.write(profile, profile["ClickAtlasPath"])
+                ScriptGenerator.write_script(config, script_path, meta_path)
+            # Only once the new script points at the sounds it keeps
+            if any_audio:
+                AudioPreprocessor.prune_cache(profiles)
                 
             # Execute
             # Assuming .ahk is associated with AutoHotkey v2
@@ -1420,7 +1748,7 @@ class MouseFXWidget(QWidget):
                 duration=3000,
                 parent=self
             )
-            QTimer.singleShot(2000, lambda: self.lbl_status.setText(Localizer.get("EngineRun")))
+            self.wait_for_engine_ready()
             
         except Exception as e:
             InfoBar.error(
@@ -2183,6 +2511,121 @@ class InfoInterface(QWidget):
         for card in self.faq_cards:
             card.update_texts()
 
+class FrameTimeGraph(QWidget):
+    """Line graph of the most recent frame times, scaled to the slowest frame shown."""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.values = []
+        self.setMinimumHeight(120)
+
+    def set_values(self, values):
+        self.values = values
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        rect = self.rect().adjusted(1, 1, -1, -1)
+        
+        grid_color = QColor(255, 255, 255, 40) if isDarkTheme() else QColor(0, 0, 0, 40)
+        painter.setPen(QPen(grid_color, 1))
+        painter.setBrush(Qt.BrushStyle.NoBrush)
+        painter.drawRoundedRect(rect, 6, 6)
+        
+        if len(self.values) < 2:
+            return
+        
+        peak = max(max(self.values), 1.0)
+        step = rect.width() / (len(self.values) - 1)
+        points = [QPointF(rect.left() + i * step, rect.bottom() - (value / peak) * (rect.height() - 10))
+                  for i, value in enumerate(self.values)]
+        painter.setPen(QPen(themeColor(), 1.5))
+        painter.drawPolyline(QPolygonF(points))
+        
+        painter.setPen(QPen(grid_color.lighter(300), 1))
+        painter.drawText(rect.adjusted(6, 4, -6, -4), Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignRight, f"{peak:.2f} ms")
+
+class DiagnosticsInterface(QWidget):
+    """
+    Live frame-time and resource telemetry of the running engines, read from their shared memory.
+    Polls only while the page is visible.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setObjectName("DiagnosticsInterface")
+        self.ui_texts = {}
+        self.sources = []
+        
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(30, 20, 30, 20)
+        layout.setSpacing(20)
+        
+        self.lbl_title = SubtitleLabel(Localizer.get("Diagnostics"))
+        self.ui_texts["Diagnostics"] = self.lbl_title
+        layout.addWidget(self.lbl_title)
+        
+        for title_key, name in (("EngineDiag", TelemetryReader.ENGINE_NAME), ("AnimatorDiag", TelemetryReader.ANIMATOR_NAME)):
+            card = CardWidget()
+            card_layout = QVBoxLayout(card)
+            
+            lbl = StrongBodyLabel(Localizer.get(title_key))
+            self.ui_texts[title_key] = lbl
+            card_layout.addWidget(lbl)
+            
+            lbl_status = CaptionLabel(Localizer.get("DiagWaiting"))
+            card_layout.addWidget(lbl_status)
+            lbl_stats = BodyLabel("")
+            card_layout.addWidget(lbl_stats)
+            graph = FrameTimeGraph()
+            card_layout.addWidget(graph)
+            
+            layout.addWidget(card)
+            self.sources.append({"reader": TelemetryReader(name), "status": lbl_status, "stats": lbl_stats,
+                                 "graph": graph, "count": None})
+        
+        layout.addStretch(1)
+        
+        self.poll_timer = QTimer(self)
+        self.poll_timer.setInterval(500)
+        self.poll_timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self.poll_timer.start()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.poll_timer.stop()
+        # Let go of the sections so a stopped engine's memory is released
+        for source in self.sources:
+            source["reader"].close()
+            source["count"] = None
+
+    def refresh(self):
+        for source in self.sources:
+            result = source["reader"].read()
+            if result is None or not result[2]:
+                source["status"].setText(Localizer.get("DiagWaiting"))
+                source["stats"].setText("")
+                source["graph"].set_values([])
+                continue
+            
+            pid, count, samples = result
+            if count == source["count"]:
+                source["status"].setText(Localizer.get("DiagStalled"))
+            else:
+                source["status"].setText(Localizer.get("DiagStatus").format(pid=pid, frames=len(samples)))
+            source["count"] = count
+            source["stats"].setText(Localizer.get("DiagStats").format(**TelemetryReader.summarize(samples)))
+            source["graph"].set_values([sample.work_us / 1000 for sample in samples[-240:]])
+
+    def update_texts(self):
+        for key, widget in self.ui_texts.items():
+            widget.setText(Localizer.get(key))
+        if self.isVisible():
+            self.refresh()
+
 class MouseFXWindow(MSFluentWindow):
     def __init__(self):
         super().__init__()
@@ -2204,6 +2647,7 @@ class MouseFXWindow(MSFluentWindow):
         self.settings_interface = SettingsInterface(self)
         self.animation_interface = AnimationInterface(self)
         self.info_interface = InfoInterface(self)
+        self.diagnostics_interface = DiagnosticsInterface(self)
         
         # Connect signals
         self.settings_interface.themeChanged.connect(self.dashboard.update_theme_styles)
@@ -2216,6 +2660,7 @@ class MouseFXWindow(MSFluentWindow):
         self.addSubInterface(self.dashboard, FIF.GAME, "Home")
         # Add Animation Tab next to Home (NavigationItemPosition.TOP is default, so order matters)
         self.addSubInterface(self.animation_interface, FIF.VIDEO, "Animator", position=NavigationItemPosition.TOP)
+        self.addSubInterface(self.diagnostics_interface, FIF.SPEED_HIGH, "Diagnostics", position=NavigationItemPosition.TOP)
         self.addSubInterface(self.settings_interface, FIF.SETTING, "Settings", position=NavigationItemPosition.BOTTOM)
         self.addSubInterface(self.info_interface, FIF.INFO, "Info", position=NavigationItemPosition.BOTTOM)
         
@@ -2294,6 +2739,7 @@ class MouseFXWindow(MSFluentWindow):
         self.dashboard.update_texts()
         self.info_interface.update_texts()
         self.animation_interface.update_texts()
+        self.diagnostics_interface.update_texts()
         
         # Update Window Navigation Text (Home/Settings)
         # Note: MSFluentWindow items are tricky to update dynamically without digging into internals,
@@ -0,0 +1,191 @@
+from mousefx_ahk import Program, Function, Raw, If, Switch, Literal, optimise, render, parse
+from mousefx_ahk import fold_constants, inline_constants, merge_duplicate_functions, eliminate_dead_code
+
+
+def build(source):
+    return Program(parse(source))
+
+
+def test_parse_splits_globals_functions_and_comments():
+    program = build("""global rate := 7
+; Draws the halo
+Draw() {
+    return rate
+}
+F9::Draw()""")
+    kinds = [type(item).__name__ for item in program.items]
+    assert kinds == ["Global", "Function", "Statement"]
+    assert program.find("Draw").comment == "; Draws the halo"
+
+
+def test_inline_constants_replaces_reads_and_drops_declarations():
+    program = build("""Tick() {
+    global rate, frame
+    frame := rate * 2
+    rate := 3
+}""")
+    text = render(inline_constants(program, {"rate": 7, "color": Literal("0xFF00FF")}))
+    assert "global frame\n" in text
+    assert "frame := 7 * 2" in text
+    # Assignments are never rewritten
+    assert "rate := 3" in text
+
+
+def test_inline_constants_quotes_strings_and_leaves_members():
+    program = build("""Show() {
+    return style . obj.style
+}""")
+    text = render(inline_constants(program, {"style": "Zoom"}))
+    assert 'return "Zoom" . obj.style' in text
+
+
+def test_inline_constants_leaves_string_literals_and_comments():
+    program = build("""Show() {
+    ToolTip("style: " style)  ; keeps style
+    DllCall("Sleep", "UInt", rate)
+    MsgBox('rate `'style`' ' rate)
+}""")
+    text = render(inline_constants(program, {"style": "Zoom", "rate": 5, "UInt": 1}))
+    assert 'ToolTip("style: " "Zoom")  ; keeps style' in text
+    assert 'DllCall("Sleep", "UInt", 5)' in text
+    assert "MsgBox('rate `'style`' ' 5)" in text
+
+
+def test_fold_constants_resolves_if_and_keeps_runtime_conditions():
+    body = [If("unified", [Raw("Compose()")], [Raw("Separate()")]),
+            If("!mode", [Raw("Off()")]),
+            If("cursorShowing", [Raw("Draw()")])]
+    program = Program([Function("Frame", "", body)])
+    text = render(fold_constants(program, {"unified": False, "mode": "Zoom"}))
+    assert "Separate()" in text and "Compose()" not in text
+    assert "Off()" not in text
+    assert "if (cursorShowing) {" in text
+
+
+def test_fold_constants_compares_strings_case_insensitively_with_equals():
+    body = [If('style = "fade"', [Raw("Fade()")], [Raw("Zoom()")]),
+            If('style == "fade"', [Raw("Exact()")], [Raw("Other()")])]
+    text = render(fold_constants(Program([Function("Anim", "", body)]), {"style": "Fade"}))
+    assert "Fade()" in text and "Zoom()" not in text
+    assert "Other()" in text and "Exact()" not in text
+
+
+def test_fold_constants_leaves_literal_facts_to_runtime():
+    body = [If("color", [Raw("Paint()")])]
+    text = render(fold_constants(Program([Function("F", "", body)]), {"color": Literal("0xFF")}))
+    assert "if (color) {" in text
+
+
+def test_fold_constants_specialises_switch_cases():
+    switch = Switch("shape", [("Square", [If("filled", [Raw("FillRect()")], [Raw("DrawRect()")])]),
+                              ("Circle", [Raw("DrawEllipse()")])],
+                    bind={"Square": {"filled": True}})
+    program = Program([Function("Draw", "shape", [switch])])
+    text = render(fold_constants(program, {}))
+    assert "FillRect()" in text and "DrawRect()" not in text
+    assert 'case "Circle":' in text
+
+    known = render(fold_constants(program, {"shape": "Circle"}))
+    assert "switch" not in known and "DrawEllipse()" in known
+
+
+def test_fold_constants_drops_exhaustive_switch_with_identical_cases():
+    switch = Switch("side", [("left", [Raw("Play()")]), ("right", [Raw("Play()")])], exhaustive=True)
+    text = render(fold_constants(Program([Function("Click", "side", [switch])]), {}))
+    assert "switch" not in text and "Play()" in text
+
+
+def test_merge_duplicate_functions_redirects_calls_but_not_methods():
+    program = build("""DrawLeft(x) {
+    return x + 1
+}
+
+DrawRight(x) {
+    return x + 1
+}
+F1::DrawRight(2)
+global handler := DrawRight
+Run() {
+    return DrawRight(1) + surface.DrawRight(1)
+}""")
+    merged = merge_duplicate_functions(program, {})
+    text = render(merged)
+    assert merged.find("DrawRight") is None
+    assert "F1::DrawLeft(2)" in text
+    assert "global handler := DrawLeft" in text
+    assert "return DrawLeft(1) + surface.DrawRight(1)" in text
+
+
+def test_eliminate_dead_code_keeps_only_reachable_definitions():
+    program = build("""global used := 1
+global unused := 2
+global timer := SetTimer(Tick, 10)
+Tick() {
+    global used
+    Helper()
+}
+
+Helper() {
+    return used
+}
+
+Orphan() {
+    ; Tick() is only mentioned in a comment
+    return unused
+}
+
+class Surface {
+}""")
+    pruned = eliminate_dead_code(program, {})
+    names = [item.name for item in pruned.items if hasattr(item, "name")]
+    assert names == ["used", "timer", "Tick", "Helper"]
+
+
+def test_optimise_runs_all_passes_in_order():
+    program = Program(parse("""Start() {
+    Frame()
+}
+Frame() {
+    return 1
+}
+Unused() {
+    return 2
+}""") + [Function("Pick", "", [If("audio", [Raw("Start()")], [Raw("Unused()")])])])
+    program.items.append(parse("F8::Pick()")[0])
+    text = render(optimise(program, {"audio": True}))
+    assert "Unused" not in text
+    assert "Start()" in text and "Frame()" in text
+    assert "if (audio)" not in text
+
+
+def test_drop_empty_calls_removes_calls_to_empty_hooks():
+    program = build("""CountDraw() {
+}
+Present() {
+    CountDraw()
+    DllCall("UpdateLayeredWindow")
+}
+class Surface {
+    Blend() {
+        CountDraw()
+        DllCall("AlphaBlend")
+    }
+}
+F1::Present()
+F2::Surface().Blend()""")
+    text = render(optimise(program))
+    assert "CountDraw" not in text
+    assert 'DllCall("UpdateLayeredWindow")' in text and 'DllCall("AlphaBlend")' in text
+
+
+def test_drop_empty_calls_keeps_calls_to_hooks_with_a_body():
+    program = build("""CountDraw() {
+    global drawCallCount
+    drawCallCount++
+}
+Present() {
+    CountDraw()
+}
+F1::Present()""")
+    text = render(optimise(program))
+    assert "    CountDraw()" in text and "drawCallCount++" in text
@@ -0,0 +1,19 @@
+import os
+
+from mousefx_logic import AudioPreprocessor
+
+
+def test_prune_cache_keeps_referenced_sounds_whatever_their_case(tmp_path, monkeypatch):
+    monkeypatch.setenv("APPDATA", str(tmp_path))
+    # Windows normcase lowercases; on this platform it would leave the case alone
+    monkeypatch.setattr(os.path, "normcase", lambda path: path.replace("/", os.sep).lower())
+    cache_dir = AudioPreprocessor.get_cache_dir()
+    for name in ("Bloody V8_0123abcd.wav", "Click_4567ef01.wav", "Stale_89ab2345.wav"):
+        with open(os.path.join(cache_dir, name), "wb") as f:
+            f.write(b"RIFF")
+
+    profiles = [{"LeftSoundPath": os.path.join(cache_dir, "Bloody V8_0123abcd.wav"),
+                 "RightSoundPath": os.path.join(cache_dir, "Click_4567ef01.wav")},
+                {"LeftSoundPath": ""}]
+    AudioPreprocessor.prune_cache(profiles)
+    assert sorted(os.listdir(cache_dir)) == ["Bloody V8_0123abcd.wav", "Click_4567ef01.wav"]
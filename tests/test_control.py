@@ -0,0 +1,75 @@
+from mousefx_logic import EngineClient, ScriptGenerator
+
+
+class FakeTransport:
+    """Records every command and answers with a fixed status, or raises `error`."""
+    def __init__(self, reply=EngineClient.STATUS_OK, error=None):
+        self.reply = reply
+        self.error = error
+        self.sent = []
+
+    def __call__(self, text):
+        self.sent.append(text)
+        if self.error:
+            raise self.error
+        return self.reply
+
+
+def test_commands_are_sent_as_one_line_of_text():
+    transport = FakeTransport()
+    client = EngineClient(transport)
+    client.status()
+    client.set_effect("highlight", True)
+    client.set_effect("audio", 0)
+    client.toggle_effect("clicks")
+    client.switch_profile(1)
+    client.set_param("highlightThickness", 4)
+    assert transport.sent == ["status", "set highlight 1", "set audio 0", "toggle clicks", "profile 2",
+                              "param highlightThickness 4"]
+
+
+def test_live_params_are_sent_as_engine_literals():
+    transport = FakeTransport()
+    client = EngineClient(transport)
+    values = ScriptGenerator.get_live_params({"HighlightColorHex": "#FF0000", "HighlightOpacity": 50,
+                                              "SpotlightColorHex": "#102030", "MasterVolume": 40})
+    for name in ("highlightArgb", "spotlightColor", "soundVolume"):
+        client.set_param(name, values[name])
+    assert transport.sent == ["param highlightArgb 0x7FFF0000", "param spotlightColor 102030", "param soundVolume 400"]
+
+
+def test_send_returns_the_reply():
+    status = EngineClient.STATUS_OK | 0b0101
+    assert EngineClient(FakeTransport(status)).status() == status
+    assert EngineClient(FakeTransport(None)).status() == 0
+
+
+def test_send_returns_zero_when_the_transport_fails():
+    assert EngineClient(FakeTransport(error=OSError("gone"))).status() == 0
+    assert EngineClient(FakeTransport(error=ValueError("bad reply"))).toggle_effect("audio") == 0
+
+
+def test_status_mask_decoding():
+    # Highlight and clicks available, only highlight on, paused, profile 3 of an embedding engine
+    status = (EngineClient.STATUS_OK | EngineClient.PAUSED | 0b0010
+              | (EngineClient.AVAILABLE << 1) | (EngineClient.AVAILABLE << 2) | (3 << EngineClient.PROFILE_SHIFT))
+    assert [EngineClient.is_on(status, effect) for effect in EngineClient.EFFECTS] == [False, True, False, False]
+    assert [EngineClient.has_effect(status, effect) for effect in EngineClient.EFFECTS] == [False, True, True, False]
+    assert EngineClient.is_paused(status)
+    assert EngineClient.active_profile(status) == 2
+
+
+def test_single_profile_and_missing_engine_decode_as_nothing():
+    single = EngineClient.STATUS_OK | 0b1111 | (0b1111 * EngineClient.AVAILABLE)
+    assert EngineClient.active_profile(single) is None
+    assert not EngineClient.is_paused(single)
+    for effect in EngineClient.EFFECTS:
+        assert not EngineClient.is_on(0, effect)
+        assert not EngineClient.has_effect(0, effect)
+    assert EngineClient.active_profile(0) is None
+
+
+def test_highlight_size_is_sent_as_the_radius_alone():
+    values = ScriptGenerator.get_live_params({"HighlightSize": 80})
+    assert values["highlightRadius"] == 40
+    assert "highlightGuiSize" not in values and "highlightGuiHalf" not in values
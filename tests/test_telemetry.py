@@ -0,0 +1,88 @@
+from mousefx_logic import TelemetryReader
+
+
+def write_ring(path, count, capacity=8, magic=TelemetryReader.MAGIC, version=TelemetryReader.VERSION):
+    """Writes a ring the way the engine's TelemetryRing does after `count` frames."""
+    records = bytearray(capacity * TelemetryReader.RECORD.size)
+    for frame in range(count):
+        TelemetryReader.RECORD.pack_into(records, (frame % capacity) * TelemetryReader.RECORD.size,
+                                         frame, frame * 100, frame * 10, 3, 40, 20, 1 << 20)
+    header = TelemetryReader.HEADER.pack(magic, version, capacity, TelemetryReader.RECORD.size, count, 1234, 0)
+    path.write_bytes(header + records)
+
+
+def read_frames(path):
+    reader = TelemetryReader("test", path=str(path))
+    try:
+        pid, count, samples = reader.read()
+    finally:
+        reader.close()
+    return pid, count, [sample.frame for sample in samples]
+
+
+def test_partially_filled_ring_reads_every_frame(tmp_path):
+    path = tmp_path / "ring.bin"
+    write_ring(path, 5)
+    assert read_frames(path) == (1234, 5, [0, 1, 2, 3, 4])
+
+
+def test_wrapped_ring_reads_oldest_first(tmp_path):
+    path = tmp_path / "ring.bin"
+    write_ring(path, 21)
+    pid, count, frames = read_frames(path)
+    assert count == 21
+    # The oldest slot is the one the writer fills next, so it is dropped as stale
+    assert frames == list(range(14, 21))
+
+
+def test_full_ring_drops_the_slot_being_overwritten(tmp_path):
+    path = tmp_path / "ring.bin"
+    write_ring(path, 8)
+    assert read_frames(path)[2] == list(range(1, 8))
+
+
+def test_slots_lapped_during_the_read_are_dropped(tmp_path, monkeypatch):
+    path = tmp_path / "ring.bin"
+    write_ring(path, 10)
+    record = TelemetryReader.RECORD
+
+    class AdvancingRecord:
+        # The writer finishes three more frames while the records are unpacked
+        size = record.size
+
+        @staticmethod
+        def iter_unpack(chunk):
+            with open(path, "r+b") as f:
+                f.seek(16)
+                f.write((13).to_bytes(8, "little"))
+            return record.iter_unpack(chunk)
+
+    monkeypatch.setattr(TelemetryReader, "RECORD", AdvancingRecord)
+    pid, count, frames = read_frames(path)
+    assert count == 10
+    # Slots 2..5 were rewritten for frames 10..12 plus the one being filled
+    assert frames == list(range(6, 10))
+
+
+def test_invalid_or_missing_ring_reads_as_none(tmp_path):
+    path = tmp_path / "ring.bin"
+    write_ring(path, 4, magic=b"XXXX")
+    assert TelemetryReader("test", path=str(path)).read() is None
+    write_ring(path, 4, version=TelemetryReader.VERSION + 1)
+    assert TelemetryReader("test", path=str(path)).read() is None
+    assert TelemetryReader("test", path=str(tmp_path / "missing.bin")).read() is None
+
+
+def test_summarize_reports_percentiles_in_ms(tmp_path):
+    path = tmp_path / "ring.bin"
+    write_ring(path, 5)
+    reader = TelemetryReader("test", path=str(path))
+    samples = reader.read()[2]
+    reader.close()
+    summary = TelemetryReader.summarize(samples)
+    assert summary["Frames"] == 5
+    assert summary["WorkP50"] == 0.2
+    assert summary["WorkP99"] == 0.4
+    assert summary["DrawCalls"] == 3
+    assert summary["WorkingSetMB"] == 1
+    assert TelemetryReader.summarize([]) is None